@@ -0,0 +1,3 @@
+"""
+API package - Local HTTP/JSON interface over the service layer
+"""
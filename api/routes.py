@@ -0,0 +1,205 @@
+"""
+API routes - JSON endpoints mapped onto the services
+
+Every handler runs on a ConnectionPool thread and receives that thread's
+connection, the path parameters, the query parameters and the decoded JSON
+body. It returns (HTTP status, JSON-serializable payload).
+"""
+import re
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Optional, Pattern, Tuple
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+class Route(NamedTuple):
+    """One endpoint: HTTP method, path pattern, handler and whether it writes"""
+    method: str
+    pattern: Pattern
+    handler: Callable
+    write: bool
+
+
+ROUTES: List[Route] = []
+
+# Names of the JSON types that body fields are checked against
+JSON_TYPES = {str: "a string", bool: "a boolean", list: "an array"}
+
+
+def route(method: str, path: str, write: bool = False):
+    """
+    Registers a handler for a path such as '/habits/{name}'.
+
+    Args:
+        method: HTTP method
+        path: Path with {placeholders} matching one segment each
+        write: Whether the handler modifies the database (runs on the writer thread)
+    """
+    pattern = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", path) + "$")
+
+    def decorator(handler: Callable) -> Callable:
+        ROUTES.append(Route(method, pattern, handler, write))
+        return handler
+    return decorator
+
+
+def _flag(query: dict, name: str) -> bool:
+    """Reads a boolean query parameter such as ?all=true."""
+    return query.get(name, '').lower() in ('1', 'true', 'yes')
+
+
+def _invalid_fields(body: dict, **types: type) -> Optional[Tuple[int, dict]]:
+    """
+    Checks the JSON types of the body fields that are present.
+
+    Args:
+        body: Decoded JSON body
+        types: Expected Python type of each field, e.g. name=str
+
+    Returns:
+        A 400 response naming the first mistyped field, or None if all match
+    """
+    for field, expected in types.items():
+        value = body.get(field)
+        if value is not None and not isinstance(value, expected):
+            return 400, {'success': False, 'message': f"Field '{field}' must be {JSON_TYPES[expected]}"}
+    return None
+
+
+def _outcome(result: Tuple[bool, str], success_status: int = 200) -> Tuple[int, dict]:
+    """Maps a service (success, message) tuple to a response."""
+    success, message = result
+    if success:
+        status = success_status
+    elif "not found" in message:
+        status = 404
+    else:
+        status = 400
+    return status, {'success': success, 'message': message}
+
+
+# ============ Habits ============
+
+@route('GET', '/habits')
+def list_habits(con, path: dict, query: dict, body: dict):
+    habits = HabitService(con).get_all_habits(include_inactive=_flag(query, 'all'))
+    return 200, [habit.to_dict() for habit in habits]
+
+
+@route('POST', '/habits', write=True)
+def create_habit(con, path: dict, query: dict, body: dict):
+    invalid = _invalid_fields(body, name=str, periodicity=str, description=str)
+    if invalid:
+        return invalid
+    return _outcome(
+        HabitService(con).create_habit(
+            body.get('name', ''), body.get('periodicity', ''), body.get('description', '')
+        ),
+        success_status=201
+    )
+
+
+@route('GET', '/habits/{name}')
+def get_habit(con, path: dict, query: dict, body: dict):
+    habit = HabitService(con).get_habit_by_name(path['name'])
+    if not habit:
+        return 404, {'success': False, 'message': f"Habit '{path['name']}' not found"}
+    return 200, habit.to_dict()
+
+
+@route('PATCH', '/habits/{name}', write=True)
+def update_habit(con, path: dict, query: dict, body: dict):
+    invalid = _invalid_fields(body, name=str, periodicity=str, description=str, is_active=bool)
+    if invalid:
+        return invalid
+    service = HabitService(con)
+    habit = service.get_habit_by_name(path['name'])
+    if not habit:
+        return 404, {'success': False, 'message': f"Habit '{path['name']}' not found"}
+    return _outcome(service.update_habit(
+        habit.name,
+        body.get('name', habit.name),
+        body.get('periodicity', habit.periodicity),
+        new_status=body.get('is_active'),
+        new_description=body.get('description')
+    ))
+
+
+@route('DELETE', '/habits/{name}', write=True)
+def delete_habit(con, path: dict, query: dict, body: dict):
+    return _outcome(HabitService(con).delete_habit(path['name'], soft_delete=not _flag(query, 'hard')))
+
+
+# ============ Tracking ============
+
+@route('POST', '/habits/{name}/checkoffs', write=True)
+def check_off_habit(con, path: dict, query: dict, body: dict):
+    invalid = _invalid_fields(body, notes=str)
+    if invalid:
+        return invalid
+    checked_at = body.get('checked_at')
+    if checked_at is not None:
+        try:
+            checked_at = datetime.fromisoformat(checked_at)
+        except (TypeError, ValueError):
+            return 400, {'success': False, 'message': f"Invalid timestamp '{checked_at}'"}
+    return _outcome(
+        TrackerService(con).check_off_habit(path['name'], checked_at, body.get('notes', '')),
+        success_status=201
+    )
+
+
+@route('POST', '/checkoffs', write=True)
+def check_off_many(con, path: dict, query: dict, body: dict):
+    invalid = _invalid_fields(body, entries=list)
+    if invalid:
+        return invalid
+    entries = body.get('entries') or []
+    for index, entry in enumerate(entries):
+        if not (isinstance(entry, list) and 2 <= len(entry) <= 3 and isinstance(entry[0], str)
+                and (len(entry) == 2 or entry[2] is None or isinstance(entry[2], str))):
+            return 400, {'success': False, 'message': f"Entry {index} must be an array of [habit, checked_at, notes]"}
+    saved, errors = TrackerService(con).check_off_many(tuple(entry) for entry in entries)
+    return (201 if not errors else 207), {
+        'saved': saved,
+        'errors': [{'index': index, 'message': message} for index, message in errors]
+    }
+
+
+@route('GET', '/habits/{name}/history')
+def habit_history(con, path: dict, query: dict, body: dict):
+    history = AnalyticsService(con).get_habit_completion_history(path['name'])
+    if history is None:
+        return 404, {'success': False, 'message': f"Habit '{path['name']}' not found"}
+    return 200, history
+
+
+# ============ Analytics ============
+
+@route('GET', '/analytics/summary')
+def completion_summary(con, path: dict, query: dict, body: dict):
+    return 200, AnalyticsService(con).get_completion_summary()
+
+
+@route('GET', '/analytics/champion')
+def champion(con, path: dict, query: dict, body: dict):
+    name, streak = AnalyticsService(con).get_longest_streak_all_habits()
+    return 200, {'name': name, 'longest_streak': streak}
+
+
+@route('GET', '/analytics/streaks/{name}')
+def streaks(con, path: dict, query: dict, body: dict):
+    service = AnalyticsService(con)
+    if not HabitService(con).get_habit_by_name(path['name']):
+        return 404, {'success': False, 'message': f"Habit '{path['name']}' not found"}
+    return 200, {
+        'name': path['name'],
+        'longest_streak': service.calculate_longest_streak(path['name']),
+        'current_streak': service.get_current_streak(path['name'])
+    }
+
+
+@route('GET', '/analytics/rates')
+def completion_rates(con, path: dict, query: dict, body: dict):
+    return 200, AnalyticsService(con).get_completion_rates()
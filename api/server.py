@@ -0,0 +1,223 @@
+"""
+API server - Minimal asyncio HTTP/1.1 server for the JSON routes
+
+Connections are handled concurrently on the event loop, while all SQLite
+work goes through a ConnectionPool: reads on a bounded set of reader
+threads, writes on the single writer thread.
+"""
+import asyncio
+import json
+import signal
+from datetime import date, datetime
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+from config import Config
+from database.pool import ConnectionPool
+from api.routes import ROUTES
+
+# Upper bound for request bodies
+MAX_BODY_BYTES = 1024 * 1024
+
+REASONS = {
+    200: "OK", 201: "Created", 207: "Multi-Status", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"
+}
+
+
+def _json_default(value):
+    """Serializes the datetimes returned by the services."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class ApiServer:
+    """
+    Serves the routes of api.routes over HTTP on a local address.
+    """
+
+    def __init__(self, pool: ConnectionPool, host: str = None, port: int = None):
+        """
+        Initialize server.
+
+        Args:
+            pool: Connection pool running the database work
+            host: Address to bind (defaults to Config.API_HOST)
+            port: Port to bind, 0 for any free port (defaults to Config.API_PORT)
+        """
+        self.pool = pool
+        self.host = host or Config.API_HOST
+        self.port = Config.API_PORT if port is None else port
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self) -> Tuple[str, int]:
+        """
+        Starts listening.
+
+        Returns:
+            The bound (host, port)
+        """
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self):
+        """Starts listening if needed and serves until cancelled."""
+        if self.server is None:
+            await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves the requests of one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+
+                try:
+                    method, target, version, headers, length = await self._read_head(reader, request_line)
+                except ValueError as e:
+                    # Answer before closing, so that the client learns why
+                    await self._respond(writer, 400, {'success': False, 'message': f"Malformed request: {e}"}, False)
+                    break
+
+                if length > MAX_BODY_BYTES:
+                    status, payload = 413, {'success': False, 'message': "Request body too large"}
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.dispatch(method.upper(), target, body)
+                    keep_alive = (
+                        version.strip().upper() == 'HTTP/1.1'
+                        and headers.get('connection', '').lower() != 'close'
+                    )
+
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # Client went away
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader, request_line: bytes) -> Tuple[str, str, str, dict, int]:
+        """
+        Parses a request line and reads the headers after it.
+
+        Returns:
+            Tuple of (method, target, version, headers by lowercase name, content length)
+
+        Raises:
+            ValueError: If the request line, a header or the content length is malformed
+        """
+        parts = request_line.decode('latin-1').split()
+        if len(parts) != 3 or not parts[2].upper().startswith('HTTP/'):
+            raise ValueError("invalid request line")
+        method, target, version = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, separator, value = line.decode('latin-1').partition(':')
+            if not separator or not name.strip():
+                raise ValueError("invalid header line")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise ValueError("invalid Content-Length") from None
+        if length < 0:
+            raise ValueError("invalid Content-Length")
+        return method, target, version, headers, length
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: object, keep_alive: bool):
+        """Writes one JSON response."""
+        data = json.dumps(payload, default=_json_default).encode('utf-8')
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + data
+        )
+        await writer.drain()
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> Tuple[int, object]:
+        """
+        Routes one request to its handler.
+
+        Args:
+            method: HTTP method
+            target: Request target (path and query string)
+            body: Raw request body
+
+        Returns:
+            Tuple of (HTTP status, JSON-serializable payload)
+        """
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+
+        path_matched = False
+        for route in ROUTES:
+            match = route.pattern.match(url.path)
+            if not match:
+                continue
+            path_matched = True
+            if route.method != method:
+                continue
+
+            try:
+                data = json.loads(body) if body else {}
+            except ValueError:
+                return 400, {'success': False, 'message': "Request body must be JSON"}
+            if not isinstance(data, dict):
+                return 400, {'success': False, 'message': "Request body must be a JSON object"}
+
+            params = {name: unquote(value) for name, value in match.groupdict().items()}
+            run = self.pool.write if route.write else self.pool.read
+            try:
+                return await run(route.handler, params, query, data)
+            except Exception as e:
+                print(f"Error handling {method} {url.path}: {e}")
+                return 500, {'success': False, 'message': "Internal server error"}
+
+        if path_matched:
+            return 405, {'success': False, 'message': f"Method {method} not allowed"}
+        return 404, {'success': False, 'message': f"No route for {url.path}"}
+
+
+def run_server(host: str = None, port: int = None, db_name: str = None, readers: int = None):
+    """
+    Runs the API server until interrupted.
+
+    Args:
+        host: Address to bind (defaults to Config.API_HOST)
+        port: Port to bind (defaults to Config.API_PORT)
+        db_name: Database filename (defaults to Config.DATABASE_NAME)
+        readers: Reader threads (defaults to Config.POOL_READERS)
+    """
+    pool = ConnectionPool(db_name, readers)
+    server = ApiServer(pool, host, port)
+
+    async def main():
+        bound_host, bound_port = await server.start()
+        print(f"🌐 Serving the habit tracker API on http://{bound_host}:{bound_port} (Ctrl+C to stop)")
+        await server.serve_forever()
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Shut down cleanly on `kill` as well
+    signal.signal(signal.SIGTERM, stop)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.close()
@@ -0,0 +1,3 @@
+"""
+Benchmarks package - Performance measurements, run as modules (python -m benchmarks.<name>)
+"""
@@ -0,0 +1,130 @@
+"""
+API load test - Requests/sec and latency percentiles of the HTTP/JSON API
+
+Starts `python main.py api` on a seeded temporary database (or targets an
+already running instance with --port), then drives it with concurrent
+keep-alive clients mixing analytics reads and check-off writes.
+
+Usage:
+    python -m benchmarks.bench_api [--clients N] [--requests N] [--write-ratio R] [--port P]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+READS = ['/analytics/summary', '/analytics/champion', '/analytics/streaks/Read%20Journal', '/habits']
+
+
+async def client(port: int, requests: int, write_ratio: float, latencies: list, statuses: dict):
+    """Sends requests over one keep-alive connection, recording each latency."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for _ in range(requests):
+            if random.random() < write_ratio:
+                body = json.dumps({'notes': 'load test'}).encode()
+                head = f"POST /habits/Read%20Journal/checkoffs HTTP/1.1\r\nContent-Length: {len(body)}\r\n"
+            else:
+                body = b''
+                head = f"GET {random.choice(READS)} HTTP/1.1\r\n"
+            started = time.perf_counter()
+            writer.write(f"{head}Host: localhost\r\n\r\n".encode() + body)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode().partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+
+            latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def load(port: int, clients: int, requests: int, write_ratio: float) -> dict:
+    """Runs all clients concurrently and summarizes the results."""
+    latencies, statuses = [], {}
+    started = time.perf_counter()
+    await asyncio.gather(*(client(port, requests, write_ratio, latencies, statuses) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'statuses': statuses,
+    }
+
+
+def wait_for_port(port: int, timeout: float = 10.0):
+    """Waits until the server accepts connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("The API server did not start")
+
+
+def free_port() -> int:
+    """Returns a currently unused local port."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--clients', type=int, default=16, help='Concurrent connections')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per connection')
+    parser.add_argument('--write-ratio', type=float, default=0.2, help='Share of check-off requests')
+    parser.add_argument('--port', type=int, default=None, help='Target a running server instead of starting one')
+    args = parser.parse_args()
+
+    if args.port:
+        result = asyncio.run(load(args.port, args.clients, args.requests, args.write_ratio))
+    else:
+        with tempfile.TemporaryDirectory() as work_dir:
+            subprocess.run([sys.executable, MAIN, 'seed'], cwd=work_dir, check=True, capture_output=True)
+            port = free_port()
+            server = subprocess.Popen(
+                [sys.executable, MAIN, 'api', '--port', str(port)], cwd=work_dir, stdout=subprocess.DEVNULL
+            )
+            try:
+                wait_for_port(port)
+                result = asyncio.run(load(port, args.clients, args.requests, args.write_ratio))
+            finally:
+                server.terminate()
+                server.wait()
+
+    print(
+        f"{result['requests']} requests in {result['seconds']:.2f}s: "
+        f"{result['requests_per_second']:.0f} req/s, "
+        f"p50 {result['p50_ms']:.1f}ms, p99 {result['p99_ms']:.1f}ms, "
+        f"statuses {result['statuses']}"
+    )
+
+
+if __name__ == '__main__':
+    main()
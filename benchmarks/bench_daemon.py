@@ -0,0 +1,72 @@
+"""
+Daemon benchmark - Per-command CLI latency with and without `serve`
+
+Seeds a database in a temporary directory, times each quick command as a
+fresh `python main.py ...` process, then repeats the runs while a daemon
+started with `python main.py serve` is listening in the same directory.
+
+Usage:
+    python -m benchmarks.bench_daemon [--runs N]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+COMMANDS = [
+    ('checkoff', ['checkoff', 'Read Journal']),
+    ('streak', ['streak', 'Read Journal']),
+    ('champion', ['champion']),
+    ('habit-list', ['habit-list']),
+]
+
+
+def run_cli(work_dir: str, args: list) -> float:
+    """Runs one CLI command in a new process and returns its wall time in seconds."""
+    started = time.perf_counter()
+    subprocess.run([sys.executable, MAIN, *args], cwd=work_dir, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+
+def measure(work_dir: str, runs: int) -> dict:
+    """Returns the median latency in milliseconds of every command."""
+    return {
+        label: statistics.median(run_cli(work_dir, args) for _ in range(runs)) * 1000
+        for label, args in COMMANDS
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=10, help='Runs per command and mode')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        run_cli(work_dir, ['seed'])
+        in_process = measure(work_dir, args.runs)
+
+        daemon = subprocess.Popen([sys.executable, MAIN, 'serve'], cwd=work_dir, stdout=subprocess.DEVNULL)
+        try:
+            socket_path = os.path.join(work_dir, "habit_tracker.sock")
+            deadline = time.monotonic() + 10
+            while not os.path.exists(socket_path):
+                if time.monotonic() > deadline:
+                    raise RuntimeError("The daemon did not start")
+                time.sleep(0.05)
+            with_daemon = measure(work_dir, args.runs)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+    print(f"{'command':>12} {'in-process':>12} {'daemon':>12}")
+    for label, _ in COMMANDS:
+        print(f"{label:>12} {in_process[label]:>10.1f}ms {with_daemon[label]:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Export benchmark - Export rate and peak memory as the number of events grows
+
+Generates synthetic databases of growing size, then exports every check-off
+event with ExportService in each format in a child process and reports its
+rows/s and peak resident memory (with memory-mapped I/O off, so that the
+database file's pages do not count). Streaming keeps the peak flat however
+many events are exported.
+
+Usage:
+    python -m benchmarks.bench_export [--habits N] [--max-days D]
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from benchmarks.bench_parallel import generate
+
+
+def export_in_child(db_name: str, output: str) -> tuple:
+    """Exports all events in a fresh interpreter, returns (seconds, peak RSS in MiB)."""
+    script = (
+        "import resource, sys, time\n"
+        "from database.connection import Database\n"
+        "from services.export_service import ExportService\n"
+        "con = Database.connect(sys.argv[1])\n"
+        # Pages of a memory-mapped database file count as resident; leave them out
+        "con.execute('PRAGMA mmap_size = 0')\n"
+        "started = time.perf_counter()\n"
+        "ExportService(con).export(sys.argv[2])\n"
+        "print(time.perf_counter() - started, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, db_name, output],
+        check=True, capture_output=True, text=True
+    )
+    seconds, max_rss_kib = result.stdout.split()
+    return float(seconds), int(max_rss_kib) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--habits', type=int, default=1000, help='Number of habits')
+    parser.add_argument('--max-days', type=int, default=1460, help='Days of history of the largest database')
+    args = parser.parse_args()
+
+    print(f"{'events':>12} {'file':>14} {'rows/s':>12} {'peak MiB':>9}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        for days in sorted({max(1, args.max_days // 16), max(1, args.max_days // 4), args.max_days}):
+            db_name = os.path.join(work_dir, f"bench{days}.db")
+            generate(db_name, args.habits, days)
+            with sqlite3.connect(db_name) as con:
+                events = con.execute("SELECT count(*) FROM tracker").fetchone()[0]
+
+            for name in ("events.csv", "events.jsonl", "events.csv.gz"):
+                output = os.path.join(work_dir, name)
+                seconds, peak = export_in_child(db_name, output)
+                print(f"{events:>12,} {name:>14} {events / seconds:>12,.0f} {peak:>9.1f}")
+                os.remove(output)
+            os.remove(db_name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Model benchmark - Memory and load time of Habit/TrackerEvent rows
+
+Compares the slotted, lazily parsed models with the plain dataclasses they
+replaced when materializing tracker rows as returned by the repositories.
+
+Usage:
+    python -m benchmarks.bench_models [--rows N]
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from models.tracker import TrackerEvent
+
+
+@dataclass
+class DataclassTrackerEvent:
+    """The previous TrackerEvent implementation (per-instance dict, eager parsing)"""
+    habit_id: str
+    checked_at: datetime
+    event_id: Optional[str] = None
+    notes: str = ""
+
+    def __post_init__(self):
+        if self.event_id is None:
+            self.event_id = str(uuid.uuid4())
+
+    @classmethod
+    def from_tuple(cls, data: tuple) -> 'DataclassTrackerEvent':
+        return cls(
+            event_id=data[0],
+            habit_id=data[1],
+            checked_at=datetime.fromisoformat(data[2]),
+            notes=data[3]
+        )
+
+
+def make_rows(count: int) -> list:
+    """Builds tracker rows shaped like `SELECT event_id, habit_id, checked_at, notes`."""
+    start = datetime(2020, 1, 1, 7, 30)
+    habit_id = str(uuid.uuid4())
+    return [
+        (str(uuid.uuid4()), habit_id, (start + timedelta(hours=i)).isoformat(), "")
+        for i in range(count)
+    ]
+
+
+def measure(model, rows: list) -> dict:
+    """Loads all rows with model.from_tuple, then reads every timestamp once."""
+    tracemalloc.start()
+    events = [model.from_tuple(row) for row in rows]
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del events
+
+    # Timed separately: tracing allocations slows the load down
+    started = time.perf_counter()
+    events = [model.from_tuple(row) for row in rows]
+    load_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for event in events:
+        event.checked_at
+    access_seconds = time.perf_counter() - started
+
+    return {
+        'load_seconds': load_seconds,
+        'access_seconds': access_seconds,
+        'bytes_per_event': memory_bytes / len(rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=200_000, help='Number of tracker rows to load')
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    for label, model in [('dataclass', DataclassTrackerEvent), ('slotted/lazy', TrackerEvent)]:
+        result = measure(model, rows)
+        print(
+            f"{label:>13}: load {result['load_seconds']:.3f}s, "
+            f"first timestamp access {result['access_seconds']:.3f}s, "
+            f"{result['bytes_per_event']:.0f} B/event"
+        )
+
+
+if __name__ == '__main__':
+    main()
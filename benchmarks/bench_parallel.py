@@ -0,0 +1,85 @@
+"""
+Parallel analytics benchmark - Scaling of the 'parallel' engine from 1 to N processes
+
+Generates a synthetic database of many habits with random daily or weekly
+check-off histories, then times get_completion_summary() with the
+'parallel' engine for every worker count and compares it to the
+sequential 'python' engine.
+
+Usage:
+    python -m benchmarks.bench_parallel [--habits N] [--days D] [--max-workers N]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from config import Config
+from database.connection import Database
+from database.streaks import day_key, week_key
+from repositories.tracker_repository import INSERT_EVENT_SQL
+from services.analytics_service import AnalyticsService
+
+
+def generate(db_name: str, habits: int, days: int, density: float = 0.7):
+    """Fills a database with habits and random check-offs in a few large transactions."""
+    rng = random.Random(15)
+    now = datetime.now()
+    con = Database.connect(db_name)
+    try:
+        for index in range(habits):
+            habit_id = str(uuid.uuid4())
+            periodicity = 'weekly' if index % 4 == 0 else 'daily'
+            con.execute(
+                "INSERT INTO habits (habit_id, name, periodicity, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (habit_id, f"Habit {index}", periodicity, now.isoformat(), now.isoformat())
+            )
+            step = 7 if periodicity == 'weekly' else 1
+            rows = []
+            for offset in range(0, days, step):
+                if rng.random() < density:
+                    checked_at = now - timedelta(days=offset)
+                    rows.append((str(uuid.uuid4()), Config.DEFAULT_USER_ID, habit_id, checked_at.isoformat(), '',
+                                 day_key(checked_at), week_key(checked_at)))
+            con.executemany(INSERT_EVENT_SQL, rows)
+        con.commit()
+    finally:
+        con.close()
+
+
+def time_summary(db_name: str, engine: str, workers: int = None) -> float:
+    """Returns the wall time in seconds of one completion summary."""
+    con = Database.connect(db_name)
+    try:
+        service = AnalyticsService(con, streak_engine=engine, workers=workers)
+        started = time.perf_counter()
+        service.get_completion_summary()
+        return time.perf_counter() - started
+    finally:
+        con.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--habits', type=int, default=2000, help='Number of habits')
+    parser.add_argument('--days', type=int, default=730, help='Days of history per habit')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1, help='Largest worker count')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_name = os.path.join(work_dir, "bench.db")
+        started = time.perf_counter()
+        generate(db_name, args.habits, args.days)
+        print(f"Generated {args.habits:,} habits x {args.days:,} days in {time.perf_counter() - started:.1f} s")
+
+        sequential = time_summary(db_name, 'python')
+        print(f"{'python':>10}: {sequential:8.2f} s")
+        for workers in range(1, args.max_workers + 1):
+            elapsed = time_summary(db_name, 'parallel', workers)
+            print(f"{workers:>2} workers: {elapsed:8.2f} s   x{sequential / elapsed:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""
+Benchmark suite - Timed repository, service and CLI scenarios with regression checks
+
+Generates a synthetic database (utils.seed_data) and times the common
+operations on it: check_off_habit, find_all, calculate_longest_streak,
+get_longest_streak_all_habits, get_completion_summary and the startup of a
+one-shot CLI command. Each scenario reports the median, 95th percentile and
+minimum over its runs. The results are printed, optionally written as JSON
+(--output), and compared with a stored baseline: a scenario whose median is
+more than --threshold slower than the baseline's is flagged, and the exit
+status is then 1. --update-baseline stores the results as the new baseline.
+
+Usage:
+    python -m benchmarks.bench_suite [--habits N] [--years Y] [--density P] [--pattern P] [--runs N]
+        [--output FILE] [--baseline FILE] [--threshold F] [--update-baseline]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+from config import Config
+from database.connection import Database
+from repositories.habit_repository import HabitRepository
+from services.analytics_service import AnalyticsService
+from services.tracker_service import TrackerService
+from utils.seed_data import generate_synthetic_data
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def measure(run: Callable[[int], None], runs: int) -> dict:
+    """
+    Times a scenario.
+
+    Args:
+        run: Called with the run number; one call is one timed run
+        runs: Number of runs
+
+    Returns:
+        Dictionary with runs, median_ms, p95_ms and min_ms
+    """
+    samples = []
+    for number in range(runs):
+        started = time.perf_counter()
+        run(number)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'runs': runs,
+        'median_ms': round(statistics.median(samples), 4),
+        'p95_ms': round(samples[max(0, int(len(samples) * 0.95 + 0.5) - 1)], 4),
+        'min_ms': round(samples[0], 4)
+    }
+
+
+def run_scenarios(work_dir: str, habits: int, runs: int) -> Dict[str, dict]:
+    """
+    Times every scenario on the database main.db of a directory. The
+    check-offs run last, as they are the only scenario that writes.
+
+    Args:
+        work_dir: Directory holding main.db
+        habits: Number of habits of the database
+        runs: Runs per scenario (CLI startup runs a tenth as often, at least 3 times)
+
+    Returns:
+        Dictionary of scenario name -> measure() result
+    """
+    rng = random.Random(24)
+    names = [f"Habit {rng.randrange(habits)}" for _ in range(runs)]
+    con = Database.connect(os.path.join(work_dir, "main.db"))
+    try:
+        habit_repo = HabitRepository(con)
+        analytics = AnalyticsService(con)
+        tracker_service = TrackerService(con)
+
+        def find_all(number):
+            # Every CLI invocation starts with an empty identity map
+            con.identity_maps.clear()
+            habit_repo.find_all()
+
+        def cli_startup(number):
+            subprocess.run([sys.executable, MAIN, 'streak', names[number]], cwd=work_dir,
+                           check=True, capture_output=True)
+
+        now = datetime.now()
+        results = {
+            'find_all': measure(find_all, runs),
+            'calculate_longest_streak': measure(lambda number: analytics.calculate_longest_streak(names[number]), runs),
+            'get_longest_streak_all_habits': measure(lambda number: analytics.get_longest_streak_all_habits(), runs),
+            'get_completion_summary': measure(lambda number: analytics.get_completion_summary(), runs),
+            'cli_startup': measure(cli_startup, max(3, runs // 10)),
+            'check_off_habit': measure(
+                lambda number: tracker_service.check_off_habit(names[number], now - timedelta(seconds=number + 1)),
+                runs
+            ),
+        }
+    finally:
+        con.close()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> List[str]:
+    """
+    Compares the medians of two result sets.
+
+    Args:
+        results: Current results (see main)
+        baseline: Stored results
+        threshold: Allowed slowdown as a fraction, e.g. 0.2 for 20 %
+
+    Returns:
+        One line per scenario present in both, prefixed with REGRESSION where
+        the current median exceeds the baseline's by more than the threshold
+    """
+    lines = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous or not previous['median_ms']:
+            continue
+        change = current['median_ms'] / previous['median_ms'] - 1
+        flag = "REGRESSION" if change > threshold else "ok"
+        lines.append(
+            f"{flag:>10}  {name:<30} {previous['median_ms']:>10.3f} -> {current['median_ms']:>10.3f} ms "
+            f"({change:+.0%})"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--habits', type=int, default=200, help='Number of habits')
+    parser.add_argument('--years', type=float, default=3, help='Years of history per habit')
+    parser.add_argument('--density', type=float, default=0.7, help='Probability that a period was checked off')
+    parser.add_argument('--pattern', choices=Config.SYNTHETIC_PATTERNS, default='streaky',
+                        help='Shape of the streaks and gaps')
+    parser.add_argument('--runs', type=int, default=50, help='Runs per scenario')
+    parser.add_argument('--output', default=None, help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown of a median (0.2 = 20 %%)')
+    parser.add_argument('--update-baseline', action='store_true', help='Store the results as the baseline')
+    args = parser.parse_args()
+
+    params = {
+        'habits': args.habits, 'years': args.years, 'density': args.density, 'pattern': args.pattern, 'runs': args.runs
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        started = time.perf_counter()
+        con = Database.connect(os.path.join(work_dir, "main.db"))
+        try:
+            dataset = generate_synthetic_data(con, args.habits, int(args.years * 365), args.density, args.pattern, seed=24)
+        finally:
+            con.close()
+        print(f"Generated {dataset['habits']:,} habits, {dataset['events']:,} events "
+              f"in {time.perf_counter() - started:.1f} s")
+        scenarios = run_scenarios(work_dir, args.habits, args.runs)
+
+    results = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'params': params,
+        'events': dataset['events'],
+        'scenarios': scenarios
+    }
+
+    print(f"{'scenario':<30} {'runs':>5} {'median ms':>10} {'p95 ms':>10} {'min ms':>10}")
+    for name, stats in scenarios.items():
+        print(f"{name:<30} {stats['runs']:>5} {stats['median_ms']:>10.3f} {stats['p95_ms']:>10.3f} {stats['min_ms']:>10.3f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as stream:
+            json.dump(results, stream, indent=2)
+
+    regressed = False
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        if baseline.get('params') != params:
+            print(f"\nNote: the baseline was measured with {baseline.get('params')}")
+        print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+        lines = compare(results, baseline, args.threshold)
+        for line in lines:
+            print(line)
+        regressed = any(line.lstrip().startswith("REGRESSION") for line in lines)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as stream:
+            json.dump(results, stream, indent=2)
+        print(f"\nBaseline stored in {args.baseline}")
+
+    sys.exit(1 if regressed else 0)
+
+
+if __name__ == '__main__':
+    main()
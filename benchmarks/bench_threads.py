@@ -0,0 +1,101 @@
+"""
+Thread benchmark - Check-off and summary throughput with shared services
+
+Creates a database in a temporary directory, then runs check_off_habit on
+writer threads while reader threads loop over get_completion_summary, all
+through one ConnectionProvider. Reports throughput and verifies that no
+check-off was lost.
+
+Usage:
+    python -m benchmarks.bench_threads [--writers N] [--readers N] [--checkoffs N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from database.provider import ConnectionProvider
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+HABITS = [f"Habit {index}" for index in range(10)]
+
+
+def hammer(provider: ConnectionProvider, writers: int, readers: int, checkoffs: int) -> dict:
+    """
+    Runs the writer and reader threads and returns their counts and the elapsed time.
+
+    Args:
+        provider: Connection provider shared by all threads
+        writers: Number of check-off threads
+        readers: Number of summary threads
+        checkoffs: Check-offs per writer thread
+
+    Returns:
+        Dictionary with 'checkoffs', 'failed', 'summaries' and 'seconds'
+    """
+    tracker_service = TrackerService(provider)
+    analytics_service = AnalyticsService(provider)
+    counts = {'checkoffs': 0, 'failed': 0, 'summaries': 0}
+    counts_lock = threading.Lock()
+    done = threading.Event()
+    start = datetime.now() - timedelta(days=writers * checkoffs)
+
+    def writer(index: int):
+        for offset in range(checkoffs):
+            day = start + timedelta(days=index * checkoffs + offset)
+            success, _ = tracker_service.check_off_habit(HABITS[offset % len(HABITS)], day)
+            with counts_lock:
+                counts['checkoffs' if success else 'failed'] += 1
+
+    def reader():
+        while not done.is_set():
+            analytics_service.get_completion_summary()
+            with counts_lock:
+                counts['summaries'] += 1
+
+    writer_threads = [threading.Thread(target=writer, args=(index,)) for index in range(writers)]
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    started = time.perf_counter()
+    for thread in reader_threads + writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    counts['seconds'] = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writers', type=int, default=8, help='Check-off threads')
+    parser.add_argument('--readers', type=int, default=4, help='Summary threads')
+    parser.add_argument('--checkoffs', type=int, default=250, help='Check-offs per writer thread')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        provider = ConnectionProvider(os.path.join(work_dir, "bench.db"))
+        try:
+            for name in HABITS:
+                HabitService(provider).create_habit(name, "daily")
+            counts = hammer(provider, args.writers, args.readers, args.checkoffs)
+            stored = provider.connection().execute("SELECT count(*) FROM tracker").fetchone()[0]
+        finally:
+            provider.close_all()
+
+    expected = args.writers * args.checkoffs
+    print(f"{args.writers} writer / {args.readers} reader threads, {counts['seconds']:.2f} s")
+    print(f"  check-offs: {counts['checkoffs'] / counts['seconds']:>10,.0f} /s")
+    print(f"  summaries:  {counts['summaries'] / counts['seconds']:>10,.0f} /s")
+    print(f"  stored {stored:,} of {expected:,} check-offs, {counts['failed']} failed")
+    if stored != expected:
+        sys.exit("Lost writes detected")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Multi-user benchmark - Per-user query latency as the number of users grows
+
+Adds users (each with a daily and a weekly habit and a week of check-offs)
+to a temporary database in steps up to --users, and after every step times
+the per-user queries of a random sample of users: listing habits, loading
+one habit's history and the completion summary. With user-scoped indexes
+the latency stays flat as the user count grows. --shards spreads the users
+over several database files (Config.SHARD_COUNT).
+
+Usage:
+    python -m benchmarks.bench_users [--users N] [--sample N] [--shards N]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from config import Config
+from database.connection import Database
+from database.streaks import day_key, week_key
+from repositories.habit_repository import HabitRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from repositories.tracker_repository import INSERT_EVENT_SQL, TrackerRepository
+from services.analytics_service import AnalyticsService
+
+
+def add_users(count: int, days: int = 7) -> list:
+    """Inserts users with their habits and check-offs in one transaction per shard, returns their IDs."""
+    now = datetime.now()
+    rows_by_shard = {}
+    user_ids = []
+    for _ in range(count):
+        user_id = str(uuid.uuid4())
+        user_ids.append(user_id)
+        users, habits, events = rows_by_shard.setdefault(Database.database_for(user_id), ([], [], []))
+        users.append((user_id, user_id[:8], now.isoformat()))
+        for name, periodicity, step in (("Read", "daily", 1), ("Budget", "weekly", 7)):
+            habit_id = str(uuid.uuid4())
+            habits.append((habit_id, user_id, name, periodicity, now.isoformat(), now.isoformat()))
+            for offset in range(0, days, step):
+                checked_at = now - timedelta(days=offset)
+                events.append((str(uuid.uuid4()), user_id, habit_id, checked_at.isoformat(), '',
+                               day_key(checked_at), week_key(checked_at)))
+
+    for db_name, (users, habits, events) in rows_by_shard.items():
+        con = Database.get_connection(db_name)
+        con.executemany("INSERT INTO users (user_id, name, created_at) VALUES (?, ?, ?)", users)
+        con.executemany(
+            "INSERT INTO habits (habit_id, user_id, name, periodicity, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            habits
+        )
+        con.executemany(INSERT_EVENT_SQL, events)
+        con.commit()
+        HabitStatsRepository(con).rebuild()
+    return user_ids
+
+
+def time_user(user_id: str) -> dict:
+    """Returns the latency in microseconds of each per-user query."""
+    timings = {}
+
+    started = time.perf_counter()
+    habits = HabitRepository(user_id=user_id).find_all()
+    timings['habits'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    TrackerRepository(user_id=user_id).find_by_habit_id(habits[0].habit_id)
+    timings['history'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    AnalyticsService(streak_engine='stats', user_id=user_id).get_completion_summary()
+    timings['summary'] = time.perf_counter() - started
+
+    return {name: seconds * 1_000_000 for name, seconds in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', type=int, default=100_000, help='Final number of users')
+    parser.add_argument('--sample', type=int, default=500, help='Users timed after every step')
+    parser.add_argument('--shards', type=int, default=0, help='Database files (0 = a single file)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        Config.DATABASE_NAME = os.path.join(work_dir, "bench.db")
+        Config.SHARD_COUNT = args.shards
+        rng = random.Random(16)
+        user_ids = []
+        steps = [size for size in (100, 1_000, 10_000, 100_000, 1_000_000) if size < args.users] + [args.users]
+
+        print(f"{'users':>10} {'habits p50':>11} {'history p50':>12} {'summary p50':>12} {'summary p99':>12}  (us)")
+        try:
+            for size in steps:
+                user_ids += add_users(size - len(user_ids))
+                samples = [time_user(user_id) for user_id in rng.sample(user_ids, min(args.sample, len(user_ids)))]
+                summary = sorted(sample['summary'] for sample in samples)
+                print(
+                    f"{size:>10,} "
+                    f"{statistics.median(sample['habits'] for sample in samples):>11.0f} "
+                    f"{statistics.median(sample['history'] for sample in samples):>12.0f} "
+                    f"{statistics.median(summary):>12.0f} "
+                    f"{summary[int(len(summary) * 0.99) - 1]:>12.0f}"
+                )
+        finally:
+            Database.close_all()
+
+
+if __name__ == '__main__':
+    main()
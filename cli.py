@@ -1,33 +1,106 @@
 """
 CLI entry point using Click
+
+Commands import what they need when they run: the one-shot commands used
+from scripts (checkoff, streak, champion) never load rich, the controllers
+or the seeding code. When a daemon started with `serve` is listening,
+checkoff, streak, champion and habit-list are forwarded to it and the
+database is not opened at all.
 """
-from datetime import datetime
 import click
-from controllers.menu_controller import MenuController
-from database.connection import Database
-from services.analytics_service import AnalyticsService
-from services.habit_service import HabitService
-from services.tracker_service import TrackerService
-from utils.seed_data import seed_predefined_data
-from views.console_view import ConsoleView
+from config import Config
 
 
 @click.group(invoke_without_command=True)
+@click.option('--profile-sql', is_flag=True,
+              help='Count the statements, rows and time of every repository operation and print a summary')
+@click.option('--profile-sql-report', 'profile_sql_report', default=None, metavar='FILE',
+              help='Also write the SQL profile to a JSON file (implies --profile-sql)')
 @click.pass_context
-def cli(ctx):
+def cli(ctx, profile_sql, profile_sql_report):
     """✨ Habit Tracker CLI - Build better habits!  ✨"""
-    # Initialize database and seed data
-    db = Database. get_connection()
-    seed_predefined_data(db)
-
-    # Store db in context for other commands
+    # The database is opened on first use (see _get_db)
     ctx.ensure_object(dict)
-    ctx.obj['db'] = db
+    if profile_sql or profile_sql_report:
+        ctx.obj['profile_sql'] = {'report': profile_sql_report, 'command': ctx.invoked_subcommand or 'menu'}
+    ctx.call_on_close(lambda: _close_db(ctx))
 
     # If no subcommand is provided, launch the interactive menu
     if ctx.invoked_subcommand is None:
-        controller = MenuController(db)
-        controller.run()
+        _run_menu(_get_db(ctx))
+
+
+def _get_db(ctx):
+    """Returns the database connection of this invocation, opening it on first use."""
+    if 'db' not in ctx.obj:
+        from database.connection import Database
+        ctx.obj['db'] = Database.get_connection()
+        if 'profile_sql' in ctx.obj:
+            from database.profiler import start_profiling
+            start_profiling(ctx.obj['db'])
+    return ctx.obj['db']
+
+
+def _close_db(ctx):
+    """Closes the database connection if this invocation opened it, reporting the SQL profile first."""
+    if 'db' in ctx.obj:
+        from database.connection import Database
+        if 'profile_sql' in ctx.obj:
+            _report_sql_profile(ctx.obj['profile_sql'])
+        Database.close_all()
+
+
+def _report_sql_profile(options: dict):
+    """Stops profiling, prints the summary to stderr and writes the JSON report if one was asked for."""
+    from database.profiler import stop_profiling
+    from views.plain_view import PlainView
+
+    profiler = stop_profiling()
+    if profiler is None:
+        return
+    view = PlainView()
+    view.show_sql_profile(profiler.total, err=True)
+    if options['report']:
+        profiler.write_report(options['report'], command=options['command'])
+        view.echo(f"🔎 SQL profile written to {options['report']}", err=True)
+
+
+def _dispatch(ctx, command: str, **params) -> dict:
+    """
+    Runs a command in the daemon if one is listening, in this process otherwise.
+    With --profile-sql it always runs in this process, whose statements are traced.
+
+    Args:
+        ctx: Click context
+        command: Command name (see daemon.handlers.CommandHandler)
+        **params: Command arguments
+
+    Returns:
+        Result dictionary of the command
+    """
+    from daemon.client import DaemonError, send_request
+
+    result = None
+    if 'profile_sql' not in ctx.obj:
+        try:
+            result = send_request(Config.DAEMON_SOCKET, command, params)
+        except DaemonError as e:
+            raise click.ClickException(str(e))
+    if result is None:
+        from daemon.handlers import CommandHandler
+        result = CommandHandler(_get_db(ctx)).handle(command, params)
+    return result
+
+
+def _run_menu(db):
+    """Seeds an empty database with the predefined habits and runs the interactive menu."""
+    from controllers.menu_controller import MenuController
+    from database.profiler import active_profiler
+    from utils.seed_data import seed_predefined_data
+
+    seed_predefined_data(db)
+    controller = MenuController(db, active_profiler())
+    controller.run()
 
 
 # ============ Menu Command ============
@@ -36,9 +109,41 @@ def cli(ctx):
 @click.pass_context
 def menu(ctx):
     """🎯 Launch interactive menu"""
-    db = ctx.obj['db']
-    controller = MenuController(db)
-    controller.run()
+    _run_menu(_get_db(ctx))
+
+
+@cli.command()
+@click.option('--habits', type=click.IntRange(min=1), default=None,
+              help='Generate this many synthetic habits instead of the predefined ones')
+@click.option('--days', type=click.IntRange(min=1), default=365, help='Days of synthetic history per habit')
+@click.option('--density', type=click.FloatRange(0, 1), default=0.7, help='Share of periods checked off')
+@click.option('--pattern', type=click.Choice(Config.SYNTHETIC_PATTERNS), default='streaky',
+              help='Shape of the synthetic streaks and gaps')
+@click.option('--seed', 'random_seed', type=int, default=0, help='Random seed of the synthetic data')
+@click.pass_context
+def seed(ctx, habits, days, density, pattern, random_seed):
+    """🌱 Seed an empty database with the predefined habits, or a synthetic dataset"""
+    import time
+    from repositories.habit_repository import HabitRepository
+    from utils.seed_data import generate_synthetic_data, seed_predefined_data
+    from views.console_view import ConsoleView
+
+    db = _get_db(ctx)
+    view = ConsoleView()
+    if HabitRepository(db).count(include_inactive=True) > 0:
+        view.show_error("The database already contains habits, nothing to seed")
+        return
+    if habits is None:
+        seed_predefined_data(db)
+        return
+
+    started = time.perf_counter()
+    try:
+        result = generate_synthetic_data(db, habits, days, density, pattern, random_seed)
+    except RuntimeError as e:
+        view.show_error(str(e))
+        return
+    view.show_synthetic_seeding_complete(result['habits'], result['events'], time.perf_counter() - started)
 
 
 # ============ Direct CLI Commands (Quick Actions) ============
@@ -50,7 +155,10 @@ def menu(ctx):
 @click.pass_context
 def create(ctx, name, periodicity, description):
     """✨ Create a new habit"""
-    db = ctx.obj['db']
+    from services.habit_service import HabitService
+    from views.console_view import ConsoleView
+
+    db = _get_db(ctx)
     view = ConsoleView()
     service = HabitService(db)
 
@@ -70,7 +178,10 @@ def create(ctx, name, periodicity, description):
 @click.pass_context
 def delete(ctx, name, hard):
     """❌ Delete a habit"""
-    db = ctx.obj['db']
+    from services.habit_service import HabitService
+    from views.console_view import ConsoleView
+
+    db = _get_db(ctx)
     view = ConsoleView()
     service = HabitService(db)
 
@@ -106,18 +217,17 @@ def delete(ctx, name, hard):
 @click.pass_context
 def checkoff(ctx, name, notes):
     """✅ Check off a habit"""
-    db = ctx.obj['db']
-    view = ConsoleView()
-    service = TrackerService(db)
+    from views.plain_view import PlainView
 
-    success, message = service.check_off_habit(name, datetime.now(), notes)
+    view = PlainView()
+    result = _dispatch(ctx, 'checkoff', name=name, notes=notes)
 
-    if success:
+    if result['success']:
         view. show_habit_checked_off(name)
         if notes:
-            view.console.print(f"   📝 Notes: [italic]{notes}[/italic]", style="dim cyan")
+            view.show_notes(notes)
     else:
-        view.show_error(message)
+        view.show_error(result['message'])
 
 
 @cli.command()
@@ -125,12 +235,11 @@ def checkoff(ctx, name, notes):
 @click.pass_context
 def habit_list(ctx, show_all):
     """📋 List all habits"""
-    db = ctx.obj['db']
-    view = ConsoleView()
-    service = HabitService(db)
+    from views.console_view import ConsoleView
 
-    habits = service.get_all_habits(include_inactive=show_all)
-    habit_tuples = [(h.name, h.periodicity, h.description, h.is_active) for h in habits]
+    view = ConsoleView()
+    result = _dispatch(ctx, 'habit_list', show_all=show_all)
+    habit_tuples = [tuple(habit) for habit in result['habits']]
 
     if show_all:
         view.show_all_habits_list(habit_tuples)
@@ -148,7 +257,10 @@ def habit_list(ctx, show_all):
 @click.pass_context
 def edit(ctx, name, new_name, periodicity, description, status):
     """📝 Edit a habit"""
-    db = ctx.obj['db']
+    from services.habit_service import HabitService
+    from views.console_view import ConsoleView
+
+    db = _get_db(ctx)
     view = ConsoleView()
     service = HabitService(db)
 
@@ -182,17 +294,14 @@ def edit(ctx, name, new_name, periodicity, description, status):
 @click.pass_context
 def champion(ctx):
     """🏆 Show the habit with the longest streak"""
-    db = ctx. obj['db']
-    view = ConsoleView()
-    service = AnalyticsService(db)
+    from views.plain_view import PlainView
 
-    habit_name, habit_streak = service.get_longest_streak_all_habits()
+    view = PlainView()
+    result = _dispatch(ctx, 'champion')
+    habit_name, habit_streak = result['name'], result['longest_streak']
 
     if habit_name:
-        view.console.print()
-        view.console.print(f"🏆 [bold gold1]Champion Habit:[/bold gold1] [cyan]{habit_name}[/cyan]")
-        view.console. print(f"   [yellow]Longest streak:[/yellow] [green bold]{habit_streak}[/green bold] days")
-        view.console.print()
+        view.show_streak("🏆", "Champion Habit", habit_name, habit_streak)
     else:
         view.show_error("No habits found")
 
@@ -202,20 +311,156 @@ def champion(ctx):
 @click.pass_context
 def streak(ctx, name):
     """🎯 Show the longest streak for a specific habit"""
-    db = ctx. obj['db']
-    view = ConsoleView()
-    service = AnalyticsService(db)
+    from views.plain_view import PlainView
 
-    longest_streak = service.calculate_longest_streak(name)
+    view = PlainView()
+    longest_streak = _dispatch(ctx, 'streak', name=name)['longest_streak']
 
     if longest_streak is not None:
-        view.console. print()
-        view.console. print(f"🎯 [bold cyan]Habit:[/bold cyan] {name}")
-        view.console. print(f"   [yellow]Longest streak:[/yellow] [green bold]{longest_streak}[/green bold] days")
-        view.console.print()
+        view.show_streak("🎯", "Habit", name, longest_streak)
     else:
         view.show_error(f"Habit '{name}' not found")
 
 
+@cli.command('rebuild-stats')
+@click.option('--check-only', is_flag=True, help='Only compare the stored statistics, do not rebuild')
+@click.pass_context
+def rebuild_stats(ctx, check_only):
+    """🔧 Recompute streak statistics from the tracking history"""
+    from repositories.habit_stats_repository import HabitStatsRepository
+    from services.analytics_service import AnalyticsService
+    from views.console_view import ConsoleView
+
+    db = _get_db(ctx)
+    view = ConsoleView()
+    service = AnalyticsService(db, streak_engine='stats')
+
+    if not check_only:
+        if not HabitStatsRepository(db).rebuild():
+            view.show_error("Failed to rebuild habit statistics")
+            return
+        view.console.print("🔧 [green]Habit statistics rebuilt[/green]")
+
+    mismatches = service.check_stats_consistency()
+    if mismatches:
+        for mismatch in mismatches:
+            view.show_error(
+                f"{mismatch['name']}: stored {mismatch['actual']} != computed {mismatch['expected']}"
+            )
+    else:
+        view.console.print("✅ [green]Habit statistics are consistent with the tracking history[/green]")
+
+
+@cli.command()
+@click.argument('output', default='-')
+@click.option('--table', type=click.Choice(['events', 'habits']), default='events',
+              help='Export check-off events (with their habit) or habits')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Output format (defaults to the file extension, else csv)')
+@click.option('--gzip', 'compress', is_flag=True, default=None, help='Gzip the output (implied by a .gz name)')
+@click.option('--habit', 'habit_names', multiple=True, help='Only this habit (name or ID, repeatable)')
+@click.option('--periodicity', type=click.Choice(['daily', 'weekly']), default=None, help='Only habits of this periodicity')
+@click.option('--from', 'start', type=click.DateTime(['%Y-%m-%d']), default=None, help='First day (YYYY-MM-DD)')
+@click.option('--to', 'end', type=click.DateTime(['%Y-%m-%d']), default=None, help='Last day (YYYY-MM-DD)')
+@click.pass_context
+def export(ctx, output, table, fmt, compress, habit_names, periodicity, start, end):
+    """📤 Stream habits or check-offs to a CSV or JSON Lines file ('-' for stdout)"""
+    from services.export_service import ExportService
+    from views.plain_view import PlainView
+
+    view = PlainView()
+    success, message = ExportService(_get_db(ctx)).export(
+        output, table, fmt, compress, list(habit_names),
+        periodicity, start and start.date(), end and end.date()
+    )
+
+    if success:
+        # Standard output may be the export itself
+        view.echo(f"📤 {message}", fg="green", err=True)
+    else:
+        view.show_error(message)
+
+
+@cli.command('import')
+@click.argument('source')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Input format (defaults to the file extension, else csv)')
+@click.option('--gzip', 'compress', is_flag=True, default=None, help='The input is gzipped (implied by a .gz name)')
+@click.option('--no-create', is_flag=True, help='Skip records of unknown habits instead of creating them')
+@click.option('--periodicity', type=click.Choice(['daily', 'weekly']), default='daily',
+              help='Periodicity of created habits whose records do not name one')
+@click.option('--batch-size', type=int, default=None, help='Records per transaction (defaults to Config.IMPORT_BATCH_SIZE)')
+@click.option('--checkpoint', default=None,
+              help='Progress file to resume from (defaults to SOURCE.checkpoint, none for stdin)')
+@click.pass_context
+def import_(ctx, source, fmt, compress, no_create, periodicity, batch_size, checkpoint):
+    """📥 Bulk-load check-offs from a CSV or JSON Lines file ('-' for stdin)"""
+    from services.import_service import ImportService
+    from views.plain_view import PlainView
+
+    view = PlainView()
+    if checkpoint is None and source != '-':
+        checkpoint = f"{source}.checkpoint"
+
+    def report(records, inserted, seconds):
+        rate = records / seconds if seconds > 0 else 0
+        view.echo(f"\r📥 {records:,} records read, {inserted:,} imported ({rate:,.0f} rows/s)", nl=False, err=True)
+
+    success, message = ImportService(_get_db(ctx)).import_file(
+        source, fmt, compress, not no_create, periodicity, batch_size, checkpoint, report
+    )
+
+    view.echo(err=True)
+    if success:
+        view.echo(f"📥 {message}", fg="green")
+    else:
+        view.show_error(message)
+        if checkpoint:
+            view.echo(f"   Run the same command again to resume from {checkpoint}", fg="yellow")
+
+
+@cli.command()
+@click.option('--socket', 'socket_path', default=None, help='Unix socket path (defaults to Config.DAEMON_SOCKET)')
+@click.pass_context
+def serve(ctx, socket_path):
+    """🛰️  Serve quick commands from a long-running process"""
+    import signal
+    from daemon.server import HabitDaemon
+    from views.plain_view import PlainView
+
+    view = PlainView()
+    socket_path = socket_path or Config.DAEMON_SOCKET
+    try:
+        daemon = HabitDaemon(socket_path, _get_db(ctx))
+    except (RuntimeError, OSError) as e:
+        view.show_error(str(e))
+        return
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # Shut down cleanly on `kill` as well, removing the socket file
+    signal.signal(signal.SIGTERM, stop)
+
+    view.echo(f"🛰️  Listening on {socket_path} (Ctrl+C to stop)", fg="cyan")
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.server_close()
+
+
+@cli.command()
+@click.option('--host', default=None, help='Address to bind (defaults to Config.API_HOST)')
+@click.option('--port', type=int, default=None, help='Port to bind (defaults to Config.API_PORT)')
+@click.option('--readers', type=int, default=None, help='Reader threads (defaults to Config.POOL_READERS)')
+def api(host, port, readers):
+    """🌐 Serve the local HTTP/JSON API"""
+    from api.server import run_server
+
+    run_server(host, port, readers=readers)
+
+
 if __name__ == '__main__':
     cli(obj={})
\ No newline at end of file
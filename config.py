@@ -5,8 +5,71 @@ Application configuration
 class Config:
     """Application configuration settings"""
     DATABASE_NAME = "main.db"
+
+    # PRAGMAs applied to every new connection
+    DATABASE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -20000,  # Negative values are KiB: ~20 MB page cache
+        'mmap_size': 268435456,  # 256 MB memory-mapped I/O
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+        'busy_timeout': 5000,  # Milliseconds to wait for a writer of another process
+    }
+
+    # PRAGMAs applied while a bulk import runs (Database.bulk_load), restored afterwards
+    BULK_LOAD_PRAGMAS = {
+        'cache_size': -400000,  # ~400 MB page cache
+        'wal_autocheckpoint': 0,  # Checkpoint once at the end
+    }
     DEFAULT_PERIODICITY_OPTIONS = ['daily', 'weekly']
 
+    # Check-off patterns of synthetic datasets (`seed --habits N`, utils.seed_data)
+    SYNTHETIC_PATTERNS = ['uniform', 'streaky', 'weekday', 'mixed']
+
+    # Owner of the habits of single-user installs and of data created before users existed
+    DEFAULT_USER_ID = "default"
+
+    # Sharded layout: 0 keeps every user in DATABASE_NAME, N > 0 spreads users
+    # over N files named after it (main.shard000.db, ...) by a hash of their ID
+    SHARD_COUNT = 0
+
+    # Unix socket of the `serve` daemon; quick CLI commands are forwarded to it when it is running
+    DAEMON_SOCKET = "habit_tracker.sock"
+
+    # Rows fetched per round trip by the streaming repository methods (iter_*)
+    FETCH_BATCH_SIZE = 1000
+
+    # Write/read buffer of the export and import files, in bytes
+    EXPORT_BUFFER_SIZE = 1 << 20
+
+    # Records per transaction of the `import` command
+    IMPORT_BATCH_SIZE = 50000
+
+    # Results kept by services.analytics_cache.CachedAnalyticsService
+    ANALYTICS_CACHE_SIZE = 256
+
+    # Rows per page of the keyset-paginated finders (find_page*) and the console tables
+    PAGE_SIZE = 20
+
+    # Reader threads of database.pool.ConnectionPool (the writer is always a single thread)
+    POOL_READERS = 4
+
+    # Local HTTP/JSON API (`api` command)
+    API_HOST = "127.0.0.1"
+    API_PORT = 8765
+
+    # Streak backend: 'python' walks the events in Python, 'sql' computes
+    # streak lengths inside SQLite with window functions, 'stats' reads the
+    # habit_stats table maintained on every check-off, 'numpy' vectorizes over
+    # per-habit day arrays (optional dependency, falls back to 'python'),
+    # 'parallel' splits all-habit analytics across worker processes
+    STREAK_ENGINE = "stats"
+    STREAK_ENGINE_OPTIONS = ['python', 'sql', 'stats', 'numpy', 'parallel']
+
+    # Worker processes of the 'parallel' streak engine (None uses every CPU core)
+    ANALYTICS_WORKERS = None
+
     # Test fixture settings (4 weeks as per specification)
     SEED_WEEKS = 4
 
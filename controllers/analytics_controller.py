@@ -3,7 +3,7 @@ Analytics Controller - Coordinates analytics operations
 """
 
 from services.habit_service import HabitService
-from services.analytics_service import AnalyticsService
+from services.analytics_cache import CachedAnalyticsService
 
 
 class AnalyticsController:
@@ -21,7 +21,7 @@ class AnalyticsController:
         """
         self.view = view
         self.habit_service = HabitService(db)
-        self.analytics_service = AnalyticsService(db)
+        self.analytics_service = CachedAnalyticsService(db)
 
     def show_longest_streak_all(self):
         """Display the habit with the longest streak."""
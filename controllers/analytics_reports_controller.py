@@ -1,8 +1,6 @@
 """
 Analytics & Reports submenu controller
 """
-from database import Database
-from services import AnalyticsService
 
 class AnalyticsReportsController:
     """Handles analytics and reports submenu navigation"""
@@ -46,10 +44,5 @@ class AnalyticsReportsController:
 
     def _show_completion_statistics(self):
         """Display comprehensive completion statistics for all habits"""
-
-        db = Database.get_connection()
-        analytics_service = AnalyticsService(db)
-
-        summary = analytics_service.get_completion_summary()
-        self.view.show_completion_statistics(summary)
-        db.close()
\ No newline at end of file
+        summary = self.analytics_controller.analytics_service.get_completion_summary()
+        self.view.show_completion_statistics(summary)
\ No newline at end of file
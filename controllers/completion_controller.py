@@ -1,7 +1,8 @@
 """
 Completion Controller - Coordinates completion table operations
 """
-from services.analytics_service import AnalyticsService
+from typing import Tuple
+from services.analytics_cache import CachedAnalyticsService
 from services.habit_service import HabitService
 
 
@@ -20,7 +21,7 @@ class CompletionController:
         """
         self.view = view
         self.habit_service = HabitService(db)
-        self.analytics_service = AnalyticsService(db)
+        self.analytics_service = CachedAnalyticsService(db)
 
     def show_completion_table(self):
         """Display completion summary table with an option to view details."""
@@ -48,21 +49,7 @@ class CompletionController:
                 if 1 <= choice_num <= len(summary_data):
                     selected_habit_name = summary_data[choice_num - 1]['name']
 
-                    # Get a detailed history
-                    habit_data = self.analytics_service.get_habit_completion_history(selected_habit_name)
-
-                    if habit_data:
-                        self.view.show_habit_completion_history(habit_data)
-
-                        # Ask if the user wants to continue
-                        continue_choice = self.view.get_confirmation(
-                            "Press Enter to return to completion table (or 'q' to quit): "
-                        )
-
-                        if continue_choice.lower() == 'q':
-                            return
-                    else:
-                        self.view.show_error("Habit not found.")
+                    if not self._browse_completion_history(selected_habit_name):
                         return
                 else:
                     self.view.show_error(
@@ -75,88 +62,191 @@ class CompletionController:
 
     def edit_completion_notes(self):
         """Edit notes for a specific completion."""
-        while True:
-            self.view.show_header("✏️  [bold yellow]Edit Completion Notes[/bold yellow]")
+        self.view.show_header("✏️  [bold yellow]Edit Completion Notes[/bold yellow]")
 
-            # Get all habits
-            habits = self.habit_service.get_all_habits(include_inactive=True)
-            if not habits:
-                self.view.show_no_habits_found()
-                return
+        # Habits and completions are shown a page at a time
+        page = self.habit_service.get_habit_page(include_inactive=True)
+        if not page['habits']:
+            self.view.show_no_habits_found()
+            return
+        start = 1
 
-            # Show habits
+        while True:
+            habits = page['habits']
             habit_tuples = [(h.name, h.periodicity, h.is_active) for h in habits]
-            self.view.show_habits_numbered_list_with_status(habit_tuples)
+            self.view.show_habits_numbered_list_with_status(habit_tuples, start=start)
 
             habit_choice = self.view.get_number_choice(
-                "\nEnter the number of the habit (or 'q' to quit): "
-            )
+                f"\nEnter the number of the habit ({_navigation_hint(page)}'q' to quit): "
+            ).strip().lower()
 
-            if habit_choice.lower() == 'q':
+            if habit_choice == 'q':
                 return
 
+            if habit_choice in ('n', 'p'):
+                page, start = self._turn_habit_page(page, start, habit_choice)
+                continue
+
             try:
                 habit_num = int(habit_choice)
-                if 1 <= habit_num <= len(habits):
-                    selected_habit_name = habits[habit_num - 1].name
+                if start <= habit_num < start + len(habits):
+                    self._edit_notes_of_habit(habits[habit_num - start].name)
+                    return
+                else:
+                    self.view.show_error(
+                        f"Invalid number. Please enter between {start} and {start + len(habits) - 1}."
+                    )
+                    self.view.show_retry_message()
+            except ValueError:
+                self.view.show_error("Invalid input. Please enter a number.")
+                self.view.show_retry_message()
 
-                    # Get completion history
-                    habit_data = self.analytics_service.get_habit_completion_history(selected_habit_name)
+    def _edit_notes_of_habit(self, habit_name: str):
+        """
+        Pages through the completions of a habit and edits the notes of the chosen one.
 
-                    if not habit_data or not habit_data['completions']:
-                        self.view.console.print("\n  [dim]No completions found for this habit.[/dim]\n")
-                        return
+        Args:
+            habit_name: Name of the habit
+        """
+        habit_data = self.analytics_service.get_habit_completion_page(habit_name)
 
-                    # Show completions
-                    self.view.show_habit_completion_history(habit_data)
+        if not habit_data or not habit_data['completions']:
+            self.view.console.print("\n  [dim]No completions found for this habit.[/dim]\n")
+            return
+        start = 1
 
-                    # Ask which completion to edit
-                    completion_choice = self.view.get_number_choice(
-                        "Enter the number of the completion to edit (or 'q' to quit): "
-                    )
+        while True:
+            completions = habit_data['completions']
+            self.view.show_habit_completion_history(habit_data, start=start)
 
-                    if completion_choice.lower() == 'q':
-                        return
+            # Ask which completion to edit
+            completion_choice = self.view.get_number_choice(
+                f"Enter the number of the completion to edit ({_navigation_hint(habit_data)}'q' to quit): "
+            ).strip().lower()
+
+            if completion_choice == 'q':
+                return
+
+            if completion_choice in ('n', 'p'):
+                habit_data, start = self._turn_completion_page(habit_data, start, completion_choice)
+                continue
+
+            try:
+                completion_num = int(completion_choice)
+                if start <= completion_num < start + len(completions):
+                    selected_completion = completions[completion_num - start]
 
-                    try:
-                        completion_num = int(completion_choice)
-                        if 1 <= completion_num <= len(habit_data['completions']):
-                            selected_completion = habit_data['completions'][completion_num - 1]
-
-                            # Show current notes
-                            current_notes = selected_completion['notes'] or "(no notes)"
-                            self.view.console.print(f"\n[bold]Current notes:[/bold] [italic]{current_notes}[/italic]")
-
-                            # Get new notes
-                            new_notes = self.view.console.input("\nEnter new notes (press Enter to clear): ").strip()
-
-                            # Update notes
-                            from services.tracker_service import TrackerService
-                            tracker_service = TrackerService(self.habit_service.repository.db)
-
-                            success, message = tracker_service.update_completion_notes(
-                                selected_completion['event_id'],
-                                new_notes
-                            )
-
-                            if success:
-                                self.view.console.print("\n✅ [green]Notes updated successfully![/green]\n")
-                            else:
-                                self.view.show_error(message)
-                            return
-                        else:
-                            self.view.show_error(
-                                f"Invalid number.  Please enter between 1 and {len(habit_data['completions'])}."
-                            )
-                            self.view.show_retry_message()
-                    except ValueError:
-                        self.view.show_error("Invalid input. Please enter a number.")
-                        self.view.show_retry_message()
+                    # Show current notes
+                    current_notes = selected_completion['notes'] or "(no notes)"
+                    self.view.console.print(f"\n[bold]Current notes:[/bold] [italic]{current_notes}[/italic]")
+
+                    # Get new notes
+                    new_notes = self.view.console.input("\nEnter new notes (press Enter to clear): ").strip()
+
+                    # Update notes
+                    from services.tracker_service import TrackerService
+                    tracker_service = TrackerService(self.habit_service.repository.db)
+
+                    success, message = tracker_service.update_completion_notes(
+                        selected_completion['event_id'],
+                        new_notes
+                    )
+
+                    if success:
+                        self.view.console.print("\n✅ [green]Notes updated successfully![/green]\n")
+                    else:
+                        self.view.show_error(message)
+                    return
                 else:
                     self.view.show_error(
-                        f"Invalid number. Please enter between 1 and {len(habits)}."
+                        f"Invalid number.  Please enter between {start} and {start + len(completions) - 1}."
                     )
                     self.view.show_retry_message()
             except ValueError:
                 self.view.show_error("Invalid input. Please enter a number.")
-                self.view.show_retry_message()
\ No newline at end of file
+                self.view.show_retry_message()
+
+    def _browse_completion_history(self, habit_name: str) -> bool:
+        """
+        Shows the completion history of a habit a page at a time.
+
+        Args:
+            habit_name: Name of the habit
+
+        Returns:
+            False if the user chose to quit, True to return to the completion table
+        """
+        habit_data = self.analytics_service.get_habit_completion_page(habit_name)
+        if not habit_data:
+            self.view.show_error("Habit not found.")
+            return False
+        start = 1
+
+        while True:
+            self.view.show_habit_completion_history(habit_data, start=start)
+
+            choice = self.view.get_confirmation(
+                f"Press Enter to return to completion table ({_navigation_hint(habit_data)}'q' to quit): "
+            ).strip().lower()
+
+            if choice in ('n', 'p'):
+                habit_data, start = self._turn_completion_page(habit_data, start, choice)
+                continue
+            return choice != 'q'
+
+    def _turn_completion_page(self, habit_data: dict, start: int, direction: str) -> Tuple[dict, int]:
+        """
+        Loads the next ('n') or previous ('p') page of a completion history.
+
+        Args:
+            habit_data: Current page
+            start: Number of the first completion on the current page
+            direction: 'n' or 'p'
+
+        Returns:
+            Tuple of (new page, number of its first completion); the current page if there is none
+        """
+        name = habit_data['name']
+        if direction == 'n' and habit_data['next_cursor']:
+            page = self.analytics_service.get_habit_completion_page(name, after=habit_data['next_cursor'])
+            if page and page['completions']:
+                return page, start + len(habit_data['completions'])
+        elif direction == 'p' and habit_data['previous_cursor']:
+            page = self.analytics_service.get_habit_completion_page(name, before=habit_data['previous_cursor'])
+            if page and page['completions']:
+                return page, max(1, start - len(page['completions']))
+        self.view.show_error("There is no such page.")
+        return habit_data, start
+
+    def _turn_habit_page(self, page: dict, start: int, direction: str) -> Tuple[dict, int]:
+        """
+        Loads the next ('n') or previous ('p') page of habits.
+
+        Args:
+            page: Current page
+            start: Number of the first habit on the current page
+            direction: 'n' or 'p'
+
+        Returns:
+            Tuple of (new page, number of its first habit); the current page if there is none
+        """
+        if direction == 'n' and page['next_cursor']:
+            new_page = self.habit_service.get_habit_page(after=page['next_cursor'], include_inactive=True)
+            if new_page['habits']:
+                return new_page, start + len(page['habits'])
+        elif direction == 'p' and page['previous_cursor']:
+            new_page = self.habit_service.get_habit_page(before=page['previous_cursor'], include_inactive=True)
+            if new_page['habits']:
+                return new_page, max(1, start - len(new_page['habits']))
+        self.view.show_error("There is no such page.")
+        return page, start
+
+
+def _navigation_hint(page: dict) -> str:
+    """Returns the page navigation keys available on a page, as a prompt fragment."""
+    hints = []
+    if page['previous_cursor']:
+        hints.append("'p' previous page, ")
+    if page['next_cursor']:
+        hints.append("'n' next page, ")
+    return "".join(hints) or "or "
@@ -14,14 +14,17 @@ from views.console_view import ConsoleView
 class MenuController:
     """Handles main menu navigation"""
 
-    def __init__(self, db):
+    def __init__(self, db, profiler=None):
         """
         Initialize menu controller.
 
         Args:
             db: Database connection
+            profiler: database.profiler.SqlProfiler whose counters are shown
+                      after every action (optional, see --profile-sql)
         """
         self.view = ConsoleView()
+        self.profiler = profiler
 
         # Initialize base controllers
         self.habit_controller = HabitController(db, self.view)
@@ -61,6 +64,11 @@ class MenuController:
                 self.view.show_goodbye()
                 break
             elif choice in menu_actions:
+                if self.profiler:
+                    # Start the action's section afresh
+                    self.profiler.take_section()
                 menu_actions[choice]()
+                if self.profiler:
+                    self.view.show_sql_profile(self.profiler.take_section())
             else:
                 self.view.show_invalid_choice()
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Daemon package - Long-running `serve` process and its thin CLI client
+"""
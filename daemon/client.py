@@ -0,0 +1,44 @@
+"""
+Daemon client - Forwards CLI commands to a running daemon
+"""
+import os
+import socket
+from typing import Optional
+from daemon.protocol import MAX_MESSAGE_BYTES, decode, encode
+
+
+class DaemonError(Exception):
+    """Raised when the daemon reports that a command failed."""
+
+
+def send_request(socket_path: str, command: str, params: dict, timeout: float = 30.0) -> Optional[dict]:
+    """
+    Sends one command to the daemon.
+
+    Args:
+        socket_path: Path of the daemon's Unix socket
+        command: Command name
+        params: Command arguments
+        timeout: Seconds to wait for the response
+
+    Returns:
+        The command result, or None when no daemon is reachable
+
+    Raises:
+        DaemonError: If the daemon could not run the command
+    """
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(socket_path):
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        try:
+            client.connect(socket_path)
+        except OSError:
+            return None  # Stale socket file, no daemon behind it
+        client.sendall(encode({'command': command, 'params': params}))
+        response = decode(client.makefile('rb').readline(MAX_MESSAGE_BYTES))
+
+    if not response.get('ok'):
+        raise DaemonError(response.get('error', 'Unknown daemon error'))
+    return response['result']
@@ -0,0 +1,96 @@
+"""
+Command handlers shared by the daemon and the in-process CLI fallback
+"""
+from datetime import datetime
+
+
+class CommandHandler:
+    """
+    Executes CLI commands against the services and returns plain data for
+    the views to render.
+    """
+
+    # Commands that never modify the database, and whose results can be cached
+    READ_COMMANDS = ('streak', 'champion', 'habit_list')
+
+    def __init__(self, db=None, cache_reads: bool = False):
+        """
+        Initialize handler.
+
+        Args:
+            db: Database connection (optional)
+            cache_reads: Keep results of read commands until the database changes
+        """
+        self.db = db
+        self.cache_reads = cache_reads
+        self._services = {}
+        self._cache = {}
+        self._data_version = None
+
+    def _service(self, name: str):
+        """Returns the named service, creating it on first use."""
+        service = self._services.get(name)
+        if service is None:
+            if name == 'habit':
+                from services.habit_service import HabitService
+                service = HabitService(self.db)
+            elif name == 'tracker':
+                from services.tracker_service import TrackerService
+                service = TrackerService(self.db)
+            else:
+                from services.analytics_service import AnalyticsService
+                service = AnalyticsService(self.db)
+            self._services[name] = service
+        return service
+
+    def handle(self, command: str, params: dict) -> dict:
+        """
+        Runs one command.
+
+        Args:
+            command: 'checkoff', 'streak', 'champion' or 'habit_list'
+            params: Command arguments
+
+        Returns:
+            Result dictionary of the command
+
+        Raises:
+            ValueError: If the command is unknown
+        """
+        method = getattr(self, f"_{command}", None)
+        if command not in self.READ_COMMANDS + ('checkoff',) or method is None:
+            raise ValueError(f"Unknown command '{command}'")
+
+        if not (self.cache_reads and command in self.READ_COMMANDS):
+            self._cache.clear()
+            return method(**params)
+
+        self._check_data_version()
+        key = (command, tuple(sorted(params.items())))
+        if key not in self._cache:
+            self._cache[key] = method(**params)
+        return self._cache[key]
+
+    def _check_data_version(self):
+        """Drops cached results once another connection committed a change."""
+        from database.connection import Database
+        con = Database.resolve(self.db)
+        data_version = con.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._cache.clear()
+            self._data_version = data_version
+
+    def _checkoff(self, name: str, notes: str = "") -> dict:
+        success, message = self._service('tracker').check_off_habit(name, datetime.now(), notes)
+        return {'success': success, 'message': message}
+
+    def _streak(self, name: str) -> dict:
+        return {'name': name, 'longest_streak': self._service('analytics').calculate_longest_streak(name)}
+
+    def _champion(self) -> dict:
+        name, streak = self._service('analytics').get_longest_streak_all_habits()
+        return {'name': name, 'longest_streak': streak}
+
+    def _habit_list(self, show_all: bool = False) -> dict:
+        habits = self._service('habit').get_all_habits(include_inactive=show_all)
+        return {'habits': [[h.name, h.periodicity, h.description, h.is_active] for h in habits]}
@@ -0,0 +1,43 @@
+"""
+Wire protocol between the CLI client and the daemon
+
+One request per connection: the client sends a JSON object on a single line,
+{"command": ..., "params": {...}}, and reads back one JSON line, either
+{"ok": true, "result": {...}} or {"ok": false, "error": "..."}.
+"""
+import json
+
+# Upper bound for a single request or response line
+MAX_MESSAGE_BYTES = 1024 * 1024
+
+
+def encode(message: dict) -> bytes:
+    """
+    Serializes a message as one JSON line.
+
+    Args:
+        message: JSON-serializable dictionary
+
+    Returns:
+        UTF-8 encoded line
+    """
+    return json.dumps(message, separators=(',', ':'), default=str).encode('utf-8') + b'\n'
+
+
+def decode(line: bytes) -> dict:
+    """
+    Parses one JSON line.
+
+    Args:
+        line: UTF-8 encoded line
+
+    Returns:
+        The message dictionary
+
+    Raises:
+        ValueError: If the line is not a JSON object
+    """
+    message = json.loads(line.decode('utf-8'))
+    if not isinstance(message, dict):
+        raise ValueError("Message must be a JSON object")
+    return message
@@ -0,0 +1,79 @@
+"""
+Daemon server - Serves CLI commands over a local Unix socket
+"""
+import os
+import socket
+import socketserver
+from daemon.handlers import CommandHandler
+from daemon.protocol import MAX_MESSAGE_BYTES, decode, encode
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one request line and writes one response line."""
+
+    def handle(self):
+        line = self.rfile.readline(MAX_MESSAGE_BYTES)
+        if not line:
+            return  # Connection probe (see is_listening)
+        try:
+            request = decode(line)
+            result = self.server.command_handler.handle(request['command'], request.get('params') or {})
+            response = {'ok': True, 'result': result}
+        except Exception as e:
+            response = {'ok': False, 'error': str(e)}
+        try:
+            self.wfile.write(encode(response))
+        except BrokenPipeError:
+            pass  # The client gave up waiting
+
+
+class HabitDaemon(socketserver.UnixStreamServer):
+    """
+    Keeps the services, a warm database connection and cached analytics
+    results in one process. Requests are served one at a time on the thread
+    that owns the connection.
+    """
+
+    def __init__(self, socket_path: str, db=None):
+        """
+        Initialize the daemon and bind its socket.
+
+        Args:
+            socket_path: Path of the Unix socket to listen on
+            db: Database connection (optional, must belong to the serving thread)
+
+        Raises:
+            RuntimeError: If another daemon is already listening on socket_path
+        """
+        if os.path.exists(socket_path):
+            if is_listening(socket_path):
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+            os.unlink(socket_path)  # Left behind by a daemon that did not shut down cleanly
+
+        self.socket_path = socket_path
+        self.command_handler = CommandHandler(db, cache_reads=True)
+        super().__init__(socket_path, _RequestHandler)
+
+    def server_close(self):
+        """Closes the socket and removes its file."""
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def is_listening(socket_path: str) -> bool:
+    """
+    Checks whether a daemon accepts connections on a socket.
+
+    Args:
+        socket_path: Path of the Unix socket
+
+    Returns:
+        True if a connection could be opened
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+            return True
+        except OSError:
+            return False
@@ -1,21 +1,135 @@
 """
 Database connection and schema management
 """
+import logging
 import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
 from sqlite3 import Connection
 from config import Config
+from database.streaks import DAY_KEY_SQL, INSERT_STATS_SQL, WEEK_KEY_SQL
+
+logger = logging.getLogger(__name__)
+
+
+class SessionConnection(Connection):
+    """
+    Connection opened by Database.connect. Besides the SQLite session it
+    carries the caches scoped to that session, which are dropped with it.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Per-user identity maps of HabitRepository, keyed by user ID
+        self.identity_maps = {}
 
 
 class Database:
     """Handles database connection and schema"""
 
+    # Per-thread cache of shared connections, keyed by database filename
+    _local = threading.local()
+
+    # Serializes migrations between threads of this process
+    _migration_lock = threading.Lock()
+
+    # Serializes repository writes between threads of this process (see serialized_write)
+    write_lock = threading.RLock()
+
+    # Secondary indexes of the current schema (after the last migration), by name
+    INDEXES = {
+        'idx_habit_user_name': "CREATE UNIQUE INDEX IF NOT EXISTS idx_habit_user_name "
+                               "ON habits(user_id, name COLLATE NOCASE)",
+        'idx_habit_user_periodicity': "CREATE INDEX IF NOT EXISTS idx_habit_user_periodicity "
+                                      "ON habits(user_id, periodicity, created_at, habit_id)",
+        'idx_habit_user_active': "CREATE INDEX IF NOT EXISTS idx_habit_user_active "
+                                 "ON habits(user_id, is_active)",
+        'idx_tracker_habit_date': "CREATE INDEX IF NOT EXISTS idx_tracker_habit_date "
+                                  "ON tracker(habit_id, checked_at)",
+        'idx_tracker_user_date': "CREATE INDEX IF NOT EXISTS idx_tracker_user_date "
+                                 "ON tracker(user_id, checked_at)",
+        'idx_tracker_user_habit_date': "CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_date "
+                                       "ON tracker(user_id, habit_id, checked_at, event_id)",
+        'idx_tracker_user_habit_day': "CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_day "
+                                      "ON tracker(user_id, habit_id, day_key, checked_at)",
+    }
+
     @staticmethod
     def get_connection(db_name: str = None) -> Connection:
         """
-        Creates a connection to the sqlite database.
+        Returns the shared connection of the current thread to the sqlite database.
+        The connection is opened on first use and must not be closed by callers.
+
+        Args:
+            db_name: Database filename (defaults to Config.DATABASE_NAME)
+
+        Returns:
+            SQLite connection object
+        """
+        if db_name is None:
+            db_name = Config.DATABASE_NAME
+
+        connections = getattr(Database._local, 'connections', None)
+        if connections is None:
+            connections = Database._local.connections = {}
+
+        con = connections.get(db_name)
+        if con is None:
+            con = connections[db_name] = Database.connect(db_name)
+        return con
+
+    @staticmethod
+    def database_for(user_id: str = None) -> str:
+        """
+        Returns the database file holding a user's data. Without sharding
+        (Config.SHARD_COUNT = 0) every user lives in Config.DATABASE_NAME;
+        otherwise users are spread over SHARD_COUNT files by a hash of their ID.
+
+        Args:
+            user_id: User ID (defaults to Config.DEFAULT_USER_ID)
+
+        Returns:
+            Database filename
+        """
+        if not Config.SHARD_COUNT:
+            return Config.DATABASE_NAME
+        bucket = zlib.crc32((user_id or Config.DEFAULT_USER_ID).encode()) % Config.SHARD_COUNT
+        path = Path(Config.DATABASE_NAME)
+        return str(path.with_name(f"{path.stem}.shard{bucket:03d}{path.suffix}"))
+
+    @staticmethod
+    def resolve(db=None, user_id: str = None) -> Connection:
+        """
+        Returns the connection a repository should use for the calling thread.
+
+        Args:
+            db: A connection, a provider with a connection() method such as
+                database.provider.ConnectionProvider, or None for the shared
+                connection of the current thread
+            user_id: User whose database file the shared connection opens (see database_for)
+
+        Returns:
+            SQLite connection object
+        """
+        if db is None:
+            return Database.get_connection(Database.database_for(user_id))
+        if isinstance(db, Connection):
+            return db
+        return db.connection()
+
+    @staticmethod
+    def connect(db_name: str = None, check_same_thread: bool = True) -> Connection:
+        """
+        Opens a new, caller-owned connection with the configured pragmas
+        and an up-to-date schema.
 
         Args:
             db_name: Database filename (defaults to Config.DATABASE_NAME)
+            check_same_thread: Passed to sqlite3.connect; only disable it when the
+                               caller guarantees the connection is never used concurrently
 
         Returns:
             SQLite connection object
@@ -23,10 +137,157 @@ class Database:
         if db_name is None:
             db_name = Config.DATABASE_NAME
 
-        con = sqlite3.connect(db_name)
-        Database.create_tables(con)
+        con = sqlite3.connect(db_name, check_same_thread=check_same_thread, factory=SessionConnection)
+        Database.apply_pragmas(con)
+        Database.initialize_schema(con)
         return con
 
+    @staticmethod
+    def connect_read_only(db_name: str = None) -> Connection:
+        """
+        Opens a new, caller-owned read-only connection to an existing database.
+        The schema is not migrated, and the persistent journal_mode is left alone.
+
+        Args:
+            db_name: Database filename (defaults to Config.DATABASE_NAME)
+
+        Returns:
+            SQLite connection object
+        """
+        if db_name is None:
+            db_name = Config.DATABASE_NAME
+
+        con = sqlite3.connect(f"{Path(db_name).resolve().as_uri()}?mode=ro", uri=True, factory=SessionConnection)
+        for pragma, value in Config.DATABASE_PRAGMAS.items():
+            if pragma != 'journal_mode':
+                con.execute(f"PRAGMA {pragma} = {value}")
+        con.execute("PRAGMA query_only = ON")
+        return con
+
+    @staticmethod
+    def close_all():
+        """Closes the shared connections of the current thread."""
+        connections = getattr(Database._local, 'connections', {})
+        for con in connections.values():
+            con.close()
+        connections.clear()
+
+    @staticmethod
+    @contextmanager
+    def bulk_load(con: Connection):
+        """
+        Tunes a connection for loading many rows, then restores it: a larger
+        page cache (Config.BULK_LOAD_PRAGMAS) keeps the index pages being
+        filled in memory, and WAL checkpoints wait until the load is done
+        instead of running every thousand pages.
+
+        Args:
+            con: SQLite connection object
+        """
+        saved = {pragma: con.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in Config.BULK_LOAD_PRAGMAS}
+        for pragma, value in Config.BULK_LOAD_PRAGMAS.items():
+            con.execute(f"PRAGMA {pragma} = {value}")
+        try:
+            yield con
+        finally:
+            for pragma, value in saved.items():
+                con.execute(f"PRAGMA {pragma} = {value}")
+            con.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    @staticmethod
+    @contextmanager
+    def deferred_indexes(con: Connection, table: str):
+        """
+        Drops the secondary indexes of a table and recreates them on exit:
+        building an index from the loaded rows sorts it once, instead of
+        updating it for every inserted row. Foreign keys are not checked
+        meanwhile either, so the loaded rows must reference existing rows.
+        Queries of other connections run without those indexes until the
+        load ends, so this is meant for filling a new database. Should the
+        process die before the exit, the next connection restores them
+        (see restore_indexes).
+
+        Args:
+            con: SQLite connection object, outside a transaction
+            table: Table name
+        """
+        indexes = con.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (table,)
+        ).fetchall()
+        foreign_keys = con.execute("PRAGMA foreign_keys").fetchone()[0]
+        dropped = []
+        try:
+            con.execute("PRAGMA foreign_keys = OFF")
+            for name, sql in indexes:
+                con.execute(f"DROP INDEX {name}")
+                dropped.append(sql)
+            con.commit()
+            yield con
+        finally:
+            try:
+                con.rollback()
+            finally:
+                for sql in dropped:
+                    con.execute(sql)
+                con.commit()
+                con.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+
+    @staticmethod
+    def apply_pragmas(con: Connection):
+        """
+        Applies the tuning pragmas from Config.DATABASE_PRAGMAS.
+
+        Args:
+            con: SQLite connection object
+        """
+        for pragma, value in Config.DATABASE_PRAGMAS.items():
+            con.execute(f"PRAGMA {pragma} = {value}")
+
+    @staticmethod
+    def initialize_schema(con: Connection):
+        """
+        Brings the schema up to date. The version is tracked with PRAGMA user_version,
+        so an up-to-date database costs a single pragma read, plus the index
+        check of restore_indexes.
+
+        Args:
+            con: SQLite connection object
+        """
+        if con.execute("PRAGMA user_version").fetchone()[0] < len(Database.MIGRATIONS):
+            with Database._migration_lock:
+                version = con.execute("PRAGMA user_version").fetchone()[0]
+                for target_version, migration in enumerate(Database.MIGRATIONS, start=1):
+                    if version < target_version:
+                        migration(con)
+                        con.execute(f"PRAGMA user_version = {target_version}")
+                        con.commit()
+
+        Database.restore_indexes(con)
+
+    @staticmethod
+    def restore_indexes(con: Connection):
+        """
+        Recreates the indexes of Database.INDEXES that are missing, e.g. because
+        a load through deferred_indexes was killed before it could rebuild them.
+        Costs one sqlite_master lookup when every index exists.
+
+        Args:
+            con: SQLite connection object
+        """
+        placeholders = ", ".join("?" * len(Database.INDEXES))
+        existing = con.execute(
+            f"SELECT count(*) FROM sqlite_master WHERE type = 'index' AND name IN ({placeholders})",
+            list(Database.INDEXES)
+        ).fetchone()[0]
+        if existing == len(Database.INDEXES):
+            return
+
+        with Database._migration_lock:
+            for sql in Database.INDEXES.values():
+                con.execute(sql)
+            con.commit()
+
     @staticmethod
     def create_tables(con: Connection):
         """
@@ -63,6 +324,8 @@ class Database:
                 habit_id TEXT NOT NULL,
                 checked_at TEXT NOT NULL,
                 notes TEXT DEFAULT '',
+                day_key INTEGER,
+                week_key INTEGER,
                 FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
             )
         """)
@@ -75,8 +338,260 @@ class Database:
 
         # Create an index on checked_at for date-based queries
         cur.execute("""
-            CREATE INDEX IF NOT EXISTS idx_tracker_date 
+            CREATE INDEX IF NOT EXISTS idx_tracker_date
             ON tracker(checked_at)
         """)
 
-        con.commit()
\ No newline at end of file
+        # Databases created before the period key columns existed get them added
+        Database.add_period_keys(con)
+
+        # Table for streak statistics maintained on every check-off
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'habit_stats'")
+        stats_exist = cur.fetchone() is not None
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS habit_stats (
+                habit_id TEXT PRIMARY KEY,
+                current_streak INTEGER NOT NULL DEFAULT 0,
+                longest_streak INTEGER NOT NULL DEFAULT 0,
+                last_period_key INTEGER,
+                total_completions INTEGER NOT NULL DEFAULT 0,
+                last_completion TEXT,
+                FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
+            )
+        """)
+
+        # Databases created before habit_stats existed get their statistics backfilled
+        if not stats_exist:
+            cur.execute(INSERT_STATS_SQL.format(where=""))
+
+        con.commit()
+
+    @staticmethod
+    def add_period_keys(con: Connection):
+        """
+        Adds and backfills the integer day_key / week_key columns of the tracker
+        table, with composite indexes for per-habit period and range queries.
+
+        Args:
+            con: SQLite connection object
+        """
+        cur = con.cursor()
+
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(tracker)")}
+        if 'day_key' not in columns:
+            cur.execute("ALTER TABLE tracker ADD COLUMN day_key INTEGER")
+        if 'week_key' not in columns:
+            cur.execute("ALTER TABLE tracker ADD COLUMN week_key INTEGER")
+
+        day_key = DAY_KEY_SQL.format(column="checked_at")
+        cur.execute(f"""
+            UPDATE tracker
+            SET day_key = {day_key}, week_key = {WEEK_KEY_SQL.format(day_key=day_key)}
+            WHERE day_key IS NULL OR week_key IS NULL
+        """)
+
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_habit_day
+            ON tracker(habit_id, day_key)
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_habit_week
+            ON tracker(habit_id, week_key)
+        """)
+
+        con.commit()
+
+    @staticmethod
+    def redesign_indexes(con: Connection):
+        """
+        Replaces the single-column indexes with composite ones matching the
+        repository queries, and makes habit names unique regardless of case.
+        Habits whose names only differ by case get a numbered suffix first;
+        each rename is logged (INFO) rather than printed, as any connection
+        may run the migration.
+
+        Args:
+            con: SQLite connection object
+        """
+        cur = con.cursor()
+
+        seen = set()
+        for habit_id, name in cur.execute("SELECT habit_id, name FROM habits ORDER BY created_at").fetchall():
+            unique_name, suffix = name, 2
+            while unique_name.lower() in seen:
+                unique_name, suffix = f"{name} ({suffix})", suffix + 1
+            seen.add(unique_name.lower())
+            if unique_name != name:
+                logger.info("Renaming duplicate habit '%s' to '%s'", name, unique_name)
+                cur.execute("UPDATE habits SET name = ? WHERE habit_id = ?", (unique_name, habit_id))
+
+        # Superseded by the composite indexes below
+        cur.execute("DROP INDEX IF EXISTS idx_habit_name")
+        cur.execute("DROP INDEX IF EXISTS idx_tracker_habit")
+        cur.execute("DROP INDEX IF EXISTS idx_tracker_habit_day")
+
+        # Name lookups (find_by_name compares with COLLATE NOCASE)
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_habit_name_nocase
+            ON habits(name COLLATE NOCASE)
+        """)
+
+        # find_by_periodicity: filter and ORDER BY created_at without a sort step
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_habit_periodicity
+            ON habits(periodicity, created_at)
+        """)
+
+        # count(active_only=True)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_habit_active
+            ON habits(is_active)
+        """)
+
+        # Per-habit history in date order, plus covering scans of (habit_id, checked_at)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_habit_date
+            ON tracker(habit_id, checked_at)
+        """)
+
+        # Day-range queries in date order, plus covering scans of (habit_id, day_key)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_habit_day
+            ON tracker(habit_id, day_key, checked_at)
+        """)
+
+        con.commit()
+
+    @staticmethod
+    def add_users(con: Connection):
+        """
+        Adds the users table and a user_id column to habits and tracker.
+        Existing rows belong to Config.DEFAULT_USER_ID. Every index now leads
+        on user_id, so the queries of one user only touch that user's entries
+        and habit names are unique per user.
+
+        Args:
+            con: SQLite connection object
+        """
+        cur = con.cursor()
+
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS users (
+                user_id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            )
+        """)
+        cur.execute(
+            "INSERT OR IGNORE INTO users (user_id, name, created_at) VALUES (?, ?, datetime('now'))",
+            (Config.DEFAULT_USER_ID, Config.DEFAULT_USER_ID)
+        )
+
+        # ALTER TABLE cannot add a REFERENCES column with a non-NULL default while
+        # foreign keys are enforced, so user_id is not a declared foreign key
+        for table in ('habits', 'tracker'):
+            columns = {row[1] for row in cur.execute(f"PRAGMA table_info({table})")}
+            if 'user_id' not in columns:
+                cur.execute(f"""
+                    ALTER TABLE {table} ADD COLUMN user_id TEXT NOT NULL
+                    DEFAULT '{Config.DEFAULT_USER_ID}'
+                """)
+
+        # Superseded by the user-scoped indexes below. idx_tracker_habit_date stays:
+        # habit_stats refreshes and the ON DELETE CASCADE checks look up tracker rows by habit_id
+        for index in ('idx_habit_name_nocase', 'idx_habit_periodicity', 'idx_habit_active',
+                      'idx_tracker_date', 'idx_tracker_habit_day', 'idx_tracker_habit_week'):
+            cur.execute(f"DROP INDEX IF EXISTS {index}")
+
+        # find_by_name / find_by_names_or_ids: names are unique per user, ignoring case
+        cur.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_habit_user_name
+            ON habits(user_id, name COLLATE NOCASE)
+        """)
+
+        # find_by_periodicity: filter and ORDER BY created_at without a sort step
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_habit_user_periodicity
+            ON habits(user_id, periodicity, created_at)
+        """)
+
+        # find_all / count(include_inactive=False)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_habit_user_active
+            ON habits(user_id, is_active)
+        """)
+
+        # find_all: a user's check-offs, newest first
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_user_date
+            ON tracker(user_id, checked_at)
+        """)
+
+        # Per-habit history in date order, plus covering scans of (habit_id, checked_at)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_date
+            ON tracker(user_id, habit_id, checked_at)
+        """)
+
+        # Day-range queries in date order, plus covering scans of (habit_id, day_key)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_day
+            ON tracker(user_id, habit_id, day_key, checked_at)
+        """)
+
+        con.commit()
+
+    @staticmethod
+    def add_keyset_indexes(con: Connection):
+        """
+        Extends the per-habit history and per-periodicity habit indexes with
+        their primary key, so keyset pages ordered by (checked_at, event_id)
+        and (periodicity, created_at, habit_id) are read straight from the
+        index without a sort step.
+
+        Args:
+            con: SQLite connection object
+        """
+        cur = con.cursor()
+
+        # CREATE INDEX IF NOT EXISTS keeps an index of the same name unchanged
+        for index in ('idx_tracker_user_habit_date', 'idx_habit_user_periodicity'):
+            cur.execute(f"DROP INDEX IF EXISTS {index}")
+
+        # find_page / find_by_periodicity: filter and order without a sort step
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_habit_user_periodicity
+            ON habits(user_id, periodicity, created_at, habit_id)
+        """)
+
+        # Per-habit history and its keyset pages in date order, plus covering scans of (habit_id, checked_at)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_date
+            ON tracker(user_id, habit_id, checked_at, event_id)
+        """)
+
+        con.commit()
+
+
+def serialized_write(method):
+    """
+    Decorates a repository method that writes, so that threads of this
+    process run their write transactions one at a time instead of
+    failing with 'database is locked'.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with Database.write_lock:
+            return method(*args, **kwargs)
+    return wrapper
+
+
+# Ordered schema migrations: entry N brings a database to user_version N
+Database.MIGRATIONS = [
+    Database.create_tables,
+    Database.add_period_keys,
+    Database.redesign_indexes,
+    Database.add_users,
+    Database.add_keyset_indexes,
+]
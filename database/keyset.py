@@ -0,0 +1,57 @@
+"""
+Keyset pagination - SQL fragments for seeking pages along an index
+"""
+from typing import Optional, Sequence, Tuple
+
+
+def keyset_clause(
+        columns: Sequence[str],
+        after: Optional[Sequence] = None,
+        before: Optional[Sequence] = None
+) -> Tuple[str, str, list, bool]:
+    """
+    Builds the seek condition and ordering of one page.
+
+    A page continues after (or ends before) the cursor, which holds the
+    values of the columns in the last (or first) row of the adjacent page.
+    The row-value comparison lets SQLite seek straight to the cursor in an
+    index on the columns, so every page costs the same however deep it is.
+    Pages before a cursor are read backwards; reverse their rows.
+
+    Args:
+        columns: Ordering columns, ending with a unique key
+        after: Cursor of the previous page (optional)
+        before: Cursor of the next page (optional, ignored with after)
+
+    Returns:
+        Tuple of (condition starting with AND or empty, ORDER BY list, condition params, reverse)
+    """
+    row = f"({', '.join(columns)})"
+    placeholders = f"({', '.join('?' * len(columns))})"
+
+    if after is not None:
+        return f"AND {row} > {placeholders}", ", ".join(columns), list(after), False
+    if before is not None:
+        descending = ", ".join(f"{column} DESC" for column in columns)
+        return f"AND {row} < {placeholders}", descending, list(before), True
+    return "", ", ".join(columns), [], False
+
+
+def trim_page(rows: list, page_size: int, after=None, before=None) -> Tuple[list, bool, bool]:
+    """
+    Trims the page_size + 1 rows fetched for a page to page_size rows.
+    The extra row tells whether there is another page in the reading direction.
+
+    Args:
+        rows: Rows of the page in display order, at most page_size + 1
+        page_size: Rows per page
+        after: Cursor the page was read after (optional)
+        before: Cursor the page was read before (optional)
+
+    Returns:
+        Tuple of (page rows, has_previous, has_next)
+    """
+    more = len(rows) > page_size
+    if after is None and before is not None:
+        return rows[-page_size:] if more else rows, more, True
+    return rows[:page_size], after is not None, more
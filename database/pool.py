@@ -0,0 +1,82 @@
+"""
+Connection pool with a read/write split for concurrent callers
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+from config import Config
+from database.provider import ConnectionProvider
+
+
+class ConnectionPool:
+    """
+    Runs database work on bounded thread pools: a single writer thread, so
+    check-offs and edits are serialized, and several reader threads, so
+    analytics reads never wait for each other. Every thread owns one
+    connection to the same WAL database; reader connections are query-only.
+    """
+
+    def __init__(self, db_name: str = None, readers: int = None):
+        """
+        Initialize pool.
+
+        Args:
+            db_name: Database filename (defaults to Config.DATABASE_NAME)
+            readers: Number of reader threads (defaults to Config.POOL_READERS)
+        """
+        self.db_name = db_name or Config.DATABASE_NAME
+        self._write_connections = ConnectionProvider(self.db_name)
+        self._read_connections = ConnectionProvider(self.db_name, read_only=True)
+
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers or Config.POOL_READERS, thread_name_prefix="db-reader"
+        )
+
+    def _call(self, read_only: bool, fn: Callable, args: tuple) -> Any:
+        provider = self._read_connections if read_only else self._write_connections
+        return fn(provider.connection(), *args)
+
+    def run_read(self, fn: Callable, *args) -> Any:
+        """
+        Runs fn(connection, *args) on a reader thread and waits for the result.
+
+        Args:
+            fn: Callable taking a connection as its first argument
+            *args: Further arguments
+
+        Returns:
+            The return value of fn
+        """
+        return self._readers.submit(self._call, True, fn, args).result()
+
+    def run_write(self, fn: Callable, *args) -> Any:
+        """
+        Runs fn(connection, *args) on the writer thread and waits for the result.
+
+        Args:
+            fn: Callable taking a connection as its first argument
+            *args: Further arguments
+
+        Returns:
+            The return value of fn
+        """
+        return self._writer.submit(self._call, False, fn, args).result()
+
+    async def read(self, fn: Callable, *args) -> Any:
+        """Awaitable variant of run_read() for asyncio callers."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(self._call, True, fn, args))
+
+    async def write(self, fn: Callable, *args) -> Any:
+        """Awaitable variant of run_write() for asyncio callers."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, partial(self._call, False, fn, args))
+
+    def close(self):
+        """Waits for pending work, then closes every connection of the pool."""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        self._write_connections.close_all()
+        self._read_connections.close_all()
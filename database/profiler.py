@@ -0,0 +1,345 @@
+"""
+SQL profiler - Counts the statements, rows and time of repository operations
+"""
+import functools
+import inspect
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlite3 import Connection
+from typing import Dict, Iterator, List, Optional
+
+# Operation that statements run outside any repository method are counted under
+OTHER_OPERATION = "(other)"
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\?(?:, \?)+")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Returns the shape of a traced statement: the trace callback sees the
+    bound values expanded, so literals become '?' and whitespace and
+    parameter lists are collapsed, making statements comparable across runs.
+
+    Args:
+        sql: Statement as passed to the trace callback
+
+    Returns:
+        Normalized statement
+    """
+    sql = _LITERAL.sub("?", " ".join(sql.split()))
+    return _PARAMETER_LIST.sub("?, ...", sql)
+
+
+class OperationStats:
+    """Counters of one operation: calls, statements, rows and wall time."""
+
+    __slots__ = ('calls', 'queries', 'rows', 'seconds')
+
+    def __init__(self):
+        self.calls = 0
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        """Returns the counters as a JSON-serializable dictionary."""
+        return {
+            'calls': self.calls,
+            'queries': self.queries,
+            'rows': self.rows,
+            'ms': round(self.seconds * 1000, 3)
+        }
+
+
+class Profile:
+    """Operation and statement counters collected over some span of work."""
+
+    def __init__(self):
+        self.operations: Dict[str, OperationStats] = {}
+        self.statements: Dict[str, int] = {}
+        # Calls and wall time of the outermost operations, so nested calls are not counted twice
+        self.calls = 0
+        self.seconds = 0.0
+
+    def operation(self, name: str) -> OperationStats:
+        """Returns the counters of an operation, creating them on first use."""
+        stats = self.operations.get(name)
+        if stats is None:
+            stats = self.operations[name] = OperationStats()
+        return stats
+
+    def totals(self) -> dict:
+        """
+        Returns the totals over all operations.
+
+        Returns:
+            Dictionary with calls, queries, rows and ms; calls and time are
+            those of the outermost repository methods, and time spent in
+            statements outside repository methods is not measured
+        """
+        total = OperationStats()
+        for stats in self.operations.values():
+            total.queries += stats.queries
+            total.rows += stats.rows
+        total.calls = self.calls
+        total.seconds = self.seconds
+        return total.to_dict()
+
+    def to_dict(self) -> dict:
+        """
+        Returns the profile as a JSON-serializable dictionary, with the
+        operations sorted by name and the statements by count.
+        """
+        return {
+            'totals': self.totals(),
+            'operations': {name: self.operations[name].to_dict() for name in sorted(self.operations)},
+            'statements': [
+                {'sql': sql, 'count': count}
+                for sql, count in sorted(self.statements.items(), key=lambda item: (-item[1], item[0]))
+            ]
+        }
+
+
+class SqlProfiler:
+    """
+    Records what the repositories ask of SQLite. Every statement of the
+    traced connections (see attach) is counted against the repository
+    method running it on the same thread, and install() wraps the public
+    repository methods to count their calls, rows and wall time.
+
+    Rows are those returned (list or dict length, one per object,
+    iterators counted as they are consumed) plus those changed by the
+    connection. Counters accumulate in a total profile and in a section
+    that take_section() hands out and restarts, e.g. per menu action.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._patched = []
+        self._connections = []
+        self.total = Profile()
+        self.section = Profile()
+
+    # ============ Setup ============
+
+    def attach(self, con):
+        """
+        Traces the statements of a connection, replacing any other trace callback.
+
+        Args:
+            con: SQLite connection object
+        """
+        con.set_trace_callback(self._on_statement)
+        self._connections.append(con)
+
+    def install(self, classes: List[type] = None):
+        """
+        Wraps the public methods of repository classes. Undone by uninstall().
+
+        Args:
+            classes: Classes to wrap (defaults to every repository of the repositories package)
+        """
+        if classes is None:
+            from repositories import HabitRepository, HabitStatsRepository, TrackerRepository, UserRepository
+            classes = [HabitRepository, TrackerRepository, HabitStatsRepository, UserRepository]
+
+        for cls in classes:
+            for name, member in list(vars(cls).items()):
+                if name.startswith('_') or not inspect.isfunction(member):
+                    continue
+                self._patched.append((cls, name, member))
+                setattr(cls, name, self._wrap(f"{cls.__name__}.{name}", member))
+
+    def uninstall(self):
+        """Restores the wrapped methods and stops tracing the attached connections."""
+        for cls, name, member in reversed(self._patched):
+            setattr(cls, name, member)
+        self._patched.clear()
+        for con in self._connections:
+            try:
+                con.set_trace_callback(None)
+            except Exception:
+                pass  # Already closed
+        self._connections.clear()
+
+    # ============ Results ============
+
+    def take_section(self) -> Profile:
+        """
+        Returns the counters collected since the previous call and starts a new section.
+
+        Returns:
+            Profile of the section
+        """
+        with self._lock:
+            section, self.section = self.section, Profile()
+        return section
+
+    def report(self, **metadata) -> dict:
+        """
+        Returns the report of everything recorded, for regression tracking.
+
+        Args:
+            **metadata: Extra top-level fields, such as the command that ran
+
+        Returns:
+            JSON-serializable dictionary
+        """
+        with self._lock:
+            report = self.total.to_dict()
+        return {'created_at': datetime.now().isoformat(timespec='seconds'), **metadata, **report}
+
+    def write_report(self, path: str, **metadata):
+        """
+        Writes report() to a JSON file.
+
+        Args:
+            path: Output file name
+            **metadata: See report()
+        """
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(self.report(**metadata), stream, indent=2)
+            stream.write("\n")
+
+    # ============ Recording ============
+
+    def _stack(self) -> list:
+        """Returns the operations running on the current thread, innermost last."""
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _on_statement(self, sql: str):
+        stack = self._stack()
+        name = stack[-1] if stack else OTHER_OPERATION
+        sql = normalize_sql(sql)
+        with self._lock:
+            for profile in (self.total, self.section):
+                profile.operation(name).queries += 1
+                profile.statements[sql] = profile.statements.get(sql, 0) + 1
+
+    def _record(self, name: str, calls: int, rows: int, seconds: float):
+        outermost = not self._stack()
+        with self._lock:
+            for profile in (self.total, self.section):
+                stats = profile.operation(name)
+                stats.calls += calls
+                stats.rows += rows
+                stats.seconds += seconds
+                if outermost:
+                    profile.calls += calls
+                    profile.seconds += seconds
+
+    @contextmanager
+    def _running(self, name: str):
+        """Attributes the statements of the current thread to an operation while it runs."""
+        stack = self._stack()
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def _wrap(self, name: str, method):
+        profiler = self
+
+        @functools.wraps(method)
+        def wrapper(repository, *args, **kwargs):
+            con = profiler._connection_of(repository)
+            changes = con.total_changes if con is not None else 0
+            started = time.perf_counter()
+            with profiler._running(name):
+                result = method(repository, *args, **kwargs)
+            seconds = time.perf_counter() - started
+            changed = con.total_changes - changes if con is not None else 0
+
+            if isinstance(result, Iterator):
+                profiler._record(name, 1, changed, seconds)
+                return profiler._counted(name, result)
+            profiler._record(name, 1, _returned_rows(result) + changed, seconds)
+            return result
+
+        return wrapper
+
+    def _counted(self, name: str, rows: Iterator) -> Iterator:
+        """Passes an iterator's rows through, attributing the work of each step to the operation."""
+        while True:
+            started = time.perf_counter()
+            with self._running(name):
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    self._record(name, 0, 0, time.perf_counter() - started)
+                    return
+            self._record(name, 0, 1, time.perf_counter() - started)
+            yield row
+
+    @staticmethod
+    def _connection_of(repository) -> Optional[Connection]:
+        """
+        Returns the connection a repository works on, None for connection
+        providers, whose connection is only checked out by the method itself.
+        """
+        db = getattr(repository, 'db', None)
+        if db is not None and not isinstance(db, Connection):
+            return None
+        from database.connection import Database
+        return Database.resolve(db, getattr(repository, 'user_id', None))
+
+
+def _returned_rows(result) -> int:
+    """Returns the number of rows a repository method returned."""
+    if result is None or isinstance(result, bool):
+        return 0
+    if isinstance(result, (list, tuple, dict, set)):
+        return len(result)
+    return 1
+
+
+# Profiler enabled by the --profile-sql option, None otherwise
+_active: Optional[SqlProfiler] = None
+
+
+def start_profiling(*connections) -> SqlProfiler:
+    """
+    Starts profiling the repositories and traces the given connections.
+
+    Args:
+        *connections: SQLite connections to trace
+
+    Returns:
+        The active SqlProfiler
+    """
+    global _active
+    if _active is None:
+        _active = SqlProfiler()
+        _active.install()
+    for con in connections:
+        _active.attach(con)
+    return _active
+
+
+def stop_profiling() -> Optional[SqlProfiler]:
+    """
+    Stops profiling, restoring the repositories.
+
+    Returns:
+        The profiler that was active (its counters are kept), or None
+    """
+    global _active
+    profiler, _active = _active, None
+    if profiler is not None:
+        profiler.uninstall()
+    return profiler
+
+
+def active_profiler() -> Optional[SqlProfiler]:
+    """Returns the active SqlProfiler, None when SQL is not being profiled."""
+    return _active
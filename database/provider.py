@@ -0,0 +1,62 @@
+"""
+Thread-aware connection provider for repositories shared between threads
+"""
+import threading
+from sqlite3 import Connection
+from typing import List
+from config import Config
+from database.connection import Database
+
+
+class ConnectionProvider:
+    """
+    Hands every thread its own connection to the same WAL database.
+
+    Pass a provider instead of a connection to the repositories and services,
+    and they can be shared by any number of threads: reads run concurrently
+    on the per-thread connections, while writes are serialized through
+    Database.write_lock by the repositories' write methods.
+    """
+
+    def __init__(self, db_name: str = None, read_only: bool = False):
+        """
+        Initialize provider.
+
+        Args:
+            db_name: Database filename (defaults to Config.DATABASE_NAME)
+            read_only: Open query-only connections
+        """
+        self.db_name = db_name or Config.DATABASE_NAME
+        self.read_only = read_only
+        self._local = threading.local()
+        self._connections: List[Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Bring the schema up to date once, before the threads open their connections
+        Database.connect(self.db_name).close()
+
+    def connection(self) -> Connection:
+        """
+        Returns the connection of the calling thread, opening it on first use.
+
+        Returns:
+            SQLite connection object
+        """
+        con = getattr(self._local, 'connection', None)
+        if con is None:
+            # Closed by close_all(), possibly from another thread once this one is done
+            con = Database.connect(self.db_name, check_same_thread=False)
+            if self.read_only:
+                con.execute("PRAGMA query_only = ON")
+            self._local.connection = con
+            with self._connections_lock:
+                self._connections.append(con)
+        return con
+
+    def close_all(self):
+        """Closes the connections of all threads. Call it once the threads are done."""
+        with self._connections_lock:
+            for con in self._connections:
+                con.close()
+            self._connections.clear()
+        self._local = threading.local()
@@ -0,0 +1,135 @@
+"""
+Period keys and streak SQL shared by the repositories
+"""
+from datetime import date, datetime
+
+# Ordinal of 1970-01-01, the origin of the day keys
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def day_key(checked_at: datetime) -> int:
+    """
+    Returns the number of days since 1970-01-01.
+
+    Args:
+        checked_at: Completion timestamp
+    """
+    return checked_at.toordinal() - EPOCH_ORDINAL
+
+
+def week_key(checked_at: datetime) -> int:
+    """
+    Returns the number of ISO weeks (starting on Monday) since 1970-01-01.
+
+    Args:
+        checked_at: Completion timestamp
+    """
+    # 1970-01-05 (day key 4) is the first Monday, so Monday keys + 3 are multiples of 7
+    return (day_key(checked_at) - checked_at.weekday() + 3) // 7
+
+
+def period_key(checked_at: datetime, periodicity: str) -> int:
+    """
+    Maps a timestamp to an integer period: consecutive periods differ by one.
+
+    Args:
+        checked_at: Completion timestamp
+        periodicity: 'daily' or 'weekly'
+    """
+    return day_key(checked_at) if periodicity == 'daily' else week_key(checked_at)
+
+
+# SQL mirror of day_key() for an ISO timestamp column
+DAY_KEY_SQL = "CAST(julianday(date({column})) - 2440587.5 AS INTEGER)"
+
+# SQL mirror of week_key() for a day_key expression: 1970-01-01 was a Thursday,
+# so shifting by 3 days makes every week start on a Monday
+WEEK_KEY_SQL = "(({day_key}) + 3) / 7"
+
+# SQL mirror of period_key() for a timestamp `t.checked_at` and its habit `h`
+PERIOD_SQL = """
+    CASE h.periodicity
+        WHEN 'daily' THEN CAST(julianday(date(t.checked_at)) - 2440587.5 AS INTEGER)
+        ELSE (CAST(julianday(date(t.checked_at, 'weekday 0', '-6 days')) - 2440587.5 AS INTEGER) + 3) / 7
+    END
+"""
+
+# Stored period key of a tracker row `t` joined with its habit `h`
+PERIOD_COLUMN_SQL = "CASE h.periodicity WHEN 'daily' THEN t.day_key ELSE t.week_key END"
+
+# Gaps-and-islands: within one habit, period - ROW_NUMBER() is constant along a streak
+ISLANDS_SQL = f"""
+    periods AS (
+        SELECT DISTINCT t.habit_id, {PERIOD_COLUMN_SQL} AS period
+        FROM tracker t
+        INNER JOIN habits h ON t.habit_id = h.habit_id
+        {{where}}
+    ),
+    islands AS (
+        SELECT habit_id, period,
+               period - ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY period) AS island
+        FROM periods
+    ),
+    streaks AS (
+        SELECT habit_id, COUNT(*) AS streak, MAX(period) AS end_period
+        FROM islands
+        GROUP BY habit_id, island
+    )
+"""
+
+# Longest streak per habit: (habit_id, longest_streak)
+LONGEST_STREAKS_SQL = f"""
+    WITH {ISLANDS_SQL}
+    SELECT habit_id, MAX(streak)
+    FROM streaks
+    GROUP BY habit_id
+"""
+
+# Full habit_stats rows computed from the tracker table:
+# (habit_id, current_streak, longest_streak, last_period_key, total_completions, last_completion).
+# The totals are correlated index lookups: joining a grouped CTE would rescan it for every habit.
+STATS_SQL = f"""
+    WITH {ISLANDS_SQL},
+    ranked AS (
+        SELECT habit_id, streak, end_period,
+               MAX(streak) OVER (PARTITION BY habit_id) AS longest_streak,
+               ROW_NUMBER() OVER (PARTITION BY habit_id ORDER BY end_period DESC) AS position
+        FROM streaks
+    )
+    SELECT r.habit_id, r.streak, r.longest_streak, r.end_period,
+           (SELECT COUNT(*) FROM tracker t WHERE t.habit_id = r.habit_id),
+           (SELECT MAX(t.checked_at) FROM tracker t WHERE t.habit_id = r.habit_id)
+    FROM ranked r
+    WHERE r.position = 1
+"""
+
+# Folds one new check-off into habit_stats. The update is skipped (rowcount 0)
+# when the check-off lies before the last recorded period: that needs a full refresh.
+APPLY_CHECK_OFF_SQL = f"""
+    INSERT INTO habit_stats (habit_id, current_streak, longest_streak, last_period_key,
+                             total_completions, last_completion)
+    SELECT h.habit_id, 1, 1, {PERIOD_SQL}, 1, t.checked_at
+    FROM habits h, (SELECT :checked_at AS checked_at) t
+    WHERE h.habit_id = :habit_id
+    ON CONFLICT (habit_id) DO UPDATE SET
+        current_streak = CASE
+            WHEN excluded.last_period_key = habit_stats.last_period_key THEN habit_stats.current_streak
+            WHEN excluded.last_period_key = habit_stats.last_period_key + 1 THEN habit_stats.current_streak + 1
+            ELSE 1
+        END,
+        longest_streak = MAX(habit_stats.longest_streak, CASE
+            WHEN excluded.last_period_key = habit_stats.last_period_key + 1 THEN habit_stats.current_streak + 1
+            ELSE 1
+        END),
+        last_period_key = excluded.last_period_key,
+        total_completions = habit_stats.total_completions + 1,
+        last_completion = MAX(habit_stats.last_completion, excluded.last_completion)
+    WHERE excluded.last_period_key >= habit_stats.last_period_key
+"""
+
+# Recomputes habit_stats rows from the tracker table
+INSERT_STATS_SQL = f"""
+    INSERT INTO habit_stats (habit_id, current_streak, longest_streak, last_period_key,
+                             total_completions, last_completion)
+    {STATS_SQL}
+"""
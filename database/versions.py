@@ -0,0 +1,55 @@
+"""
+Write versions - Counters of committed repository writes, for cache invalidation
+"""
+import threading
+from typing import Tuple
+
+
+class WriteVersions:
+    """
+    Process-wide counters bumped by the repositories after every committed
+    write. A cached result stays valid while the counters it was computed
+    under are unchanged:
+    - total: any write at all (results over every habit)
+    - structure: writes to habits, or writes whose habit is not known
+      without a query (results of every single habit, name lookups)
+    - per habit: check-offs of that habit
+    Writes committed by other connections are not counted here; readers
+    detect those with PRAGMA data_version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.structure = 0
+        self._habits = {}
+
+    def bump(self, habit_id: str = None):
+        """
+        Records a committed write.
+
+        Args:
+            habit_id: Habit whose check-offs changed, None for any other write
+        """
+        with self._lock:
+            self.total += 1
+            if habit_id is None:
+                self.structure += 1
+            else:
+                self._habits[habit_id] = self._habits.get(habit_id, 0) + 1
+
+    def habit_version(self, habit_id: str) -> Tuple[int, int]:
+        """
+        Returns the version a result about one habit was computed under.
+
+        Args:
+            habit_id: Habit ID
+
+        Returns:
+            Tuple of (structure counter, habit counter)
+        """
+        return self.structure, self._habits.get(habit_id, 0)
+
+
+# Shared by every repository of this process
+write_versions = WriteVersions()
@@ -3,5 +3,7 @@ Models package - Pure data structures
 """
 from models.habit import Habit
 from models.tracker import TrackerEvent
+from models.habit_stats import HabitStats
+from models.user import User
 
-__all__ = ['Habit', 'TrackerEvent']
\ No newline at end of file
+__all__ = ['Habit', 'TrackerEvent', 'HabitStats', 'User']
\ No newline at end of file
@@ -1,36 +1,78 @@
 """
 Pure Habit data model (DTO - Data Transfer Object)
 """
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 import uuid
 
 
-@dataclass
 class Habit:
     """
     Represents a habit entity.
     This is a pure data class with no business logic.
+
+    Uses __slots__ instead of a per-instance dict, and keeps timestamps loaded
+    from the database as ISO strings until they are first read.
     """
-    name: str
-    periodicity: str
-    habit_id: Optional[str] = None
-    created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None
-    is_active: bool = True
-    description: str = ""
+    __slots__ = (
+        'name', 'periodicity', 'habit_id', 'is_active', 'description',
+        '_created_at', '_created_at_iso', '_updated_at', '_updated_at_iso'
+    )
+
+    def __init__(
+        self,
+        name: str,
+        periodicity: str,
+        habit_id: Optional[str] = None,
+        created_at: Union[datetime, str, None] = None,
+        updated_at: Union[datetime, str, None] = None,
+        is_active: bool = True,
+        description: str = ""
+    ):
+        self.name = name
+        self.periodicity = periodicity
+        self.is_active = is_active
+        self.description = description
+
+        # Set default values if not provided
+        self.habit_id = habit_id if habit_id is not None else str(uuid.uuid4())
+        self.created_at = created_at if created_at is not None else datetime.now()
+        self.updated_at = updated_at if updated_at is not None else datetime.now()
+
+    @property
+    def created_at(self) -> datetime:
+        """Creation timestamp, parsed on first access"""
+        if self._created_at is None:
+            self._created_at = datetime.fromisoformat(self._created_at_iso)
+        return self._created_at
+
+    @created_at.setter
+    def created_at(self, value: Union[datetime, str]):
+        if isinstance(value, str):
+            self._created_at, self._created_at_iso = None, value
+        else:
+            self._created_at, self._created_at_iso = value, None
 
-    def __post_init__(self):
-        """Set default values if not provided"""
-        if self.habit_id is None:
-            self.habit_id = str(uuid.uuid4())
+    @property
+    def created_at_iso(self) -> str:
+        """Creation timestamp as an ISO string, without parsing it"""
+        if self._created_at_iso is None:
+            self._created_at_iso = self._created_at.isoformat()
+        return self._created_at_iso
 
-        if self.created_at is None:
-            self.created_at = datetime.now()
+    @property
+    def updated_at(self) -> datetime:
+        """Last update timestamp, parsed on first access"""
+        if self._updated_at is None:
+            self._updated_at = datetime.fromisoformat(self._updated_at_iso)
+        return self._updated_at
 
-        if self.updated_at is None:
-            self.updated_at = datetime.now()
+    @updated_at.setter
+    def updated_at(self, value: Union[datetime, str]):
+        if isinstance(value, str):
+            self._updated_at, self._updated_at_iso = None, value
+        else:
+            self._updated_at, self._updated_at_iso = value, None
 
     def to_dict(self) -> dict:
         """Convert to dictionary for serialization"""
@@ -51,8 +93,8 @@ class Habit:
             habit_id=data.get('habit_id'),
             name=data['name'],
             periodicity=data['periodicity'],
-            created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else None,
-            updated_at=datetime.fromisoformat(data['updated_at']) if data.get('updated_at') else None,
+            created_at=data.get('created_at') or None,
+            updated_at=data.get('updated_at') or None,
             is_active=data.get('is_active', True),
             description=data.get('description', ''),
         )
@@ -63,12 +105,21 @@ class Habit:
         Create from a database tuple.
         Expected format: (habit_id, name, periodicity, created_at, updated_at, is_active, description)
         """
+        if len(data) == 7 and all(value is not None for value in data[:5]):
+            # Fast path for complete rows: skip __init__ and keep the ISO strings
+            habit = object.__new__(cls)
+            (habit.habit_id, habit.name, habit.periodicity, habit._created_at_iso,
+             habit._updated_at_iso, is_active, habit.description) = data
+            habit.is_active = bool(is_active)
+            habit._created_at = habit._updated_at = None
+            return habit
+
         return cls(
             habit_id=data[0] if len(data) > 0 else None,
             name=data[1] if len(data) > 1 else "",
             periodicity=data[2] if len(data) > 2 else "daily",
-            created_at=datetime.fromisoformat(data[3]) if len(data) > 3 and data[3] else None,
-            updated_at=datetime.fromisoformat(data[4]) if len(data) > 4 and data[4] else None,
+            created_at=data[3] if len(data) > 3 and data[3] else None,
+            updated_at=data[4] if len(data) > 4 and data[4] else None,
             is_active=bool(data[5]) if len(data) > 5 else True,
             description=data[6] if len(data) > 6 else "",
         )
@@ -77,6 +128,16 @@ class Habit:
         """Update the updated_at timestamp"""
         self.updated_at = datetime.now()
 
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field)
+            for field in ('name', 'periodicity', 'habit_id', 'created_at', 'updated_at', 'is_active', 'description')
+        )
+
+    __hash__ = None  # Mutable, like the dataclass it replaces
+
     def __str__(self):
         status = "Active" if self.is_active else "Inactive"
         return f"{self.name} ({self.periodicity}) - {status}"
@@ -0,0 +1,42 @@
+"""
+Pure Habit statistics data model (DTO)
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class HabitStats:
+    """
+    Precomputed streak statistics of a habit.
+    This is a pure data class with no business logic.
+    """
+    habit_id: str
+    current_streak: int = 0
+    longest_streak: int = 0
+    last_period_key: Optional[int] = None
+    total_completions: int = 0
+    last_completion: Optional[datetime] = None
+
+    @classmethod
+    def from_tuple(cls, data: tuple) -> 'HabitStats':
+        """
+        Create from a database tuple.
+        Expected format: (habit_id, current_streak, longest_streak, last_period_key,
+                          total_completions, last_completion)
+        """
+        return cls(
+            habit_id=data[0],
+            current_streak=data[1],
+            longest_streak=data[2],
+            last_period_key=data[3],
+            total_completions=data[4],
+            last_completion=datetime.fromisoformat(data[5]) if data[5] else None
+        )
+
+    def __repr__(self):
+        return (
+            f"HabitStats(habit_id={self.habit_id}, current={self.current_streak}, "
+            f"longest={self.longest_streak}, total={self.total_completions})"
+        )
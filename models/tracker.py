@@ -1,34 +1,61 @@
 """
 Pure Tracker data model (DTO)
 """
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 import uuid
 
 
-@dataclass
 class TrackerEvent:
     """
     Represents a single check-off event.
     This is a pure data class with no business logic.
+
+    Uses __slots__ instead of a per-instance dict, and keeps timestamps loaded
+    from the database as ISO strings until checked_at is first read.
     """
-    habit_id: str
-    checked_at: datetime
-    event_id: Optional[str] = None
-    notes: str = ""
+    __slots__ = ('habit_id', 'event_id', 'notes', '_checked_at', '_checked_at_iso')
+
+    def __init__(
+        self,
+        habit_id: str,
+        checked_at: Union[datetime, str],
+        event_id: Optional[str] = None,
+        notes: str = ""
+    ):
+        self.habit_id = habit_id
+        self.checked_at = checked_at
+        # Set default event_id if not provided
+        self.event_id = event_id if event_id is not None else str(uuid.uuid4())
+        self.notes = notes
+
+    @property
+    def checked_at(self) -> datetime:
+        """Completion timestamp, parsed on first access"""
+        if self._checked_at is None:
+            self._checked_at = datetime.fromisoformat(self._checked_at_iso)
+        return self._checked_at
+
+    @checked_at.setter
+    def checked_at(self, value: Union[datetime, str]):
+        if isinstance(value, str):
+            self._checked_at, self._checked_at_iso = None, value
+        else:
+            self._checked_at, self._checked_at_iso = value, None
 
-    def __post_init__(self):
-        """Set default event_id if not provided"""
-        if self.event_id is None:
-            self.event_id = str(uuid.uuid4())
+    @property
+    def checked_at_iso(self) -> str:
+        """Completion timestamp as an ISO string, without parsing it"""
+        if self._checked_at_iso is None:
+            self._checked_at_iso = self._checked_at.isoformat()
+        return self._checked_at_iso
 
     def to_dict(self) -> dict:
         """Convert to dictionary for serialization"""
         return {
             'event_id': self.event_id,
             'habit_id': self. habit_id,
-            'checked_at': self.checked_at.isoformat(),
+            'checked_at': self.checked_at_iso,
             'notes': self.notes
         }
 
@@ -38,7 +65,7 @@ class TrackerEvent:
         return cls(
             event_id=data.get('event_id'),
             habit_id=data['habit_id'],
-            checked_at=datetime.fromisoformat(data['checked_at']),
+            checked_at=data['checked_at'],
             notes=data.get('notes', '')
         )
 
@@ -48,15 +75,32 @@ class TrackerEvent:
         Create from a database tuple.
         Expected format: (event_id, habit_id, checked_at, notes)
         """
+        if len(data) == 4 and data[0] is not None:
+            # Fast path for complete rows: skip __init__ and keep the ISO string
+            event = object.__new__(cls)
+            event.event_id, event.habit_id, event._checked_at_iso, event.notes = data
+            event._checked_at = None
+            return event
+
         return cls(
             event_id=data[0] if len(data) > 0 else None,
             habit_id=data[1] if len(data) > 1 else "",
-            checked_at=datetime. fromisoformat(data[2]) if len(data) > 2 else datetime.now(),
+            checked_at=data[2] if len(data) > 2 else datetime.now(),
             notes=data[3] if len(data) > 3 else ""
         )
 
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            (self.habit_id, self.checked_at, self.event_id, self.notes)
+            == (other.habit_id, other.checked_at, other.event_id, other.notes)
+        )
+
+    __hash__ = None  # Mutable, like the dataclass it replaces
+
     def __str__(self):
         return f"Completion at {self.checked_at.strftime('%Y-%m-%d %H:%M')}"
 
     def __repr__(self):
-        return f"TrackerEvent(id={self.event_id}, habit_id={self.habit_id}, checked_at={self.checked_at})"
\ No newline at end of file
+        return f"TrackerEvent(id={self.event_id}, habit_id={self.habit_id}, checked_at={self.checked_at})"
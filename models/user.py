@@ -0,0 +1,25 @@
+"""
+Pure User data model (DTO)
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+@dataclass
+class User:
+    """
+    Represents the owner of a set of habits.
+    This is a pure data class with no business logic.
+    """
+    name: str
+    user_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = field(default_factory=datetime.now)
+
+    @classmethod
+    def from_tuple(cls, data: tuple) -> 'User':
+        """
+        Create from a database tuple.
+        Expected format: (user_id, name, created_at)
+        """
+        return cls(user_id=data[0], name=data[1], created_at=datetime.fromisoformat(data[2]))
@@ -3,5 +3,7 @@ Repositories package - Data access layer
 """
 from repositories. habit_repository import HabitRepository
 from repositories.tracker_repository import TrackerRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from repositories.user_repository import UserRepository
 
-__all__ = ['HabitRepository', 'TrackerRepository']
\ No newline at end of file
+__all__ = ['HabitRepository', 'TrackerRepository', 'HabitStatsRepository', 'UserRepository']
\ No newline at end of file
@@ -2,26 +2,39 @@
 Habit Repository - Database operations for habits
 """
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 from models.habit import Habit
-from database.connection import Database
+from config import Config
+from database.connection import Database, serialized_write
+from database.keyset import keyset_clause
+from database.versions import write_versions
+from repositories.habit_stats_repository import HabitStatsRepository
+from repositories.identity_map import IdentityMap
 
 
 class HabitRepository:
     """
     Handles all database operations for habits.
     No business logic - just CRUD operations.
+
+    Habits loaded through a connection opened by Database.connect are kept
+    in its identity map (see repositories.identity_map), shared by every
+    repository of that connection and user: lookups by name or ID of a
+    loaded habit return the same Habit instance without a query.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, user_id: str = None):
         """
-        Initialize a repository.
+        Initialize a repository scoped to the habits of one user.
 
         Args:
             db: Database connection (optional)
+            user_id: Owner of the habits (defaults to Config.DEFAULT_USER_ID)
         """
         self.db = db
+        self.user_id = user_id or Config.DEFAULT_USER_ID
 
+    @serialized_write
     def save(self, habit: Habit) -> bool:
         """
         Saves a habit to the database.
@@ -32,16 +45,18 @@ class HabitRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
         cur = con.cursor()
         try:
             cur.execute(
                 """
-                INSERT INTO habits (habit_id, name, periodicity, created_at, updated_at, is_active, description)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO habits (habit_id, user_id, name, periodicity, created_at, updated_at, is_active, description)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     habit.habit_id,
+                    self.user_id,
                     habit.name,
                     habit.periodicity,
                     habit.created_at.isoformat(),
@@ -51,14 +66,54 @@ class HabitRepository:
                 )
             )
             con.commit()
+            write_versions.bump()
+            if identity_map:
+                identity_map.store(habit, self._version_after_write(identity_map))
             return True
         except Exception as e:
             print(f"Error saving habit: {e}")
             con.rollback()
             return False
-        finally:
-            if not self.db:
-                con.close()
+
+    @serialized_write
+    def save_many(self, habits: List[Habit]) -> bool:
+        """
+        Saves many habits in a single transaction.
+
+        Args:
+            habits: Habit objects to save
+
+        Returns:
+            True if successful, False otherwise (nothing is saved then)
+        """
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
+        cur = con.cursor()
+        try:
+            cur.executemany(
+                """
+                INSERT INTO habits (habit_id, user_id, name, periodicity, created_at, updated_at, is_active, description)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        habit.habit_id, self.user_id, habit.name, habit.periodicity, habit.created_at.isoformat(),
+                        habit.updated_at.isoformat(), 1 if habit.is_active else 0, habit.description
+                    )
+                    for habit in habits
+                ]
+            )
+            con.commit()
+            write_versions.bump()
+            if identity_map:
+                version = self._version_after_write(identity_map)
+                for habit in habits:
+                    identity_map.store(habit, version)
+            return True
+        except Exception as e:
+            print(f"Error saving habits: {e}")
+            con.rollback()
+            return False
 
     def find_all(self, include_inactive: bool = False) -> List[Habit]:
         """
@@ -71,20 +126,25 @@ class HabitRepository:
         Returns:
             List of Habit objects ordered by periodicity (daily first), then by creation date (the newest first)
         """
-        con = self.db or Database.get_connection()
-        cur = con.cursor()
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
+        habits = identity_map.values() if identity_map else None
 
-        cur.execute("""
-            SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
-            FROM habits
-        """)
+        if habits is None:
+            cur = con.cursor()
+            cur.execute(
+                """
+                SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
+                FROM habits
+                WHERE user_id = ?
+                """,
+                (self.user_id,)
+            )
 
-        results = cur.fetchall()
-        if not self.db:
-            con.close()
+            results = cur.fetchall()
 
-        # Functional approach: map, filter, sort
-        habits = map(Habit.from_tuple, results)
+            # Functional approach: map, filter, sort
+            habits = self._habits(identity_map, results, complete=True)
 
         # Filter inactive habits if needed
         if not include_inactive:
@@ -96,12 +156,15 @@ class HabitRepository:
             Returns tuple for sorting:
             - First element: periodicity priority (daily=1, weekly=2, other=3)
             - Second element: negative timestamp (for descending order)
+            - Third element: habit ID, so that habits created at the same
+              instant keep one order whether they come from the database
+              or from the identity map
             """
             periodicity_map = {'daily': 1, 'weekly': 2}
             periodicity_priority = periodicity_map.get(habit.periodicity, 3)
             creation_time = -habit.created_at.timestamp()  # Negative for descending
 
-            return periodicity_priority, creation_time
+            return periodicity_priority, creation_time, habit.habit_id
 
         # Sort using a functional key
         return sorted(habits, key=get_sort_key)
@@ -116,24 +179,28 @@ class HabitRepository:
         Returns:
             Habit object or None
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
+        if identity_map:
+            known, habit = identity_map.get_by_id(habit_id)
+            if known:
+                return habit
+
         cur = con.cursor()
         cur.execute(
             """
             SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
             FROM habits
-            WHERE habit_id = ? 
+            WHERE habit_id = ? AND user_id = ?
             """,
-            (habit_id,)
+            (habit_id, self.user_id)
         )
         result = cur.fetchone()
-        if not self.db:
-            con.close()
-        return Habit.from_tuple(result) if result else None
+        return self._habits(identity_map, [result])[0] if result else None
 
     def find_by_name(self, name: str) -> Optional[Habit]:
         """
-        Find a habit by name.
+        Find a habit by name, ignoring case.
 
         Args:
             name: Habit name
@@ -141,20 +208,54 @@ class HabitRepository:
         Returns:
             Habit object or None
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
+        if identity_map:
+            known, habit = identity_map.get_by_name(name)
+            if known:
+                return habit
+
         cur = con.cursor()
         cur.execute(
             """
             SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
             FROM habits
-            WHERE name = ?  
+            WHERE user_id = ? AND name = ? COLLATE NOCASE
             """,
-            (name,)
+            (self.user_id, name)
         )
         result = cur.fetchone()
-        if not self.db:
-            con.close()
-        return Habit.from_tuple(result) if result else None
+        return self._habits(identity_map, [result])[0] if result else None
+
+    def find_by_names_or_ids(self, keys: Iterable[str]) -> List[Habit]:
+        """
+        Find all habits whose name (ignoring case) or ID is among the given keys.
+
+        Args:
+            keys: Habit names and/or habit IDs
+
+        Returns:
+            List of Habit objects
+        """
+        keys = list(dict.fromkeys(keys))
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+
+        results = []
+        # Each key is bound twice; stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 400):
+            chunk = keys[start:start + 400]
+            placeholders = ", ".join("?" * len(chunk))
+            cur.execute(
+                f"""
+                SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
+                FROM habits
+                WHERE user_id = ? AND (name COLLATE NOCASE IN ({placeholders}) OR habit_id IN ({placeholders}))
+                """,
+                [self.user_id] + chunk + chunk
+            )
+            results.extend(cur.fetchall())
+        return self._habits(self._identity_map(con), results)
 
     def find_by_periodicity(self, periodicity: str, include_inactive: bool = False) -> List[Habit]:
         """
@@ -167,7 +268,7 @@ class HabitRepository:
         Returns:
             List of Habit objects
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
 
         if include_inactive:
@@ -175,27 +276,66 @@ class HabitRepository:
                 """
                 SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
                 FROM habits
-                WHERE periodicity = ? 
+                WHERE user_id = ? AND periodicity = ?
                 ORDER BY created_at DESC
                 """,
-                (periodicity,)
+                (self.user_id, periodicity)
             )
         else:
             cur.execute(
                 """
                 SELECT habit_id, name, periodicity, created_at, updated_at,  is_active, description
                 FROM habits
-                WHERE periodicity = ? AND is_active = 1
+                WHERE user_id = ? AND periodicity = ? AND is_active = 1
                 ORDER BY created_at DESC
                 """,
-                (periodicity,)
+                (self.user_id, periodicity)
             )
 
         results = cur.fetchall()
-        if not self.db:
-            con.close()
-        return [Habit.from_tuple(row) for row in results]
+        return self._habits(self._identity_map(con), results)
+
+    def find_page(
+            self,
+            after: Tuple[str, str, str] = None,
+            before: Tuple[str, str, str] = None,
+            limit: int = None,
+            include_inactive: bool = False
+    ) -> List[Habit]:
+        """
+        Returns one page of habits, seeking by keyset instead of OFFSET so
+        that every page costs one indexed query.
 
+        Args:
+            after: (periodicity, created_at, habit_id) of the last habit of the previous page
+            before: (periodicity, created_at, habit_id) of the first habit of the next page
+            limit: Page size (defaults to Config.PAGE_SIZE)
+            include_inactive: Whether to include inactive habits
+
+        Returns:
+            List of at most limit Habit objects ordered by periodicity (daily first),
+            then by creation date (the oldest first)
+        """
+        condition, order_by, params, reverse = keyset_clause(('periodicity', 'created_at', 'habit_id'), after, before)
+        active = "" if include_inactive else "AND is_active = 1"
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            f"""
+            SELECT habit_id, name, periodicity, created_at, updated_at, is_active, description
+            FROM habits
+            WHERE user_id = ? {active} {condition}
+            ORDER BY {order_by}
+            LIMIT ?
+            """,
+            [self.user_id] + params + [limit or Config.PAGE_SIZE]
+        )
+        results = cur.fetchall()
+        if reverse:
+            results.reverse()
+        return self._habits(self._identity_map(con), results)
+
+    @serialized_write
     def update(self, habit: Habit) -> bool:
         """
         Updates a habit in the database.
@@ -206,8 +346,10 @@ class HabitRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
         cur = con.cursor()
+        previous_updated_at = habit.updated_at
         try:
             habit.update_timestamp()  # Update the updated_at timestamp
 
@@ -219,7 +361,7 @@ class HabitRepository:
                     updated_at = ?, 
                     is_active = ?,
                     description = ? 
-                WHERE habit_id = ?
+                WHERE habit_id = ? AND user_id = ?
                 """,
                 (
                     habit.name,
@@ -227,19 +369,27 @@ class HabitRepository:
                     habit.updated_at.isoformat(),
                     1 if habit.is_active else 0,
                     habit.description,
-                    habit.habit_id
+                    habit.habit_id,
+                    self.user_id
                 )
             )
+            # A periodicity change regroups the check-offs into different periods
+            HabitStatsRepository.refresh(cur, habit.habit_id)
             con.commit()
+            write_versions.bump()
+            if identity_map:
+                identity_map.store(habit, self._version_after_write(identity_map))
             return True
         except Exception as e:
             print(f"Error updating habit: {e}")
             con.rollback()
+            habit.updated_at = previous_updated_at
+            if identity_map:
+                # The instance may carry the changes that were not saved
+                identity_map.discard(habit.habit_id)
             return False
-        finally:
-            if not self.db:
-                con.close()
 
+    @serialized_write
     def delete(self, habit_id: str, soft_delete: bool = True) -> bool:
         """
         Deletes a habit.
@@ -251,33 +401,38 @@ class HabitRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
+        identity_map = self._identity_map(con)
         cur = con.cursor()
         try:
+            updated_at = datetime.now()
             if soft_delete:
                 # Soft delete - just mark as inactive
                 cur.execute(
-                    "UPDATE habits SET is_active = 0, updated_at = ?  WHERE habit_id = ?",
-                    (datetime.now().isoformat(), habit_id)
+                    "UPDATE habits SET is_active = 0, updated_at = ?  WHERE habit_id = ? AND user_id = ?",
+                    (updated_at.isoformat(), habit_id, self.user_id)
                 )
             else:
                 # Hard delete - actually remove from a database
-                cur.execute("DELETE FROM tracker WHERE habit_id = ?", (habit_id,))
-                cur.execute("DELETE FROM habits WHERE habit_id = ?", (habit_id,))
+                cur.execute("SELECT 1 FROM habits WHERE habit_id = ? AND user_id = ?", (habit_id, self.user_id))
+                if cur.fetchone():
+                    cur.execute("DELETE FROM habit_stats WHERE habit_id = ?", (habit_id,))
+                    cur.execute("DELETE FROM tracker WHERE user_id = ? AND habit_id = ?", (self.user_id, habit_id))
+                    cur.execute("DELETE FROM habits WHERE habit_id = ?", (habit_id,))
 
             con.commit()
+            write_versions.bump()
+            if identity_map:
+                self._forget_deleted(identity_map, habit_id, soft_delete, updated_at)
             return True
         except Exception as e:
             print(f"Error deleting habit: {e}")
             con.rollback()
             return False
-        finally:
-            if not self.db:
-                con.close()
 
     def count(self, include_inactive: bool = False) -> int:
         """
-        Returns the total number of habits.
+        Returns the total number of habits of the user.
 
         Args:
             include_inactive: Whether to include inactive habits
@@ -285,15 +440,63 @@ class HabitRepository:
         Returns:
             Number of habits
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
 
         if include_inactive:
-            cur.execute("SELECT count(*) FROM habits")
+            cur.execute("SELECT count(*) FROM habits WHERE user_id = ?", (self.user_id,))
         else:
-            cur.execute("SELECT count(*) FROM habits WHERE is_active = 1")
+            cur.execute("SELECT count(*) FROM habits WHERE user_id = ? AND is_active = 1", (self.user_id,))
 
         count = cur.fetchone()[0]
-        if not self.db:
-            con.close()
-        return count
\ No newline at end of file
+        return count
+
+    def _identity_map(self, con) -> Optional[IdentityMap]:
+        """
+        Returns the identity map of the user on a connection, emptied if
+        habits changed since it was filled. Plain sqlite3 connections
+        (not opened by Database.connect) have none.
+
+        Every call runs one PRAGMA data_version to notice commits of other
+        connections: a read of a counter in the WAL index, without disk
+        access, so a lookup answered from the map still costs that statement.
+        """
+        identity_maps = getattr(con, 'identity_maps', None)
+        if identity_maps is None:
+            return None
+        identity_map = identity_maps.get(self.user_id)
+        if identity_map is None:
+            identity_map = identity_maps.setdefault(self.user_id, IdentityMap())
+        identity_map.validate((write_versions.structure, con.execute("PRAGMA data_version").fetchone()[0]))
+        return identity_map
+
+    @staticmethod
+    def _version_after_write(identity_map: IdentityMap) -> tuple:
+        """
+        Returns the version of a map after a habit write of its own
+        connection. Writes are serialized (see serialized_write), so the only
+        bump since the map was validated is this write's, and commits of the
+        own connection leave its data_version unchanged.
+        """
+        return write_versions.structure, identity_map.version[1]
+
+    def _forget_deleted(self, identity_map: IdentityMap, habit_id: str, soft_delete: bool, updated_at: datetime):
+        """Brings the identity map up to date with a committed deletion."""
+        version = self._version_after_write(identity_map)
+        if not soft_delete:
+            identity_map.discard(habit_id, version)
+            return
+        known, habit = identity_map.get_by_id(habit_id)
+        if habit is None:
+            identity_map.discard(habit_id, version)
+            return
+        habit.is_active = False
+        habit.updated_at = updated_at
+        identity_map.store(habit, version)
+
+    @staticmethod
+    def _habits(identity_map: Optional[IdentityMap], rows: list, complete: bool = False) -> List[Habit]:
+        """Converts habit rows into Habit objects, through the identity map if there is one."""
+        if identity_map is None:
+            return [Habit.from_tuple(row) for row in rows]
+        return identity_map.load(rows, complete)
@@ -0,0 +1,174 @@
+"""
+Habit Stats Repository - Database operations for precomputed habit statistics
+"""
+from typing import Dict, List, Optional
+from models.habit_stats import HabitStats
+from models.tracker import TrackerEvent
+from config import Config
+from database.connection import Database, serialized_write
+from database.streaks import APPLY_CHECK_OFF_SQL, INSERT_STATS_SQL
+from database.versions import write_versions
+
+
+class HabitStatsRepository:
+    """
+    Handles all database operations for the habit_stats table.
+    No business logic - just CRUD operations.
+
+    The table is kept up to date by the other repositories inside their own
+    transactions through apply_check_off() and refresh().
+    """
+
+    def __init__(self, db=None, user_id: str = None):
+        """
+        Initialize a repository scoped to the habits of one user.
+
+        Args:
+            db: Database connection (optional)
+            user_id: Owner of the habits (defaults to Config.DEFAULT_USER_ID)
+        """
+        self.db = db
+        self.user_id = user_id or Config.DEFAULT_USER_ID
+
+    @staticmethod
+    def apply_check_off(cur, event: TrackerEvent):
+        """
+        Folds a freshly inserted check-off into the statistics of its habit.
+        Does not commit: runs inside the caller's transaction.
+
+        Args:
+            cur: Cursor of the caller's transaction
+            event: Inserted TrackerEvent
+        """
+        cur.execute(
+            APPLY_CHECK_OFF_SQL,
+            {'habit_id': event.habit_id, 'checked_at': event.checked_at_iso}
+        )
+        if cur.rowcount == 0:
+            # The check-off predates the last recorded period
+            HabitStatsRepository.refresh(cur, event.habit_id)
+
+    @staticmethod
+    def refresh(cur, habit_id: str):
+        """
+        Recomputes the statistics of one habit from the tracker table.
+        Does not commit: runs inside the caller's transaction.
+
+        Args:
+            cur: Cursor of the caller's transaction
+            habit_id: Habit ID
+        """
+        cur.execute("DELETE FROM habit_stats WHERE habit_id = ?", (habit_id,))
+        cur.execute(
+            INSERT_STATS_SQL.format(where="WHERE t.habit_id = :habit_id"),
+            {'habit_id': habit_id}
+        )
+
+    def find_by_habit_id(self, habit_id: str) -> Optional[HabitStats]:
+        """
+        Returns the statistics of a habit of the user.
+
+        Args:
+            habit_id: Habit ID
+
+        Returns:
+            HabitStats or None if the habit has no check-offs or belongs to another user
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            """
+            SELECT s.habit_id, s.current_streak, s.longest_streak, s.last_period_key,
+                   s.total_completions, s.last_completion
+            FROM habits h
+            INNER JOIN habit_stats s ON s.habit_id = h.habit_id
+            WHERE h.habit_id = ? AND h.user_id = ?
+            """,
+            (habit_id, self.user_id)
+        )
+        result = cur.fetchone()
+        return HabitStats.from_tuple(result) if result else None
+
+    def find_all(self) -> Dict[str, HabitStats]:
+        """
+        Returns the statistics of every habit of the user with check-offs.
+
+        Returns:
+            Dictionary of habit_id -> HabitStats
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            """
+            SELECT s.habit_id, s.current_streak, s.longest_streak, s.last_period_key,
+                   s.total_completions, s.last_completion
+            FROM habits h
+            INNER JOIN habit_stats s ON s.habit_id = h.habit_id
+            WHERE h.user_id = ?
+            """,
+            (self.user_id,)
+        )
+        results = cur.fetchall()
+        return {row[0]: HabitStats.from_tuple(row) for row in results}
+
+    @serialized_write
+    def save_many(self, stats: List[HabitStats]) -> bool:
+        """
+        Stores statistics computed outside the database, e.g. by a loader
+        that generated the check-offs, replacing those of the same habits.
+        Statistics of habits owned by another user are ignored.
+
+        Args:
+            stats: HabitStats to store
+
+        Returns:
+            True if successful, False otherwise (nothing is saved then)
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        try:
+            cur.executemany(
+                """
+                INSERT OR REPLACE INTO habit_stats (habit_id, current_streak, longest_streak, last_period_key,
+                                                    total_completions, last_completion)
+                SELECT h.habit_id, ?, ?, ?, ?, ?
+                FROM habits h
+                WHERE h.habit_id = ? AND h.user_id = ?
+                """,
+                [
+                    (
+                        item.current_streak, item.longest_streak, item.last_period_key, item.total_completions,
+                        item.last_completion.isoformat() if item.last_completion else None,
+                        item.habit_id, self.user_id
+                    )
+                    for item in stats
+                ]
+            )
+            con.commit()
+            write_versions.bump()
+            return True
+        except Exception as e:
+            print(f"Error saving habit stats: {e}")
+            con.rollback()
+            return False
+
+    @serialized_write
+    def rebuild(self) -> bool:
+        """
+        Recomputes the whole habit_stats table, for all users, from the tracker table.
+
+        Returns:
+            True if successful, False otherwise
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        try:
+            cur.execute("DELETE FROM habit_stats")
+            cur.execute(INSERT_STATS_SQL.format(where=""))
+            con.commit()
+            write_versions.bump()
+            return True
+        except Exception as e:
+            print(f"Error rebuilding habit stats: {e}")
+            con.rollback()
+            return False
@@ -0,0 +1,156 @@
+"""
+Identity map - Habits already loaded through a connection, by ID and by name
+"""
+import threading
+from typing import Iterable, List, Optional, Tuple
+from models.habit import Habit
+
+
+def nocase_key(name: str) -> bytes:
+    """
+    Returns the key under which a name matches like SQLite's NOCASE
+    collation, which only folds ASCII letters.
+
+    Args:
+        name: Habit name
+
+    Returns:
+        UTF-8 bytes of the name with ASCII letters lowercased
+    """
+    return name.encode('utf-8').lower()
+
+
+class IdentityMap:
+    """
+    The habits of one user loaded through one connection. Every habit is
+    held by one Habit object, so repeated lookups return the same instance
+    without a query. Once the map is complete (all habits were loaded),
+    names that are not in it are known not to exist either.
+
+    The map is valid for one version, a (write_versions.structure,
+    PRAGMA data_version) pair: any habit write of this process, or any
+    commit of another process, empties it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.complete = False
+        self._habits = {}
+        self._ids_by_name = {}
+        self._names = {}
+
+    def validate(self, version: tuple):
+        """
+        Empties the map unless it was built under the given version.
+
+        Args:
+            version: Current (structure counter, data_version) pair
+        """
+        with self.lock:
+            if self.version != version:
+                self._clear()
+                self.version = version
+
+    def get_by_id(self, habit_id: str) -> Tuple[bool, Optional[Habit]]:
+        """
+        Looks up a habit by ID.
+
+        Returns:
+            Tuple of (known: bool, habit); known is False when the database must be asked
+        """
+        with self.lock:
+            habit = self._habits.get(habit_id)
+            return habit is not None or self.complete, habit
+
+    def get_by_name(self, name: str) -> Tuple[bool, Optional[Habit]]:
+        """
+        Looks up a habit by name, ignoring case like the NOCASE collation.
+
+        Returns:
+            Tuple of (known: bool, habit); known is False when the database must be asked
+        """
+        with self.lock:
+            habit_id = self._ids_by_name.get(nocase_key(name))
+            habit = self._habits.get(habit_id) if habit_id else None
+            return habit is not None or self.complete, habit
+
+    def values(self) -> Optional[List[Habit]]:
+        """
+        Returns every habit of the user if the map is complete, otherwise None.
+        """
+        with self.lock:
+            return list(self._habits.values()) if self.complete else None
+
+    def load(self, rows: Iterable[tuple], complete: bool = False) -> List[Habit]:
+        """
+        Converts habit rows into Habit objects, returning the instances
+        already in the map for habits loaded before.
+
+        Args:
+            rows: Rows of (habit_id, name, periodicity, created_at, updated_at, is_active, description)
+            complete: Whether the rows are all habits of the user
+
+        Returns:
+            List of Habit objects in row order
+        """
+        with self.lock:
+            habits = []
+            for row in rows:
+                habit = self._habits.get(row[0])
+                if habit is None:
+                    habit = Habit.from_tuple(row)
+                    self._store(habit)
+                habits.append(habit)
+            if complete:
+                self.complete = True
+            return habits
+
+    def store(self, habit: Habit, version: tuple):
+        """
+        Records a habit that was just saved or updated, under the version
+        that the write moved the map to.
+
+        Args:
+            habit: Saved Habit object, which becomes the instance of its ID
+            version: Version after the write
+        """
+        with self.lock:
+            self._discard(habit.habit_id)
+            self._store(habit)
+            self.version = version
+
+    def discard(self, habit_id: str, version: tuple = None):
+        """
+        Forgets a habit, e.g. after it was deleted or a write of it failed.
+
+        Args:
+            habit_id: Habit ID
+            version: Version after the deletion; None if a write failed, as
+                     the habit still exists then and the map is no longer complete
+        """
+        with self.lock:
+            self._discard(habit_id)
+            if version is None:
+                self.complete = False
+            else:
+                self.version = version
+
+    def _store(self, habit: Habit):
+        key = nocase_key(habit.name)
+        self._habits[habit.habit_id] = habit
+        self._ids_by_name[key] = habit.habit_id
+        self._names[habit.habit_id] = key
+
+    def _discard(self, habit_id: str):
+        # The instance may already carry a new name: forget the name it was stored under
+        self._habits.pop(habit_id, None)
+        key = self._names.pop(habit_id, None)
+        if key is not None and self._ids_by_name.get(key) == habit_id:
+            del self._ids_by_name[key]
+
+    def _clear(self):
+        self._habits.clear()
+        self._ids_by_name.clear()
+        self._names.clear()
+        self.complete = False
@@ -1,9 +1,43 @@
 """
 Tracker Repository - Database operations for tracker events
 """
-from typing import List, Optional
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from models.tracker import TrackerEvent
-from database.connection import Database
+from config import Config
+from database.connection import Database, serialized_write
+from database.keyset import keyset_clause
+from database.versions import write_versions
+from database.streaks import LONGEST_STREAKS_SQL, day_key, week_key
+from repositories.habit_stats_repository import HabitStatsRepository
+
+
+INSERT_EVENT_SQL = """
+    INSERT INTO tracker (event_id, user_id, habit_id, checked_at, notes, day_key, week_key)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Bulk imports skip event IDs that are already recorded
+INSERT_EVENT_OR_IGNORE_SQL = INSERT_EVENT_SQL.replace("INSERT INTO", "INSERT OR IGNORE INTO")
+
+
+def _event_row(event: TrackerEvent, user_id: str) -> tuple:
+    """Returns the INSERT_EVENT_SQL parameters of an event, including its owner and period keys."""
+    checked_at = event.checked_at
+    return (
+        event.event_id, user_id, event.habit_id, event.checked_at_iso, event.notes,
+        day_key(checked_at), week_key(checked_at)
+    )
+
+
+def _iter_rows(cur, batch_size: Optional[int]) -> Iterator[tuple]:
+    """Yields the rows of an executed cursor, fetching batch_size rows per round trip."""
+    batch_size = batch_size or Config.FETCH_BATCH_SIZE
+    rows = cur.fetchmany(batch_size)
+    while rows:
+        yield from rows
+        rows = cur.fetchmany(batch_size)
 
 
 class TrackerRepository:
@@ -12,15 +46,18 @@ class TrackerRepository:
     No business logic - just CRUD operations.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, user_id: str = None):
         """
-        Initialize a repository.
+        Initialize a repository scoped to the check-offs of one user.
 
         Args:
             db: Database connection (optional)
+            user_id: Owner of the check-offs (defaults to Config.DEFAULT_USER_ID)
         """
         self.db = db
+        self.user_id = user_id or Config.DEFAULT_USER_ID
 
+    @serialized_write
     def save(self, event: TrackerEvent) -> bool:
         """
         Records a check-off event.
@@ -31,22 +68,45 @@ class TrackerRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         try:
-            cur.execute(
-                "INSERT INTO tracker (event_id, habit_id, checked_at, notes) VALUES (?, ?, ?, ?)",
-                (event.event_id, event.habit_id, event.checked_at.isoformat(), event.notes)
-            )
+            cur.execute(INSERT_EVENT_SQL, _event_row(event, self.user_id))
+            HabitStatsRepository.apply_check_off(cur, event)
             con.commit()
+            write_versions.bump(event.habit_id)
             return True
         except Exception as e:
             print(f"Error saving tracker event:  {e}")
             con.rollback()
             return False
-        finally:
-            if not self.db:
-                con.close()
+
+    @serialized_write
+    def save_many(self, events: List[TrackerEvent]) -> bool:
+        """
+        Records many check-off events in a single transaction.
+
+        Args:
+            events: TrackerEvents to save
+
+        Returns:
+            True if successful, False otherwise (nothing is saved then)
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        try:
+            cur.executemany(INSERT_EVENT_SQL, [_event_row(event, self.user_id) for event in events])
+            habit_ids = {event.habit_id for event in events}
+            for habit_id in habit_ids:
+                HabitStatsRepository.refresh(cur, habit_id)
+            con.commit()
+            for habit_id in habit_ids:
+                write_versions.bump(habit_id)
+            return True
+        except Exception as e:
+            print(f"Error saving tracker events: {e}")
+            con.rollback()
+            return False
 
     def find_by_habit_id(self, habit_id: str) -> List[TrackerEvent]:
         """
@@ -58,20 +118,68 @@ class TrackerRepository:
         Returns:
             List of TrackerEvent objects sorted by date
         """
-        con = self.db or Database.get_connection()
+        return list(self.iter_by_habit_id(habit_id))
+
+    def iter_by_habit_id(self, habit_id: str, batch_size: int = None) -> Iterator[TrackerEvent]:
+        """
+        Streams the check-off events of a habit in constant memory.
+
+        Args:
+            habit_id: Habit ID
+            batch_size: Rows fetched per round trip (defaults to Config.FETCH_BATCH_SIZE)
+
+        Returns:
+            Iterator of TrackerEvent objects sorted by date
+        """
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         cur.execute(
             """
             SELECT event_id, habit_id, checked_at, notes
             FROM tracker
-            WHERE habit_id = ?
+            WHERE user_id = ? AND habit_id = ?
             ORDER BY checked_at
             """,
-            (habit_id,)
+            (self.user_id, habit_id)
+        )
+        return map(TrackerEvent.from_tuple, _iter_rows(cur, batch_size))
+
+    def find_page_by_habit_id(
+            self,
+            habit_id: str,
+            after: Tuple[str, str] = None,
+            before: Tuple[str, str] = None,
+            limit: int = None
+    ) -> List[TrackerEvent]:
+        """
+        Returns one page of a habit's check-off events, seeking by keyset
+        instead of OFFSET so that every page costs one indexed query.
+
+        Args:
+            habit_id: Habit ID
+            after: (checked_at, event_id) of the last event of the previous page
+            before: (checked_at, event_id) of the first event of the next page
+            limit: Page size (defaults to Config.PAGE_SIZE)
+
+        Returns:
+            List of at most limit TrackerEvent objects sorted by date
+        """
+        condition, order_by, params, reverse = keyset_clause(('checked_at', 'event_id'), after, before)
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            f"""
+            SELECT event_id, habit_id, checked_at, notes
+            FROM tracker
+            WHERE user_id = ? AND habit_id = ? {condition}
+            ORDER BY {order_by}
+            LIMIT ?
+            """,
+            [self.user_id, habit_id] + params + [limit or Config.PAGE_SIZE]
         )
         results = cur.fetchall()
-        if not self.db:
-            con.close()
+        if reverse:
+            results.reverse()
         return [TrackerEvent.from_tuple(row) for row in results]
 
     def find_by_habit_name(self, habit_name: str) -> List[TrackerEvent]:
@@ -84,21 +192,45 @@ class TrackerRepository:
         Returns:
             List of TrackerEvent objects sorted by date
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         cur.execute(
             """
             SELECT t.event_id, t.habit_id, t.checked_at, t.notes
             FROM tracker t
             INNER JOIN habits h ON t.habit_id = h.habit_id
-            WHERE h.name = ? 
+            WHERE h.user_id = ? AND h.name = ? COLLATE NOCASE AND t.user_id = h.user_id
             ORDER BY t.checked_at
             """,
-            (habit_name,)
+            (self.user_id, habit_name)
+        )
+        results = cur.fetchall()
+        return [TrackerEvent.from_tuple(row) for row in results]
+
+    def find_by_habit_id_between(self, habit_id: str, start: date, end: date) -> List[TrackerEvent]:
+        """
+        Returns the check-off events of a habit within a date range.
+
+        Args:
+            habit_id: Habit ID
+            start: First day of the range (inclusive)
+            end: Last day of the range (inclusive)
+
+        Returns:
+            List of TrackerEvent objects sorted by date
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            """
+            SELECT event_id, habit_id, checked_at, notes
+            FROM tracker
+            WHERE user_id = ? AND habit_id = ? AND day_key BETWEEN ? AND ?
+            ORDER BY day_key, checked_at
+            """,
+            (self.user_id, habit_id, day_key(start), day_key(end))
         )
         results = cur.fetchall()
-        if not self.db:
-            con.close()
         return [TrackerEvent.from_tuple(row) for row in results]
 
     def find_all(self) -> List[TrackerEvent]:
@@ -106,20 +238,297 @@ class TrackerRepository:
         Returns all tracker events.
 
         Returns:
-            List of TrackerEvent objects
+            List of TrackerEvent objects, the newest first
+        """
+        return list(self.iter_all())
+
+    def iter_all(self, batch_size: int = None) -> Iterator[TrackerEvent]:
+        """
+        Streams all tracker events in constant memory.
+
+        Args:
+            batch_size: Rows fetched per round trip (defaults to Config.FETCH_BATCH_SIZE)
+
+        Returns:
+            Iterator of TrackerEvent objects, the newest first
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
-        cur.execute("""
+        cur.execute(
+            """
             SELECT event_id, habit_id, checked_at, notes
             FROM tracker
+            WHERE user_id = ?
             ORDER BY checked_at DESC
-        """)
+            """,
+            (self.user_id,)
+        )
+        return map(TrackerEvent.from_tuple, _iter_rows(cur, batch_size))
+
+    def find_all_check_ins(self) -> List[Tuple[str, datetime]]:
+        """
+        Returns the check-off timestamps of every habit in one ordered scan.
+
+        Returns:
+            List of (habit_id, checked_at) tuples sorted by habit, then by date
+        """
+        return list(self.iter_check_ins())
+
+    def iter_check_ins(self, batch_size: int = None) -> Iterator[Tuple[str, datetime]]:
+        """
+        Streams the check-off timestamps of every habit in one ordered scan, in constant memory.
+
+        Args:
+            batch_size: Rows fetched per round trip (defaults to Config.FETCH_BATCH_SIZE)
+
+        Returns:
+            Iterator of (habit_id, checked_at) tuples sorted by habit, then by date
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            """
+            SELECT habit_id, checked_at
+            FROM tracker
+            WHERE user_id = ?
+            ORDER BY habit_id, checked_at
+            """,
+            (self.user_id,)
+        )
+        return (
+            (habit_id, datetime.fromisoformat(checked_at))
+            for habit_id, checked_at in _iter_rows(cur, batch_size)
+        )
+
+    def iter_export_rows(
+            self,
+            habit_ids: List[str] = None,
+            periodicity: str = None,
+            start: date = None,
+            end: date = None,
+            batch_size: int = None
+    ) -> Iterator[tuple]:
+        """
+        Streams check-off events joined with their habit for exporting, in constant memory.
+        Tracker drives the join (CROSS JOIN keeps that order) and the ORDER BY
+        follows the index the filters seek in, so rows are never sorted
+        however many there are.
+
+        Args:
+            habit_ids: Only events of these habits (optional)
+            periodicity: Only events of habits with this periodicity (optional)
+            start: First day to export (inclusive, optional)
+            end: Last day to export (inclusive, optional)
+            batch_size: Rows fetched per round trip (defaults to Config.FETCH_BATCH_SIZE)
+
+        Returns:
+            Iterator of (event_id, habit_id, habit name, periodicity, checked_at, notes)
+            tuples sorted by habit, then by date (only by date for a date range over all habits)
+        """
+        conditions, params = ["t.user_id = ?"], [self.user_id]
+        if habit_ids is not None:
+            conditions.append(f"t.habit_id IN ({', '.join('?' * len(habit_ids))})")
+            params.extend(habit_ids)
+        if periodicity is not None:
+            conditions.append("h.periodicity = ?")
+            params.append(periodicity)
+        if start is not None:
+            conditions.append("t.checked_at >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            # ISO timestamps of the last day sort below the next day's date
+            conditions.append("t.checked_at < ?")
+            params.append((end + timedelta(days=1)).isoformat())
+        by_date = habit_ids is None and (start is not None or end is not None)
+        order_by = "t.checked_at" if by_date else "t.habit_id, t.checked_at"
+
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            f"""
+            SELECT t.event_id, t.habit_id, h.name, h.periodicity, t.checked_at, t.notes
+            FROM tracker t
+            CROSS JOIN habits h ON h.habit_id = t.habit_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order_by}
+            """,
+            params
+        )
+        return _iter_rows(cur, batch_size)
+
+    def find_period_keys_in_range(self, first_habit_id: str, last_habit_id: str) -> List[Tuple[str, int, int, str]]:
+        """
+        Returns the check-offs of a contiguous range of habit IDs with their period keys.
+
+        Args:
+            first_habit_id: Lowest habit ID of the range (inclusive)
+            last_habit_id: Highest habit ID of the range (inclusive)
+
+        Returns:
+            List of (habit_id, day_key, week_key, checked_at) tuples sorted by habit, then by date;
+            checked_at is left as its ISO string
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            """
+            SELECT habit_id, day_key, week_key, checked_at
+            FROM tracker
+            WHERE user_id = ? AND habit_id BETWEEN ? AND ?
+            ORDER BY habit_id, checked_at
+            """,
+            (self.user_id, first_habit_id, last_habit_id)
+        )
+        return cur.fetchall()
+
+    def find_last_completions(self) -> Dict[str, datetime]:
+        """
+        Returns the most recent check-off of every habit.
+
+        Returns:
+            Dictionary of habit_id -> last checked_at
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            "SELECT habit_id, MAX(checked_at) FROM tracker WHERE user_id = ? GROUP BY habit_id",
+            (self.user_id,)
+        )
         results = cur.fetchall()
-        if not self.db:
-            con.close()
-        return [TrackerEvent.from_tuple(row) for row in results]
+        return {habit_id: datetime.fromisoformat(checked_at) for habit_id, checked_at in results}
+
+    def load_day_arrays(self, habit_id: str = None, batch_size: int = None) -> Dict[str, "np.ndarray"]:
+        """
+        Streams check-offs into per-habit int32 arrays of day numbers (days since 1970-01-01).
+        Requires NumPy.
+
+        Args:
+            habit_id: Only load this habit (optional)
+            batch_size: Rows fetched per round trip (defaults to Config.FETCH_BATCH_SIZE)
+
+        Returns:
+            Dictionary of habit_id -> unsorted int32 array of day numbers
+        """
+        try:
+            import numpy as np  # Optional dependency, imported on first use
+        except ImportError:
+            raise RuntimeError("NumPy is required to load day arrays")
+
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        if habit_id is None:
+            cur.execute("SELECT habit_id, day_key FROM tracker WHERE user_id = ?", (self.user_id,))
+        else:
+            cur.execute(
+                "SELECT habit_id, day_key FROM tracker WHERE user_id = ? AND habit_id = ?",
+                (self.user_id, habit_id)
+            )
+
+        buffers = {}
+        for row_habit_id, day in _iter_rows(cur, batch_size):
+            buffer = buffers.get(row_habit_id)
+            if buffer is None:
+                buffer = buffers[row_habit_id] = array('i')
+            buffer.append(day)
+
+        return {
+            key: np.frombuffer(buffer, dtype=np.intc).astype(np.int32, copy=False)
+            for key, buffer in buffers.items()
+        }
+
+    def find_longest_streak(self, habit_id: str) -> int:
+        """
+        Computes the longest streak of a habit inside SQLite.
+
+        Args:
+            habit_id: Habit ID
+
+        Returns:
+            Length of the longest streak (0 without check-offs)
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(
+            LONGEST_STREAKS_SQL.format(where="WHERE t.user_id = ? AND t.habit_id = ?"),
+            (self.user_id, habit_id)
+        )
+        result = cur.fetchone()
+        return result[1] if result else 0
+
+    def find_longest_streaks(self) -> Dict[str, int]:
+        """
+        Computes the longest streak of every habit inside SQLite.
+
+        Returns:
+            Dictionary of habit_id -> longest streak (habits without check-offs are absent)
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        cur.execute(LONGEST_STREAKS_SQL.format(where="WHERE t.user_id = ?"), (self.user_id,))
+        results = cur.fetchall()
+        return dict(results)
+
+    @serialized_write
+    def insert_rows(self, rows: Iterable[tuple], refresh: Iterable[str] = ()) -> Optional[int]:
+        """
+        Inserts prepared check-off rows in a single transaction, skipping
+        event IDs that are already recorded. Unlike save_many it does not
+        fold every row into habit_stats: the statistics of the habits in
+        `refresh` are recomputed once in the same transaction, and a loader
+        that fills habit_stats itself passes none.
+
+        Args:
+            rows: Tuples of (event_id, habit_id, checked_at ISO string, notes, day_key, week_key)
+            refresh: IDs of the habits whose statistics to recompute (optional)
+
+        Returns:
+            Number of inserted rows, or None if the transaction failed (nothing is saved then)
+        """
+        user_id = self.user_id
+        con = Database.resolve(self.db, user_id)
+        cur = con.cursor()
+        try:
+            cur.executemany(
+                INSERT_EVENT_OR_IGNORE_SQL,
+                ((event_id, user_id, habit_id, checked_at, notes, day, week)
+                 for event_id, habit_id, checked_at, notes, day, week in rows)
+            )
+            inserted = cur.rowcount
+            for habit_id in refresh:
+                HabitStatsRepository.refresh(cur, habit_id)
+            con.commit()
+            write_versions.bump()
+            return inserted
+        except Exception as e:
+            print(f"Error inserting tracker rows: {e}")
+            con.rollback()
+            return None
+
+    @serialized_write
+    def refresh_stats(self, habit_ids: Iterable[str]) -> bool:
+        """
+        Recomputes the habit_stats rows of the given habits in one transaction.
+
+        Args:
+            habit_ids: Habit IDs
+
+        Returns:
+            True if successful, False otherwise
+        """
+        con = Database.resolve(self.db, self.user_id)
+        cur = con.cursor()
+        try:
+            for habit_id in habit_ids:
+                HabitStatsRepository.refresh(cur, habit_id)
+            con.commit()
+            write_versions.bump()
+            return True
+        except Exception as e:
+            print(f"Error refreshing habit statistics: {e}")
+            con.rollback()
+            return False
 
+    @serialized_write
     def delete_by_habit_id(self, habit_id: str) -> bool:
         """
         Deletes all tracker events for a habit.
@@ -130,20 +539,21 @@ class TrackerRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         try:
-            cur.execute("DELETE FROM tracker WHERE habit_id = ?", (habit_id,))
+            cur.execute("DELETE FROM tracker WHERE user_id = ? AND habit_id = ?", (self.user_id, habit_id))
+            if cur.rowcount:
+                cur.execute("DELETE FROM habit_stats WHERE habit_id = ?", (habit_id,))
             con.commit()
+            write_versions.bump(habit_id)
             return True
         except Exception as e:
             print(f"Error deleting tracker events: {e}")
             con.rollback()
             return False
-        finally:
-            if not self.db:
-                con.close()
 
+    @serialized_write
     def delete_by_event_id(self, event_id: str) -> bool:
         """
         Deletes a specific tracker event.
@@ -154,20 +564,23 @@ class TrackerRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         try:
-            cur.execute("DELETE FROM tracker WHERE event_id = ?", (event_id,))
+            cur.execute("SELECT habit_id FROM tracker WHERE event_id = ? AND user_id = ?", (event_id, self.user_id))
+            result = cur.fetchone()
+            cur.execute("DELETE FROM tracker WHERE event_id = ? AND user_id = ?", (event_id, self.user_id))
+            if result:
+                HabitStatsRepository.refresh(cur, result[0])
             con.commit()
+            write_versions.bump(result[0] if result else None)
             return True
         except Exception as e:
             print(f"Error deleting tracker event: {e}")
             con.rollback()
             return False
-        finally:
-            if not self.db:
-                con.close()
 
+    @serialized_write
     def update_notes(self, event_id: str, notes: str) -> bool:
         """
         Updates notes for a specific tracker event.
@@ -179,22 +592,22 @@ class TrackerRepository:
         Returns:
             True if successful, False otherwise
         """
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         try:
+            cur.execute("SELECT habit_id FROM tracker WHERE event_id = ? AND user_id = ?", (event_id, self.user_id))
+            result = cur.fetchone()
             cur.execute(
-                "UPDATE tracker SET notes = ? WHERE event_id = ?",
-                (notes, event_id)
+                "UPDATE tracker SET notes = ? WHERE event_id = ? AND user_id = ?",
+                (notes, event_id, self.user_id)
             )
             con.commit()
+            write_versions.bump(result[0] if result else None)
             return True
         except Exception as e:
             print(f"Error updating notes: {e}")
             con.rollback()
             return False
-        finally:
-            if not self.db:
-                con.close()
 
     def find_by_event_id(self, event_id: str) -> Optional['TrackerEvent']:
         """
@@ -208,17 +621,15 @@ class TrackerRepository:
         """
         from models.tracker import TrackerEvent
 
-        con = self.db or Database.get_connection()
+        con = Database.resolve(self.db, self.user_id)
         cur = con.cursor()
         cur.execute(
             """
             SELECT event_id, habit_id, checked_at, notes
             FROM tracker
-            WHERE event_id = ?
+            WHERE event_id = ? AND user_id = ?
             """,
-            (event_id,)
+            (event_id, self.user_id)
         )
         result = cur.fetchone()
-        if not self.db:
-            con.close()
         return TrackerEvent.from_tuple(result) if result else None
\ No newline at end of file
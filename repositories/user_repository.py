@@ -0,0 +1,78 @@
+"""
+User Repository - Database operations for users
+"""
+from typing import Optional
+from models.user import User
+from database.connection import Database, serialized_write
+
+
+class UserRepository:
+    """
+    Handles all database operations for users.
+    No business logic - just CRUD operations.
+
+    With a sharded layout (Config.SHARD_COUNT) every user is stored in the
+    shard that holds their habits.
+    """
+
+    def __init__(self, db=None):
+        """
+        Initialize a repository.
+
+        Args:
+            db: Database connection (optional)
+        """
+        self.db = db
+
+    @serialized_write
+    def save(self, user: User) -> bool:
+        """
+        Saves a user to the database.
+
+        Args:
+            user: User object to save
+
+        Returns:
+            True if successful, False otherwise
+        """
+        con = Database.resolve(self.db, user.user_id)
+        cur = con.cursor()
+        try:
+            cur.execute(
+                "INSERT INTO users (user_id, name, created_at) VALUES (?, ?, ?)",
+                (user.user_id, user.name, user.created_at.isoformat())
+            )
+            con.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving user: {e}")
+            con.rollback()
+            return False
+
+    def find_by_id(self, user_id: str) -> Optional[User]:
+        """
+        Find a user by ID.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            User object or None
+        """
+        con = Database.resolve(self.db, user_id)
+        cur = con.cursor()
+        cur.execute("SELECT user_id, name, created_at FROM users WHERE user_id = ?", (user_id,))
+        result = cur.fetchone()
+        return User.from_tuple(result) if result else None
+
+    def count(self) -> int:
+        """
+        Returns the number of users stored in the connected database (one shard when sharded).
+
+        Returns:
+            Number of users
+        """
+        con = Database.resolve(self.db)
+        cur = con.cursor()
+        cur.execute("SELECT count(*) FROM users")
+        return cur.fetchone()[0]
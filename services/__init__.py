@@ -5,4 +5,16 @@ from services. habit_service import HabitService
 from services.tracker_service import TrackerService
 from services.analytics_service import AnalyticsService
 
-__all__ = ['HabitService', 'TrackerService', 'AnalyticsService']
\ No newline at end of file
+# The async services pull in asyncio and the connection pool, so they are
+# imported on first access to keep CLI startup fast
+_ASYNC_SERVICES = ('AsyncHabitService', 'AsyncTrackerService', 'AsyncAnalyticsService')
+
+
+def __getattr__(name):
+    if name in _ASYNC_SERVICES:
+        from services import async_services
+        return getattr(async_services, name)
+    raise AttributeError(f"module 'services' has no attribute '{name}'")
+
+
+__all__ = ['HabitService', 'TrackerService', 'AnalyticsService'] + list(_ASYNC_SERVICES)
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Cached Analytics Service - AnalyticsService with a bounded, versioned result cache
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from datetime import date
+from typing import Callable, Dict, List, Optional, Tuple
+from config import Config
+from database.connection import Database
+from database.versions import write_versions
+from repositories.identity_map import nocase_key
+from services.analytics_service import AnalyticsService
+
+
+class CachedAnalyticsService(AnalyticsService):
+    """
+    AnalyticsService that keeps recent results in an LRU cache.
+
+    Results about one habit are keyed by habit ID and stay valid until that
+    habit's check-offs or any habit changes (see database.versions); results
+    over every habit stay valid until anything changes. Writes committed by
+    other processes or connections are detected through PRAGMA data_version,
+    which drops the whole cache. Every result also expires at midnight, as
+    current streaks depend on the date.
+
+    Cached results are shared: callers must not modify them.
+    """
+
+    def __init__(
+            self,
+            db=None,
+            streak_engine: str = None,
+            workers: int = None,
+            user_id: str = None,
+            maxsize: int = None
+    ):
+        """
+        Initialize service.
+
+        Args:
+            db: Database connection (optional)
+            streak_engine: See AnalyticsService
+            workers: See AnalyticsService
+            user_id: User whose habits are analyzed (defaults to Config.DEFAULT_USER_ID)
+            maxsize: Most results kept (defaults to Config.ANALYTICS_CACHE_SIZE)
+        """
+        super().__init__(db, streak_engine, workers, user_id)
+        self.maxsize = maxsize or Config.ANALYTICS_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._habit_ids: Dict[bytes, str] = {}
+        self._habit_ids_version = None
+        # Weak keys: the versions of closed connections go away with them
+        self._data_versions = weakref.WeakKeyDictionary()
+
+    def cache_info(self) -> dict:
+        """
+        Returns the cache counters, for inspection.
+
+        Returns:
+            Dictionary with hits, misses, evictions, size and maxsize
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+    def cache_clear(self):
+        """Drops every cached result (the counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._habit_ids.clear()
+
+    # ============ Per-habit results ============
+
+    def calculate_longest_streak(self, habit_name: str) -> int:
+        """See AnalyticsService.calculate_longest_streak."""
+        return self._habit_result('calculate_longest_streak', habit_name)
+
+    def get_current_streak(self, habit_name: str) -> int:
+        """See AnalyticsService.get_current_streak."""
+        return self._habit_result('get_current_streak', habit_name)
+
+    def get_habit_completion_history(self, habit_name: str) -> Optional[dict]:
+        """See AnalyticsService.get_habit_completion_history."""
+        return self._habit_result('get_habit_completion_history', habit_name)
+
+    def get_habit_completion_page(
+            self,
+            habit_name: str,
+            after: tuple = None,
+            before: tuple = None,
+            page_size: int = None
+    ) -> Optional[dict]:
+        """See AnalyticsService.get_habit_completion_page."""
+        return self._habit_result(
+            'get_habit_completion_page', habit_name,
+            tuple(after) if after else None, tuple(before) if before else None, page_size
+        )
+
+    # ============ Results over every habit ============
+
+    def get_longest_streak_all_habits(self) -> Tuple[str, int]:
+        """See AnalyticsService.get_longest_streak_all_habits."""
+        return self._all_habits_result('get_longest_streak_all_habits')
+
+    def get_completion_summary(self) -> List[dict]:
+        """See AnalyticsService.get_completion_summary."""
+        return self._all_habits_result('get_completion_summary')
+
+    def get_completion_rates(self) -> Dict[str, float]:
+        """See AnalyticsService.get_completion_rates."""
+        return self._all_habits_result('get_completion_rates')
+
+    # ============ Cache internals ============
+
+    def _habit_result(self, method: str, habit_name: str, *args):
+        """Returns a per-habit result, computing it with AnalyticsService on a miss."""
+        self._check_data_version()
+
+        def compute():
+            return getattr(super(CachedAnalyticsService, self), method)(habit_name, *args)
+
+        habit_id = self._habit_id(habit_name)
+        if habit_id is None:
+            # Unknown habits are not cached: creating one does not touch any habit counter yet
+            return compute()
+        version = (date.today(), write_versions.habit_version(habit_id))
+        return self._cached((method, habit_id) + args, version, compute)
+
+    def _all_habits_result(self, method: str):
+        """Returns a result over every habit, computing it with AnalyticsService on a miss."""
+        self._check_data_version()
+        version = (date.today(), write_versions.total)
+        return self._cached((method,), version, getattr(super(CachedAnalyticsService, self), method))
+
+    def _cached(self, key: tuple, version: tuple, compute: Callable):
+        """
+        Returns the cached value of a key if it was computed under the current
+        version, otherwise computes and stores it, evicting the least recently
+        used entries beyond maxsize.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Computed outside the lock: results may call other cached methods
+        value = compute()
+
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def _habit_id(self, habit_name: str) -> Optional[str]:
+        """Resolves a habit name through a map that is valid until any habit changes."""
+        key = nocase_key(habit_name)
+        with self._lock:
+            if self._habit_ids_version != write_versions.structure:
+                self._habit_ids.clear()
+                self._habit_ids_version = write_versions.structure
+            habit_id = self._habit_ids.get(key)
+        if habit_id is None:
+            habit = self.habit_repo.find_by_name(habit_name)
+            if habit is None:
+                return None
+            habit_id = habit.habit_id
+            with self._lock:
+                self._habit_ids[key] = habit_id
+        return habit_id
+
+    def _check_data_version(self):
+        """
+        Drops the cache once another connection committed a change. Every
+        connection has its own data_version, so it is tracked per connection;
+        the first look through a connection drops the cache too, as changes
+        committed before it are not known. Plain sqlite3 connections (not
+        opened by Database.connect) cannot be tracked, so every look through
+        one drops the cache.
+        """
+        con = Database.resolve(self.db, self.user_id)
+        data_version = con.execute("PRAGMA data_version").fetchone()[0]
+        with self._lock:
+            try:
+                changed = self._data_versions.get(con) != data_version
+                if changed:
+                    self._data_versions[con] = data_version
+            except TypeError:
+                changed = True
+            if changed:
+                self._entries.clear()
+                self._habit_ids.clear()
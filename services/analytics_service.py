@@ -1,10 +1,128 @@
 """
 Analytics Service - Business logic for analytics and streaks
 """
-from datetime import datetime, timedelta
-from typing import Tuple, List, Optional
+import os
+from datetime import date, datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterable, Tuple, List, Optional
+from models.habit import Habit
 from repositories.habit_repository import HabitRepository
 from repositories.tracker_repository import TrackerRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from models.habit_stats import HabitStats
+from database.streaks import period_key
+from services import vectorized_analytics
+from database.connection import Database
+from database.keyset import trim_page
+from config import Config
+
+
+def _normalize_period(checked_at: datetime, periodicity: str) -> date:
+    """
+    Maps a timestamp to the first day of its period.
+
+    Args:
+        checked_at: Completion timestamp
+        periodicity: 'daily' or 'weekly'
+
+    Returns:
+        The date itself for daily habits, the Monday of the ISO week for weekly ones
+    """
+    if periodicity == 'daily':
+        return checked_at.date()
+    year, week, _ = checked_at.isocalendar()
+    return datetime.fromisocalendar(year, week, 1).date()
+
+
+def _period_step(periodicity: str) -> timedelta:
+    """Returns the distance between two consecutive periods."""
+    return timedelta(days=1) if periodicity == 'daily' else timedelta(weeks=1)
+
+
+def _scan_streaks(periods: Iterable[date], step: timedelta) -> Tuple[int, int, Optional[date]]:
+    """
+    Walks period start dates in ascending order in a single pass.
+
+    Args:
+        periods: Sorted period start dates (duplicates allowed)
+        step: Distance between two consecutive periods
+
+    Returns:
+        Tuple of (longest_streak, trailing_streak, last_period)
+    """
+    longest_streak = 0
+    trailing_streak = 0
+    last_period = None
+
+    for period in periods:
+        if period == last_period:
+            continue
+        if last_period is not None and period - last_period == step:
+            trailing_streak += 1
+        else:
+            trailing_streak = 1
+        longest_streak = max(longest_streak, trailing_streak)
+        last_period = period
+
+    return longest_streak, trailing_streak, last_period
+
+
+def _scan_history(history: Iterable[datetime], periodicity: str) -> Tuple[int, int, Optional[date], int, Optional[datetime]]:
+    """
+    Walks the check-off timestamps of one habit in a single streaming pass.
+
+    Args:
+        history: Check-off timestamps in ascending order (any iterable, consumed once)
+        periodicity: 'daily' or 'weekly'
+
+    Returns:
+        Tuple of (longest_streak, trailing_streak, last_period, total_completions, last_completion)
+    """
+    total = 0
+    last_completion = None
+
+    def periods():
+        nonlocal total, last_completion
+        for checked_at in history:
+            total += 1
+            last_completion = checked_at
+            yield _normalize_period(checked_at, periodicity)
+
+    longest_streak, trailing_streak, last_period = _scan_streaks(periods(), _period_step(periodicity))
+    return longest_streak, trailing_streak, last_period, total, last_completion
+
+
+def _current_streak(trailing_streak: int, last_period: Optional[date], periodicity: str) -> int:
+    """
+    Returns the trailing streak if it is still alive, 0 once a period was missed.
+
+    Args:
+        trailing_streak: Length of the streak ending at last_period
+        last_period: Most recent completed period
+        periodicity: 'daily' or 'weekly'
+    """
+    if last_period is None:
+        return 0
+    today = _normalize_period(datetime.now(), periodicity)
+    if today - last_period > _period_step(periodicity):
+        return 0  # Streak is broken
+    return trailing_streak
+
+
+def _current_streak_from_stats(stats: Optional[HabitStats], periodicity: str) -> int:
+    """
+    Returns the stored streak if it is still alive, 0 once a period was missed.
+
+    Args:
+        stats: Stored statistics of the habit (None without check-offs)
+        periodicity: 'daily' or 'weekly'
+    """
+    if stats is None:
+        return 0
+    if period_key(datetime.now(), periodicity) - stats.last_period_key > 1:
+        return 0  # Streak is broken
+    return stats.current_streak
 
 
 class AnalyticsService:
@@ -12,15 +130,31 @@ class AnalyticsService:
     Handles business logic for analytics operations.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, streak_engine: str = None, workers: int = None, user_id: str = None):
         """
         Initialize service.
 
         Args:
             db: Database connection (optional)
+            streak_engine: 'python', 'sql', 'stats', 'numpy' or 'parallel' (defaults to Config.STREAK_ENGINE);
+                           'numpy' falls back to 'python' when NumPy is not installed
+            workers: Worker processes of the 'parallel' engine (defaults to Config.ANALYTICS_WORKERS)
+            user_id: User whose habits are analyzed (defaults to Config.DEFAULT_USER_ID)
         """
-        self.habit_repo = HabitRepository(db)
-        self.tracker_repo = TrackerRepository(db)
+        if streak_engine is None:
+            streak_engine = Config.STREAK_ENGINE
+        if streak_engine not in Config.STREAK_ENGINE_OPTIONS:
+            raise ValueError(f"Streak engine must be one of {Config.STREAK_ENGINE_OPTIONS}")
+        if streak_engine == 'numpy' and not vectorized_analytics.NUMPY_AVAILABLE:
+            streak_engine = 'python'
+
+        self.streak_engine = streak_engine
+        self.workers = workers or Config.ANALYTICS_WORKERS or os.cpu_count() or 1
+        self.db = db
+        self.habit_repo = HabitRepository(db, user_id)
+        self.tracker_repo = TrackerRepository(db, user_id)
+        self.stats_repo = HabitStatsRepository(db, user_id)
+        self.user_id = self.habit_repo.user_id
 
     def calculate_longest_streak(self, habit_name: str) -> int:
         """
@@ -36,46 +170,20 @@ class AnalyticsService:
         if not habit:
             return 0
 
-        events = self.tracker_repo.find_by_habit_id(habit.habit_id)  # Use habit_id
-        if not events:
-            return 0
-
-        history = [event.checked_at for event in events]
-        periodicity = habit.periodicity
-
-        # Normalize dates based on periodicity
-        if periodicity == 'daily':
-            normalized_dates = sorted({d.date() for d in history})
-            step = timedelta(days=1)
-        else:
-            # Normalize to the start (Monday) of the ISO week
-            normalized_dates = sorted({
-                datetime.fromisocalendar(
-                    d.isocalendar()[0],
-                    d.isocalendar()[1],
-                    1
-                ).date()
-                for d in history
-            })
-            step = timedelta(weeks=1)
-
-        if len(normalized_dates) < 2:
-            return len(normalized_dates)
+        if self.streak_engine == 'sql':
+            return self.tracker_repo.find_longest_streak(habit.habit_id)
 
-        longest_streak = 0
-        current_streak = 1
+        if self.streak_engine == 'stats':
+            stats = self.stats_repo.find_by_habit_id(habit.habit_id)
+            return stats.longest_streak if stats else 0
 
-        for i in range(1, len(normalized_dates)):
-            prev = normalized_dates[i - 1]
-            curr = normalized_dates[i]
+        if self.streak_engine == 'numpy':
+            return self._array_figures(habit.habit_id, habit.periodicity)[1]
 
-            if curr - prev == step:
-                current_streak += 1
-            else:
-                longest_streak = max(longest_streak, current_streak)
-                current_streak = 1
-
-        return max(longest_streak, current_streak)
+        # Events stream in date order, so normalized periods are ascending
+        events = self.tracker_repo.iter_by_habit_id(habit.habit_id)
+        longest_streak, _, _, _, _ = _scan_history((event.checked_at for event in events), habit.periodicity)
+        return longest_streak
 
     def get_longest_streak_all_habits(self) -> Tuple[str, int]:
         """
@@ -88,6 +196,33 @@ class AnalyticsService:
         if not habits:
             return "", 0
 
+        if self.streak_engine == 'sql':
+            longest_streaks = self.tracker_repo.find_longest_streaks()
+            streaks = [(habit.name, longest_streaks.get(habit.habit_id, 0)) for habit in habits]
+            return max(streaks, key=lambda x: x[1])
+
+        if self.streak_engine == 'stats':
+            all_stats = self.stats_repo.find_all()
+            streaks = [
+                (habit.name, all_stats[habit.habit_id].longest_streak if habit.habit_id in all_stats else 0)
+                for habit in habits
+            ]
+            return max(streaks, key=lambda x: x[1])
+
+        if self.streak_engine == 'numpy':
+            day_arrays = self.tracker_repo.load_day_arrays()
+            streaks = []
+            for habit in habits:
+                days = day_arrays.get(habit.habit_id)
+                periods = vectorized_analytics.to_period_keys(days, habit.periodicity) if days is not None else ()
+                streaks.append((habit.name, vectorized_analytics.summarize_periods(periods)[1]))
+            return max(streaks, key=lambda x: x[1])
+
+        if self.streak_engine == 'parallel':
+            figures = self._summary_figures_parallel(habits)
+            streaks = [(habit.name, figures[habit.habit_id][2] if habit.habit_id in figures else 0) for habit in habits]
+            return max(streaks, key=lambda x: x[1])
+
         streaks = [
             (habit.name, self. calculate_longest_streak(habit. name))
             for habit in habits
@@ -109,74 +244,46 @@ class AnalyticsService:
         if not habit:
             return 0
 
-        events = self.tracker_repo.find_by_habit_id(habit.habit_id)  # Use habit_id
-        if not events:
-            return 0
-
-        history = [event.checked_at for event in events]
-        periodicity = habit.periodicity
+        if self.streak_engine == 'stats':
+            return _current_streak_from_stats(self.stats_repo.find_by_habit_id(habit.habit_id), habit.periodicity)
 
-        # Normalize dates
-        if periodicity == 'daily':
-            normalized_dates = sorted({d.date() for d in history})
-            step = timedelta(days=1)
-            today = datetime.now().date()
-        else:
-            normalized_dates = sorted({
-                datetime.fromisocalendar(
-                    d.isocalendar()[0],
-                    d. isocalendar()[1],
-                    1
-                ).date()
-                for d in history
-            })
-            step = timedelta(weeks=1)
-            today = datetime.fromisocalendar(
-                datetime.now().isocalendar()[0],
-                datetime.now().isocalendar()[1],
-                1
-            ).date()
-
-        if not normalized_dates:
-            return 0
-
-        # Check if the last entry is recent enough
-        last_date = normalized_dates[-1]
-        if today - last_date > step:
-            return 0  # Streak is broken
-
-        # Count backwards from the end
-        current_streak = 1
-        for i in range(len(normalized_dates) - 2, -1, -1):
-            if normalized_dates[i + 1] - normalized_dates[i] == step:
-                current_streak += 1
-            else:
-                break
+        if self.streak_engine == 'numpy':
+            _, _, trailing_streak, last_key = self._array_figures(habit.habit_id, habit.periodicity)
+            if last_key is None or period_key(datetime.now(), habit.periodicity) - last_key > 1:
+                return 0
+            return trailing_streak
 
-        return current_streak
+        events = self.tracker_repo.iter_by_habit_id(habit.habit_id)
+        _, trailing_streak, last_period, _, _ = _scan_history((event.checked_at for event in events), habit.periodicity)
+        return _current_streak(trailing_streak, last_period, habit.periodicity)
 
     def get_completion_summary(self) -> List[dict]:
         """
         Get a completion summary for all habits.
 
+        With the 'stats' engine the figures are read from habit_stats, with the
+        'numpy' engine they are computed from columnar day arrays; otherwise
+        all check-offs are loaded in one ordered scan and every habit's streaks
+        are computed in a single pass over its own rows.
+
         Returns:
             List of dictionaries with habit summary data
         """
         habits = self.habit_repo.find_all(include_inactive=True)
-        summary_data = []
+        if self.streak_engine == 'stats':
+            figures = self._summary_figures_from_stats(habits)
+        elif self.streak_engine == 'numpy':
+            figures = self._summary_figures_from_arrays(habits)
+        elif self.streak_engine == 'parallel':
+            figures = self._summary_figures_parallel(habits)
+        else:
+            figures = self._summary_figures_from_scan(habits)
 
+        summary_data = []
         for habit in habits:
-            # Get all completions for this habit
-            events = self.tracker_repo.find_by_habit_id(habit.habit_id)
-
-            # Calculate the last completion date
-            last_completion = events[-1].checked_at if events else None
-
-            # Calculate current streak
-            current_streak = self.get_current_streak(habit.name)
-
-            # Calculate longest streak
-            longest_streak = self.calculate_longest_streak(habit.name)
+            last_completion, current_streak, longest_streak, total_completions = figures.get(
+                habit.habit_id, (None, 0, 0, 0)
+            )
 
             summary_data.append({
                 'habit_id': habit.habit_id,
@@ -187,7 +294,7 @@ class AnalyticsService:
                 'last_completion': last_completion,
                 'current_streak': current_streak,
                 'longest_streak': longest_streak,
-                'total_completions': len(events)
+                'total_completions': total_completions
             })
 
         # Sort by periodicity (daily first), then by creation date
@@ -201,6 +308,189 @@ class AnalyticsService:
 
         return summary_data
 
+    def _summary_figures_from_scan(self, habits: List[Habit]) -> Dict[str, tuple]:
+        """
+        Computes summary figures from one streamed, ordered scan of all check-offs.
+        Only one habit's running figures are held at a time.
+
+        Args:
+            habits: Habits to summarize
+
+        Returns:
+            Dictionary of habit_id -> (last_completion, current_streak, longest_streak, total_completions)
+        """
+        habits_by_id = {habit.habit_id: habit for habit in habits}
+
+        figures = {}
+        for habit_id, rows in groupby(self.tracker_repo.iter_check_ins(), key=itemgetter(0)):
+            habit = habits_by_id.get(habit_id)
+            if habit is None:
+                continue
+            longest_streak, trailing_streak, last_period, total, last_completion = _scan_history(
+                (checked_at for _, checked_at in rows), habit.periodicity
+            )
+            figures[habit_id] = (
+                last_completion,
+                _current_streak(trailing_streak, last_period, habit.periodicity),
+                longest_streak,
+                total
+            )
+        return figures
+
+    def _summary_figures_from_stats(self, habits: List[Habit]) -> Dict[str, tuple]:
+        """
+        Reads summary figures from the habit_stats table.
+
+        Args:
+            habits: Habits to summarize
+
+        Returns:
+            Dictionary of habit_id -> (last_completion, current_streak, longest_streak, total_completions)
+        """
+        all_stats = self.stats_repo.find_all()
+
+        figures = {}
+        for habit in habits:
+            stats = all_stats.get(habit.habit_id)
+            if not stats:
+                continue
+            figures[habit.habit_id] = (
+                stats.last_completion,
+                _current_streak_from_stats(stats, habit.periodicity),
+                stats.longest_streak,
+                stats.total_completions
+            )
+        return figures
+
+    def _summary_figures_from_arrays(self, habits: List[Habit]) -> Dict[str, tuple]:
+        """
+        Computes summary figures with NumPy from per-habit arrays of day numbers.
+
+        Args:
+            habits: Habits to summarize
+
+        Returns:
+            Dictionary of habit_id -> (last_completion, current_streak, longest_streak, total_completions)
+        """
+        day_arrays = self.tracker_repo.load_day_arrays()
+        last_completions = self.tracker_repo.find_last_completions()
+
+        figures = {}
+        for habit in habits:
+            days = day_arrays.get(habit.habit_id)
+            if days is None:
+                continue
+            total, longest_streak, trailing_streak, last_key = vectorized_analytics.summarize_periods(
+                vectorized_analytics.to_period_keys(days, habit.periodicity)
+            )
+            if period_key(datetime.now(), habit.periodicity) - last_key > 1:
+                trailing_streak = 0  # Streak is broken
+            figures[habit.habit_id] = (
+                last_completions[habit.habit_id], trailing_streak, longest_streak, total
+            )
+        return figures
+
+    def _summary_figures_parallel(self, habits: List[Habit]) -> Dict[str, tuple]:
+        """
+        Computes summary figures on worker processes, one habit ID range each.
+        Falls back to a single in-process scan for in-memory databases, which
+        other processes cannot open.
+
+        Args:
+            habits: Habits to summarize
+
+        Returns:
+            Dictionary of habit_id -> (last_completion, current_streak, longest_streak, total_completions)
+        """
+        from services.parallel_analytics import summarize_parallel
+
+        con = Database.resolve(self.db, self.user_id)
+        db_file = next((row[2] for row in con.execute("PRAGMA database_list") if row[1] == 'main'), '')
+        if not db_file:
+            return self._summary_figures_from_scan(habits)
+
+        periodicities = {habit.habit_id: habit.periodicity for habit in habits}
+        partials = summarize_parallel(db_file, periodicities, self.workers, self.user_id)
+
+        figures = {}
+        now = datetime.now()
+        for habit_id, (last_completion, longest_streak, trailing_streak, last_key, total) in partials.items():
+            if period_key(now, periodicities[habit_id]) - last_key > 1:
+                trailing_streak = 0  # Streak is broken
+            figures[habit_id] = (datetime.fromisoformat(last_completion), trailing_streak, longest_streak, total)
+        return figures
+
+    def _array_figures(self, habit_id: str, periodicity: str) -> Tuple[int, int, int, Optional[int]]:
+        """
+        Computes (total, longest, trailing, last_period_key) of one habit with NumPy.
+        """
+        days = self.tracker_repo.load_day_arrays(habit_id).get(habit_id)
+        if days is None:
+            return 0, 0, 0, None
+        return vectorized_analytics.summarize_periods(vectorized_analytics.to_period_keys(days, periodicity))
+
+    def get_completion_rates(self) -> Dict[str, float]:
+        """
+        Returns the share of periods completed by each habit, from its first
+        check-off up to the current period. Vectorized with NumPy when available.
+
+        Returns:
+            Dictionary of habit name -> completion rate between 0.0 and 1.0
+        """
+        habits = self.habit_repo.find_all(include_inactive=True)
+        now = datetime.now()
+
+        if vectorized_analytics.NUMPY_AVAILABLE:
+            day_arrays = self.tracker_repo.load_day_arrays()
+            rates = {}
+            for habit in habits:
+                days = day_arrays.get(habit.habit_id)
+                rates[habit.name] = vectorized_analytics.completion_rate(
+                    vectorized_analytics.to_period_keys(days, habit.periodicity),
+                    period_key(now, habit.periodicity)
+                ) if days is not None else 0.0
+            return rates
+
+        periodicities = {habit.habit_id: habit.periodicity for habit in habits}
+        completed = {}
+        for habit_id, checked_at in self.tracker_repo.iter_check_ins():
+            if habit_id in periodicities:
+                completed.setdefault(habit_id, set()).add(period_key(checked_at, periodicities[habit_id]))
+
+        rates = {}
+        for habit in habits:
+            keys = completed.get(habit.habit_id)
+            if not keys:
+                rates[habit.name] = 0.0
+                continue
+            current_key = max(period_key(now, habit.periodicity), max(keys))
+            rates[habit.name] = len(keys) / (current_key - min(keys) + 1)
+        return rates
+
+    def check_stats_consistency(self) -> List[dict]:
+        """
+        Compares the habit_stats table with streaks computed on the fly from the tracker table.
+
+        Returns:
+            List of mismatches, each with the habit name and the expected/actual figures
+        """
+        reference = AnalyticsService(self.habit_repo.db, streak_engine='python', user_id=self.user_id)
+        habits = self.habit_repo.find_all(include_inactive=True)
+        expected_figures = reference._summary_figures_from_scan(habits)
+        actual_figures = self._summary_figures_from_stats(habits)
+
+        empty = (None, 0, 0, 0)
+        return [
+            {
+                'habit_id': habit.habit_id,
+                'name': habit.name,
+                'expected': expected_figures.get(habit.habit_id, empty),
+                'actual': actual_figures.get(habit.habit_id, empty)
+            }
+            for habit in habits
+            if expected_figures.get(habit.habit_id, empty) != actual_figures.get(habit.habit_id, empty)
+        ]
+
     def get_habit_completion_history(self, habit_name: str) -> Optional[dict]:
         """
         Get a detailed completion history for a specific habit.
@@ -215,16 +505,14 @@ class AnalyticsService:
         if not habit:
             return None
 
-        events = self.tracker_repo.find_by_habit_id(habit.habit_id)
-
-        # Sort by date (oldest first)
+        # Events stream in date order (oldest first)
         completions = [
             {
                 'event_id': event.event_id,  # ADDED
                 'checked_at': event.checked_at,
                 'notes': event.notes
             }
-            for event in sorted(events, key=lambda e: e.checked_at)
+            for event in self.tracker_repo.iter_by_habit_id(habit.habit_id)
         ]
 
         return {
@@ -237,4 +525,56 @@ class AnalyticsService:
             'total_completions': len(completions),
             'longest_streak': self.calculate_longest_streak(habit_name),
             'current_streak': self.get_current_streak(habit_name)
-        }
\ No newline at end of file
+        }
+
+    def get_habit_completion_page(
+            self,
+            habit_name: str,
+            after: tuple = None,
+            before: tuple = None,
+            page_size: int = None
+    ) -> Optional[dict]:
+        """
+        Get one page of the completion history of a habit. Unlike
+        get_habit_completion_history, the cost does not grow with the history:
+        the page is one keyset query and the totals come from habit_stats.
+
+        Args:
+            habit_name: Name of the habit
+            after: next_cursor of the page shown before (optional)
+            before: previous_cursor of the page shown before (optional)
+            page_size: Completions per page (defaults to Config.PAGE_SIZE)
+
+        Returns:
+            Dictionary with habit details, the page's completions (oldest first)
+            and the cursors of its neighbours (None where there is no such page)
+        """
+        habit = self.habit_repo.find_by_name(habit_name)
+        if not habit:
+            return None
+
+        page_size = page_size or Config.PAGE_SIZE
+        events = self.tracker_repo.find_page_by_habit_id(habit.habit_id, after, before, page_size + 1)
+        events, has_previous, has_next = trim_page(events, page_size, after, before)
+        stats = self.stats_repo.find_by_habit_id(habit.habit_id)
+
+        return {
+            'habit_id': habit.habit_id,
+            'name': habit.name,
+            'periodicity': habit.periodicity,
+            'created_at': habit.created_at,
+            'description': habit.description,
+            'completions': [
+                {
+                    'event_id': event.event_id,
+                    'checked_at': event.checked_at,
+                    'notes': event.notes
+                }
+                for event in events
+            ],
+            'total_completions': stats.total_completions if stats else 0,
+            'longest_streak': self.calculate_longest_streak(habit_name),
+            'current_streak': self.get_current_streak(habit_name),
+            'previous_cursor': (events[0].checked_at_iso, events[0].event_id) if events and has_previous else None,
+            'next_cursor': (events[-1].checked_at_iso, events[-1].event_id) if events and has_next else None
+        }
@@ -0,0 +1,188 @@
+"""
+Async Services - asyncio wrappers around the service layer
+
+Each call runs the synchronous service on a ConnectionPool thread with that
+thread's own connection, so the event loop never blocks on SQLite. Writes go
+to the pool's single writer thread, reads to its reader threads.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from database.pool import ConnectionPool
+from models.habit import Habit
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+def _invoke(con, service_class, method: str, args: tuple, kwargs: dict):
+    """Runs one service method on a pool connection."""
+    return getattr(service_class(con), method)(*args, **kwargs)
+
+
+class _AsyncService:
+    """Shared plumbing: the pool and the read/write dispatch."""
+
+    service_class = None
+
+    def __init__(self, pool: ConnectionPool = None, db_name: str = None):
+        """
+        Initialize service.
+
+        Args:
+            pool: Connection pool shared with other async services (optional)
+            db_name: Database filename for a pool of its own (used without pool)
+        """
+        self._owns_pool = pool is None
+        self.pool = pool or ConnectionPool(db_name)
+
+    async def _read(self, method: str, *args, **kwargs):
+        return await self.pool.read(_invoke, self.service_class, method, args, kwargs)
+
+    async def _write(self, method: str, *args, **kwargs):
+        return await self.pool.write(_invoke, self.service_class, method, args, kwargs)
+
+    def close(self):
+        """Closes the pool if this service created it."""
+        if self._owns_pool:
+            self.pool.close()
+
+
+class AsyncHabitService(_AsyncService):
+    """
+    Async counterpart of HabitService.
+    """
+
+    service_class = HabitService
+
+    async def create_habit(self, name: str, periodicity: str, description: str = "") -> Tuple[bool, str]:
+        """See HabitService.create_habit."""
+        return await self._write('create_habit', name, periodicity, description)
+
+    async def update_habit(
+        self,
+        old_name: str,
+        new_name: str,
+        new_periodicity: str,
+        new_status: bool = True,
+        new_description: str = ""
+    ) -> Tuple[bool, str]:
+        """See HabitService.update_habit."""
+        return await self._write('update_habit', old_name, new_name, new_periodicity, new_status, new_description)
+
+    async def delete_habit(self, name: str, soft_delete: bool = True) -> Tuple[bool, str]:
+        """See HabitService.delete_habit."""
+        return await self._write('delete_habit', name, soft_delete)
+
+    async def get_all_habits(self, include_inactive: bool = False) -> List[Habit]:
+        """See HabitService.get_all_habits."""
+        return await self._read('get_all_habits', include_inactive)
+
+    async def get_habit_page(self, after: tuple = None, before: tuple = None,
+                             page_size: int = None, include_inactive: bool = False) -> dict:
+        """See HabitService.get_habit_page."""
+        return await self._read('get_habit_page', after, before, page_size, include_inactive)
+
+    async def get_habit_by_name(self, name: str) -> Optional[Habit]:
+        """See HabitService.get_habit_by_name."""
+        return await self._read('get_habit_by_name', name)
+
+    async def get_habits_by_periodicity(self, periodicity: str, include_inactive: bool = False) -> List[Habit]:
+        """See HabitService.get_habits_by_periodicity."""
+        return await self._read('get_habits_by_periodicity', periodicity, include_inactive)
+
+    async def has_habits(self) -> bool:
+        """See HabitService.has_habits."""
+        return await self._read('has_habits')
+
+
+class AsyncTrackerService(_AsyncService):
+    """
+    Async counterpart of TrackerService.
+    """
+
+    service_class = TrackerService
+
+    async def check_off_habit(
+            self,
+            habit_name: str,
+            checked_at: datetime = None,
+            notes: str = ""
+    ) -> Tuple[bool, str]:
+        """See TrackerService.check_off_habit."""
+        return await self._write('check_off_habit', habit_name, checked_at, notes)
+
+    async def check_off_many(self, entries: Iterable[tuple]) -> Tuple[int, List[Tuple[int, str]]]:
+        """See TrackerService.check_off_many."""
+        return await self._write('check_off_many', list(entries))
+
+    async def get_habit_history(self, habit_name: str) -> List[datetime]:
+        """See TrackerService.get_habit_history."""
+        return await self._read('get_habit_history', habit_name)
+
+    async def get_habit_history_with_notes(self, habit_name: str) -> List[Tuple[datetime, str]]:
+        """See TrackerService.get_habit_history_with_notes."""
+        return await self._read('get_habit_history_with_notes', habit_name)
+
+    async def update_completion_notes(self, event_id: str, notes: str) -> Tuple[bool, str]:
+        """See TrackerService.update_completion_notes."""
+        return await self._write('update_completion_notes', event_id, notes)
+
+
+class AsyncAnalyticsService(_AsyncService):
+    """
+    Async counterpart of AnalyticsService. The per-habit figures can be
+    fanned out across the reader threads with asyncio.gather.
+    """
+
+    service_class = AnalyticsService
+
+    async def calculate_longest_streak(self, habit_name: str) -> int:
+        """See AnalyticsService.calculate_longest_streak."""
+        return await self._read('calculate_longest_streak', habit_name)
+
+    async def get_current_streak(self, habit_name: str) -> int:
+        """See AnalyticsService.get_current_streak."""
+        return await self._read('get_current_streak', habit_name)
+
+    async def get_longest_streak_all_habits(self) -> Tuple[str, int]:
+        """See AnalyticsService.get_longest_streak_all_habits."""
+        return await self._read('get_longest_streak_all_habits')
+
+    async def get_completion_summary(self) -> List[dict]:
+        """See AnalyticsService.get_completion_summary."""
+        return await self._read('get_completion_summary')
+
+    async def get_completion_rates(self) -> Dict[str, float]:
+        """See AnalyticsService.get_completion_rates."""
+        return await self._read('get_completion_rates')
+
+    async def get_habit_completion_history(self, habit_name: str) -> Optional[dict]:
+        """See AnalyticsService.get_habit_completion_history."""
+        return await self._read('get_habit_completion_history', habit_name)
+
+    async def get_habit_completion_page(self, habit_name: str, after: tuple = None,
+                                        before: tuple = None, page_size: int = None) -> Optional[dict]:
+        """See AnalyticsService.get_habit_completion_page."""
+        return await self._read('get_habit_completion_page', habit_name, after, before, page_size)
+
+    async def get_streaks(self, habit_names: Iterable[str] = None) -> Dict[str, Tuple[int, int]]:
+        """
+        Computes the streaks of many habits concurrently.
+
+        Args:
+            habit_names: Habits to analyze (defaults to all habits, including inactive ones)
+
+        Returns:
+            Dictionary of habit name -> (longest_streak, current_streak)
+        """
+        if habit_names is None:
+            habits = await self.pool.read(_invoke, HabitService, 'get_all_habits', (True,), {})
+            habit_names = [habit.name for habit in habits]
+        habit_names = list(habit_names)
+
+        longest, current = await asyncio.gather(
+            asyncio.gather(*(self.calculate_longest_streak(name) for name in habit_names)),
+            asyncio.gather(*(self.get_current_streak(name) for name in habit_names))
+        )
+        return {name: (longest[i], current[i]) for i, name in enumerate(habit_names)}
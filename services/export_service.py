@@ -0,0 +1,211 @@
+"""
+Export Service - Streams habits and check-offs to CSV or JSON Lines files
+"""
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO, Tuple
+from config import Config
+from repositories.habit_repository import HabitRepository
+from repositories.tracker_repository import TrackerRepository
+
+# Columns of the exported records, in file order
+EVENT_FIELDS = ('event_id', 'habit_id', 'habit', 'periodicity', 'checked_at', 'notes')
+HABIT_FIELDS = ('habit_id', 'name', 'periodicity', 'created_at', 'updated_at', 'is_active', 'description')
+
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_TABLES = ('events', 'habits')
+
+
+def detect_format(path: str) -> str:
+    """
+    Returns the export format of a file name: 'jsonl' for .jsonl/.json (optionally .gz), 'csv' otherwise.
+
+    Args:
+        path: Output file name
+
+    Returns:
+        'csv' or 'jsonl'
+    """
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'jsonl' if name.endswith(('.jsonl', '.json')) else 'csv'
+
+
+@contextmanager
+def open_text(path: str, mode: str, compress: bool = None) -> Iterator[TextIO]:
+    """
+    Opens a text file for streaming through a large buffer, gzip-compressed
+    if asked for or if the name ends in .gz. '-' is standard input or output,
+    which is left open.
+
+    Args:
+        path: File name or '-'
+        mode: 'r' or 'w'
+        compress: Whether the file is gzip-compressed (defaults to path.endswith('.gz'))
+
+    Returns:
+        Context manager of a text stream (newline translation off, as the csv module expects)
+    """
+    if compress is None:
+        compress = path.endswith('.gz')
+
+    with ExitStack() as stack:
+        if path == '-':
+            raw = sys.stdout.buffer if mode == 'w' else sys.stdin.buffer
+        else:
+            raw = stack.enter_context(open(path, mode + 'b', buffering=Config.EXPORT_BUFFER_SIZE))
+        if compress:
+            raw = stack.enter_context(gzip.GzipFile(fileobj=raw, mode=mode + 'b'))
+
+        stream = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+        try:
+            yield stream
+        finally:
+            stream.flush()
+            stream.detach()
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    """Groups rows into lists of at most size rows."""
+    rows = iter(rows)
+    chunk = list(islice(rows, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, size))
+
+
+class ExportService:
+    """
+    Handles exporting the data of one user.
+    Rows stream from a database cursor to the file one fetch batch at a time,
+    so memory use does not depend on the number of exported rows.
+    """
+
+    def __init__(self, db=None, user_id: str = None):
+        """
+        Initialize service.
+
+        Args:
+            db: Database connection (optional)
+            user_id: User whose data is exported (defaults to Config.DEFAULT_USER_ID)
+        """
+        self.habit_repo = HabitRepository(db, user_id)
+        self.tracker_repo = TrackerRepository(db, user_id)
+
+    def export(
+            self,
+            output: str,
+            table: str = 'events',
+            fmt: str = None,
+            compress: bool = None,
+            habit_names: List[str] = None,
+            periodicity: str = None,
+            start: date = None,
+            end: date = None
+    ) -> Tuple[bool, str]:
+        """
+        Exports habits or check-off events to a file.
+
+        Args:
+            output: File name, '-' for standard output
+            table: 'events' (check-offs with their habit's name and periodicity) or 'habits'
+            fmt: 'csv' or 'jsonl' (defaults to detect_format(output))
+            compress: Whether to gzip the file (defaults to output.endswith('.gz'))
+            habit_names: Only these habits (names or IDs, optional)
+            periodicity: Only habits with this periodicity (optional)
+            start: First day to export (inclusive, optional)
+            end: Last day to export (inclusive, optional)
+
+        Returns:
+            Tuple of (success: bool, message: str); the message reports the export rate
+        """
+        fmt = fmt or detect_format(output)
+        if fmt not in EXPORT_FORMATS:
+            return False, f"Unknown export format '{fmt}'"
+        if table not in EXPORT_TABLES:
+            return False, f"Unknown export table '{table}'"
+        if start and end and start > end:
+            return False, "The start date is after the end date"
+
+        habit_ids = None
+        if habit_names:
+            habits = self.habit_repo.find_by_names_or_ids(habit_names)
+            found = {habit.habit_id for habit in habits} | {habit.name.lower() for habit in habits}
+            missing = [name for name in dict.fromkeys(habit_names) if name not in found and name.lower() not in found]
+            if missing:
+                return False, f"No habit found for {', '.join(missing)}"
+            habit_ids = [habit.habit_id for habit in habits]
+
+        if table == 'events':
+            fields = EVENT_FIELDS
+            rows = self.tracker_repo.iter_export_rows(habit_ids, periodicity, start, end)
+        else:
+            fields = HABIT_FIELDS
+            rows = self._habit_rows(habit_ids, periodicity, start, end)
+
+        started = time.perf_counter()
+        try:
+            with open_text(output, 'w', compress) as stream:
+                count = self._write(stream, fmt, fields, rows)
+        except OSError as e:
+            return False, f"Failed to write {output}: {e}"
+        elapsed = time.perf_counter() - started
+
+        rate = count / elapsed if elapsed > 0 else 0
+        return True, f"Exported {count:,} {table} in {elapsed:.2f} s ({rate:,.0f} rows/s)"
+
+    def _habit_rows(
+            self,
+            habit_ids: Optional[List[str]],
+            periodicity: Optional[str],
+            start: Optional[date],
+            end: Optional[date]
+    ) -> Iterator[tuple]:
+        """Yields the HABIT_FIELDS of the habits matching the filters; the date range applies to creation."""
+        wanted = set(habit_ids) if habit_ids is not None else None
+        for habit in self.habit_repo.find_all(include_inactive=True):
+            if wanted is not None and habit.habit_id not in wanted:
+                continue
+            if periodicity is not None and habit.periodicity != periodicity:
+                continue
+            created = habit.created_at.date()
+            if (start and created < start) or (end and created > end):
+                continue
+            yield (
+                habit.habit_id, habit.name, habit.periodicity, habit.created_at_iso,
+                habit.updated_at.isoformat(), int(habit.is_active), habit.description
+            )
+
+    @staticmethod
+    def _write(stream: TextIO, fmt: str, fields: tuple, rows: Iterable[tuple]) -> int:
+        """
+        Writes the rows a chunk at a time.
+
+        Args:
+            stream: Output text stream
+            fmt: 'csv' or 'jsonl'
+            fields: Column names
+            rows: Rows in column order
+
+        Returns:
+            Number of rows written
+        """
+        count = 0
+        if fmt == 'csv':
+            writer = csv.writer(stream)
+            writer.writerow(fields)
+            for chunk in _chunks(rows, Config.FETCH_BATCH_SIZE):
+                writer.writerows(chunk)
+                count += len(chunk)
+        else:
+            dumps = json.JSONEncoder(ensure_ascii=False).encode
+            for chunk in _chunks(rows, Config.FETCH_BATCH_SIZE):
+                stream.write("".join(dumps(dict(zip(fields, row))) + "\n" for row in chunk))
+                count += len(chunk)
+        return count
@@ -5,6 +5,7 @@ Habit Service - Business logic for habit operations
 from typing import List, Optional, Tuple
 from models.habit import Habit
 from repositories.habit_repository import HabitRepository
+from database.keyset import trim_page
 from config import Config
 
 
@@ -13,14 +14,15 @@ class HabitService:
     Handles business logic for habit operations.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, user_id: str = None):
         """
         Initialize service.
 
         Args:
             db: Database connection (optional)
+            user_id: User whose habits are managed (defaults to Config.DEFAULT_USER_ID)
         """
-        self.repository = HabitRepository(db)
+        self.repository = HabitRepository(db, user_id)
 
     def create_habit(self, name: str, periodicity: str, description: str = "") -> Tuple[bool, str]:
         """
@@ -91,10 +93,12 @@ class HabitService:
         # Check if new name conflicts with existing habit
         if new_name != old_name:
             existing = self.repository. find_by_name(new_name)
-            if existing:
+            if existing and existing.habit_id != old_habit.habit_id:
                 return False, f"Habit '{new_name}' already exists"
 
-        # Update the habit object
+        # Update the habit object. It is the instance shared through the
+        # repository's identity map, so a failed write restores it.
+        previous = (old_habit.name, old_habit.periodicity, old_habit.description, old_habit.is_active)
         old_habit.name = new_name.strip()
         old_habit.periodicity = new_periodicity
         if new_description is not None:
@@ -107,6 +111,7 @@ class HabitService:
         if success:
             return True, f"Habit updated successfully"
         else:
+            old_habit.name, old_habit.periodicity, old_habit.description, old_habit.is_active = previous
             return False, "Failed to update habit"
 
     def delete_habit(self, name: str, soft_delete: bool = True) -> Tuple[bool, str]:
@@ -145,6 +150,39 @@ class HabitService:
         """
         return self.repository.find_all(include_inactive)
 
+    def get_habit_page(
+            self,
+            after: tuple = None,
+            before: tuple = None,
+            page_size: int = None,
+            include_inactive: bool = False
+    ) -> dict:
+        """
+        Returns one page of habits, daily first, then the oldest first.
+
+        Args:
+            after: next_cursor of the page shown before (optional)
+            before: previous_cursor of the page shown before (optional)
+            page_size: Habits per page (defaults to Config.PAGE_SIZE)
+            include_inactive: Whether to include inactive habits
+
+        Returns:
+            Dictionary with the page's habits and the cursors of its neighbours
+            (None where there is no such page)
+        """
+        page_size = page_size or Config.PAGE_SIZE
+        rows = self.repository.find_page(after, before, page_size + 1, include_inactive)
+        habits, has_previous, has_next = trim_page(rows, page_size, after, before)
+
+        def cursor(habit: Habit) -> tuple:
+            return habit.periodicity, habit.created_at_iso, habit.habit_id
+
+        return {
+            'habits': habits,
+            'previous_cursor': cursor(habits[0]) if habits and has_previous else None,
+            'next_cursor': cursor(habits[-1]) if habits and has_next else None
+        }
+
     def get_habit_by_name(self, name: str) -> Optional[Habit]:
         """
         Find a habit by name.
@@ -0,0 +1,240 @@
+"""
+Import Service - Bulk-loads check-offs from CSV or JSON Lines files
+"""
+import csv
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterator, Optional, TextIO, Tuple, Union
+from config import Config
+from database.connection import Database
+from database.streaks import day_key, week_key
+from repositories.identity_map import nocase_key
+from repositories.tracker_repository import TrackerRepository
+from services.export_service import EVENT_FIELDS, EXPORT_FORMATS, detect_format, open_text
+from services.habit_service import HabitService
+
+# Event IDs of rows without one are derived from habit and timestamp, so importing a file twice adds nothing
+IMPORT_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "habit-tracker/import")
+
+
+def _records(stream: TextIO, fmt: str) -> Iterator[tuple]:
+    """
+    Yields the EVENT_FIELDS of each record of a CSV or JSON Lines stream,
+    None for missing columns. Only habit (or habit_id) and checked_at are required.
+    A JSON line that is not an object yields an error message instead, so
+    that it is skipped without shifting the numbers of the records after it.
+
+    Args:
+        stream: Input text stream
+        fmt: 'csv' or 'jsonl'
+    """
+    if fmt == 'csv':
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = [header.index(field) if field in header else None for field in EVENT_FIELDS]
+        width = len(header)
+        for row in reader:
+            if len(row) < width:
+                row += [''] * (width - len(row))
+            yield tuple(row[column] if column is not None else None for column in columns)
+    else:
+        for line in stream:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield f"invalid JSON ({e})"
+                    continue
+                if not isinstance(record, dict):
+                    yield f"expected a JSON object, got {type(record).__name__}"
+                    continue
+                yield tuple(
+                    None if record.get(field) is None else str(record[field]) for field in EVENT_FIELDS
+                )
+
+
+class ImportService:
+    """
+    Handles importing the check-off history of one user from files.
+    Records stream from the file, habit names resolve through an in-memory
+    map, and check-offs are inserted in large transactions, skipping event
+    IDs that are already recorded. habit_stats is refreshed once at the end.
+    """
+
+    def __init__(self, db=None, user_id: str = None):
+        """
+        Initialize service.
+
+        Args:
+            db: Database connection (optional)
+            user_id: User whose check-offs are imported (defaults to Config.DEFAULT_USER_ID)
+        """
+        self.habit_service = HabitService(db, user_id)
+        self.habit_repo = self.habit_service.repository
+        self.tracker_repo = TrackerRepository(db, user_id)
+
+    def import_file(
+            self,
+            source: str,
+            fmt: str = None,
+            compress: bool = None,
+            create_missing: bool = True,
+            periodicity: str = 'daily',
+            batch_size: int = None,
+            checkpoint: str = None,
+            progress: Callable[[int, int, float], None] = None
+    ) -> Tuple[bool, str]:
+        """
+        Imports check-offs from a file in the export format: records with
+        habit (name) and/or habit_id, checked_at, and optionally event_id,
+        periodicity and notes.
+
+        Args:
+            source: File name, '-' for standard input
+            fmt: 'csv' or 'jsonl' (defaults to detect_format(source))
+            compress: Whether the file is gzipped (defaults to source.endswith('.gz'))
+            create_missing: Whether to create habits that do not exist yet
+            periodicity: Periodicity of created habits whose records do not name one
+            batch_size: Records per transaction (defaults to Config.IMPORT_BATCH_SIZE)
+            checkpoint: File recording the progress after every batch (optional);
+                        if it exists, the import resumes after the recorded records
+            progress: Called after every batch with (records read, rows inserted, seconds)
+
+        Returns:
+            Tuple of (success: bool, message: str); the message reports the counts and rate
+        """
+        fmt = fmt or detect_format(source)
+        if fmt not in EXPORT_FORMATS:
+            return False, f"Unknown import format '{fmt}'"
+        if periodicity not in Config.DEFAULT_PERIODICITY_OPTIONS:
+            return False, f"Invalid periodicity '{periodicity}'"
+        batch_size = batch_size or Config.IMPORT_BATCH_SIZE
+
+        state = {
+            'source': os.path.abspath(source) if source != '-' else source,
+            'records': 0, 'inserted': 0, 'duplicates': 0, 'skipped': 0, 'created': 0
+        }
+        if checkpoint and os.path.exists(checkpoint):
+            with open(checkpoint, encoding='utf-8') as stream:
+                saved = json.load(stream)
+            if saved.get('source') != state['source']:
+                return False, f"Checkpoint {checkpoint} belongs to the import of {saved.get('source')}"
+            state.update(saved)
+        resumed_at = state['records']
+        first_error = None
+
+        # Names match regardless of ASCII case, like HabitRepository.find_by_name
+        habit_ids: Dict[Union[str, bytes], str] = {}
+        for habit in self.habit_repo.find_all(include_inactive=True):
+            habit_ids[habit.habit_id] = habit.habit_id
+            habit_ids[nocase_key(habit.name)] = habit.habit_id
+
+        now = datetime.now()
+        started = time.perf_counter()
+        try:
+            with Database.bulk_load(Database.resolve(self.tracker_repo.db, self.tracker_repo.user_id)), \
+                    open_text(source, 'r', compress) as stream:
+                records = islice(_records(stream, fmt), resumed_at, None)
+                number = resumed_at
+                while True:
+                    batch = []
+                    for record in islice(records, batch_size):
+                        number += 1
+                        if isinstance(record, str):
+                            state['skipped'] += 1
+                            first_error = first_error or f"record {number}: {record}"
+                            continue
+                        event_id, habit_id, name, record_periodicity, checked_at, notes = record
+                        habit_id = habit_ids.get(habit_id) or (name and habit_ids.get(nocase_key(name)))
+                        if not habit_id:
+                            if not name or not create_missing:
+                                state['skipped'] += 1
+                                first_error = first_error or f"record {number}: habit '{name}' not found"
+                                continue
+                            habit_id, error = self._create_habit(name, record_periodicity or periodicity)
+                            if error:
+                                state['skipped'] += 1
+                                first_error = first_error or f"record {number}: {error}"
+                                continue
+                            habit_ids[habit_id] = habit_ids[nocase_key(name)] = habit_id
+                            state['created'] += 1
+
+                        try:
+                            checked = datetime.fromisoformat(checked_at)
+                        except (TypeError, ValueError):
+                            state['skipped'] += 1
+                            first_error = first_error or f"record {number}: invalid timestamp '{checked_at}'"
+                            continue
+                        if checked.tzinfo is not None:
+                            checked = checked.astimezone().replace(tzinfo=None)
+                        if checked > now:
+                            state['skipped'] += 1
+                            first_error = first_error or f"record {number}: timestamp in the future"
+                            continue
+
+                        iso = checked.isoformat()
+                        batch.append((
+                            event_id or str(uuid.uuid5(IMPORT_NAMESPACE, f"{habit_id} {iso}")),
+                            habit_id, iso, notes or "", day_key(checked), week_key(checked)
+                        ))
+
+                    if number == state['records']:
+                        break
+
+                    # The statistics are committed with their check-offs, so they stay
+                    # consistent when a later batch fails or the process is killed
+                    habits = sorted({row[1] for row in batch})
+                    inserted = self.tracker_repo.insert_rows(batch, habits) if batch else 0
+                    if inserted is None:
+                        return False, f"Failed to import records {state['records'] + 1}-{number}"
+                    state['inserted'] += inserted
+                    state['duplicates'] += len(batch) - inserted
+                    state['records'] = number
+                    if checkpoint:
+                        self._save_checkpoint(checkpoint, state)
+                    if progress:
+                        progress(number, state['inserted'], time.perf_counter() - started)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            return False, f"Failed to read {source} after record {state['records']}: {e}"
+
+        if checkpoint and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.perf_counter() - started
+        rate = (state['records'] - resumed_at) / elapsed if elapsed > 0 else 0
+        message = (
+            f"Imported {state['inserted']:,} of {state['records']:,} records "
+            f"({state['duplicates']:,} duplicates, {state['skipped']:,} skipped, "
+            f"{state['created']:,} habits created) in {elapsed:.2f} s ({rate:,.0f} rows/s)"
+        )
+        if resumed_at:
+            message += f", resumed after record {resumed_at:,}"
+        if first_error:
+            message += f"; first skipped {first_error}"
+        return True, message
+
+    def _create_habit(self, name: str, periodicity: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Creates a habit for records naming an unknown one.
+
+        Returns:
+            Tuple of (habit ID, None) or (None, error message)
+        """
+        success, message = self.habit_service.create_habit(name, periodicity)
+        if not success:
+            return None, message
+        return self.habit_repo.find_by_name(name).habit_id, None
+
+    @staticmethod
+    def _save_checkpoint(checkpoint: str, state: dict):
+        """Writes the checkpoint atomically, so an interrupted write never leaves a truncated file."""
+        partial = f"{checkpoint}.tmp"
+        with open(partial, 'w', encoding='utf-8') as stream:
+            json.dump(state, stream)
+        os.replace(partial, checkpoint)
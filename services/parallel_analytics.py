@@ -0,0 +1,133 @@
+"""
+Parallel analytics - Streak figures computed by worker processes
+
+Habits are partitioned into contiguous habit ID ranges. Every worker
+process opens its own read-only connection, scans the check-offs of one
+range in habit/date order and returns per-habit partials; the parent
+merges them. Partitions never share a habit, so merging is a dict union.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from database.connection import Database
+from repositories.tracker_repository import TrackerRepository
+
+# Partitions per worker: smaller ranges even out habits with very different history sizes
+PARTITIONS_PER_WORKER = 4
+
+
+def partition_habit_ids(habit_ids: List[str], partitions: int) -> List[Tuple[str, str]]:
+    """
+    Splits habit IDs into contiguous, non-overlapping ranges of similar size.
+
+    Args:
+        habit_ids: Habit IDs to partition
+        partitions: Maximum number of ranges
+
+    Returns:
+        List of (first_habit_id, last_habit_id) ranges, both inclusive
+    """
+    ordered = sorted(set(habit_ids))
+    if not ordered:
+        return []
+    size = -(-len(ordered) // max(1, partitions))  # Ceiling division
+    return [
+        (ordered[start], ordered[min(start + size, len(ordered)) - 1])
+        for start in range(0, len(ordered), size)
+    ]
+
+
+def summarize_range(
+        db_name: str,
+        first_habit_id: str,
+        last_habit_id: str,
+        periodicities: Dict[str, str],
+        user_id: str = None
+) -> Dict[str, Tuple[str, int, int, int, int]]:
+    """
+    Computes the streak partials of one habit ID range. Runs in a worker process.
+
+    Args:
+        db_name: Database filename
+        first_habit_id: Lowest habit ID of the range (inclusive)
+        last_habit_id: Highest habit ID of the range (inclusive)
+        periodicities: Dictionary of habit_id -> periodicity of the habits to summarize
+        user_id: Owner of the habits (defaults to Config.DEFAULT_USER_ID)
+
+    Returns:
+        Dictionary of habit_id -> (last_completion, longest_streak, trailing_streak,
+        last_period_key, total_completions); last_completion is an ISO string
+    """
+    con = Database.connect_read_only(db_name)
+    try:
+        rows = TrackerRepository(con, user_id).find_period_keys_in_range(first_habit_id, last_habit_id)
+    finally:
+        con.close()
+
+    partials = {}
+    current_id: Optional[str] = None
+    weekly = False
+    longest = trailing = total = 0
+    last_key: Optional[int] = None
+    last_completion = None
+
+    for habit_id, day, week, checked_at in rows:
+        if habit_id != current_id:
+            if current_id in periodicities:
+                partials[current_id] = (last_completion, longest, trailing, last_key, total)
+            current_id = habit_id
+            weekly = periodicities.get(habit_id) == 'weekly'
+            longest = trailing = total = 0
+            last_key = None
+
+        key = week if weekly else day
+        total += 1
+        last_completion = checked_at
+        if key == last_key:
+            continue
+        trailing = trailing + 1 if last_key is not None and key - last_key == 1 else 1
+        longest = max(longest, trailing)
+        last_key = key
+
+    if current_id in periodicities:
+        partials[current_id] = (last_completion, longest, trailing, last_key, total)
+    return partials
+
+
+def summarize_parallel(
+        db_name: str,
+        periodicities: Dict[str, str],
+        workers: int,
+        user_id: str = None
+) -> Dict[str, Tuple[str, int, int, int, int]]:
+    """
+    Computes the streak partials of many habits on a pool of worker processes.
+
+    Args:
+        db_name: Database filename
+        periodicities: Dictionary of habit_id -> periodicity of the habits to summarize
+        workers: Number of worker processes; 1 runs in the calling process
+        user_id: Owner of the habits (defaults to Config.DEFAULT_USER_ID)
+
+    Returns:
+        Merged partials of every habit with check-offs, as returned by summarize_range()
+    """
+    ranges = partition_habit_ids(list(periodicities), workers * PARTITIONS_PER_WORKER)
+    if workers <= 1 or len(ranges) <= 1:
+        merged = {}
+        for first, last in ranges:
+            merged.update(summarize_range(db_name, first, last, periodicities, user_id))
+        return merged
+
+    merged = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                summarize_range, db_name, first, last,
+                {habit_id: periodicity for habit_id, periodicity in periodicities.items() if first <= habit_id <= last},
+                user_id
+            )
+            for first, last in ranges
+        ]
+        for future in futures:
+            merged.update(future.result())
+    return merged
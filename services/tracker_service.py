@@ -2,10 +2,11 @@
 Tracker Service - Business logic for tracking operations
 """
 from datetime import datetime
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 from models.tracker import TrackerEvent
 from repositories.tracker_repository import TrackerRepository
 from repositories.habit_repository import HabitRepository
+from repositories.identity_map import nocase_key
 
 
 class TrackerService:
@@ -13,15 +14,16 @@ class TrackerService:
     Handles business logic for tracking operations.
     """
 
-    def __init__(self, db=None):
+    def __init__(self, db=None, user_id: str = None):
         """
         Initialize service.
 
         Args:
             db: Database connection (optional)
+            user_id: User whose habits are tracked (defaults to Config.DEFAULT_USER_ID)
         """
-        self.tracker_repo = TrackerRepository(db)
-        self.habit_repo = HabitRepository(db)
+        self.tracker_repo = TrackerRepository(db, user_id)
+        self.habit_repo = HabitRepository(db, user_id)
 
     def check_off_habit(
             self,
@@ -70,6 +72,71 @@ class TrackerService:
         else:
             return False, "Failed to check off habit"
 
+    def check_off_many(
+            self,
+            entries: Iterable[tuple]
+    ) -> Tuple[int, List[Tuple[int, str]]]:
+        """
+        Records many habit completions with validation, in a single transaction.
+
+        Args:
+            entries: Tuples of (habit name or ID, checked_at, notes); checked_at may be
+                     a datetime or an ISO string, and notes may be omitted
+
+        Returns:
+            Tuple of (saved: int, errors: list of (entry index, message))
+        """
+        entries = list(entries)
+        habits = self.habit_repo.find_by_names_or_ids(entry[0] for entry in entries)
+        habits_by_id = {habit.habit_id: habit for habit in habits}
+        # Names match regardless of ASCII case, like HabitRepository.find_by_name
+        habits_by_name = {nocase_key(habit.name): habit for habit in habits}
+
+        now = datetime.now()
+        events = []
+        event_indexes = []
+        errors = []
+        for index, entry in enumerate(entries):
+            key, checked_at = entry[0], entry[1]
+            notes = entry[2] if len(entry) > 2 and entry[2] else ""
+
+            habit = habits_by_id.get(key) or habits_by_name.get(nocase_key(str(key)))
+            if not habit:
+                errors.append((index, f"Habit '{key}' not found"))
+                continue
+
+            if not habit.is_active:
+                errors.append((index, f"Habit '{habit.name}' is inactive"))
+                continue
+
+            if checked_at is None:
+                checked_at = now
+            elif isinstance(checked_at, str):
+                try:
+                    checked_at = datetime.fromisoformat(checked_at)
+                except ValueError:
+                    errors.append((index, f"Invalid timestamp '{checked_at}'"))
+                    continue
+            elif not isinstance(checked_at, datetime):
+                errors.append((index, f"Invalid timestamp {checked_at!r}"))
+                continue
+            if checked_at.tzinfo is not None:
+                # Stored timestamps are naive local time
+                checked_at = checked_at.astimezone().replace(tzinfo=None)
+
+            if checked_at > now:
+                errors.append((index, "Cannot check off a habit in the future"))
+                continue
+
+            events.append(TrackerEvent(habit_id=habit.habit_id, checked_at=checked_at, notes=notes))
+            event_indexes.append(index)
+
+        if events and not self.tracker_repo.save_many(events):
+            errors.extend((index, "Failed to check off habit") for index in event_indexes)
+            return 0, sorted(errors)
+
+        return len(events), errors
+
     def get_habit_history(self, habit_name: str) -> List[datetime]:
         """
         Returns completion history for a habit.
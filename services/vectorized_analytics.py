@@ -0,0 +1,74 @@
+"""
+Vectorized analytics - NumPy streak and completion-rate computations
+
+Works on the per-habit day-number arrays loaded by
+TrackerRepository.load_day_arrays(). NumPy is optional: check
+NUMPY_AVAILABLE before calling into this module. It is imported on
+first use, so importing this module does not slow down CLI startup.
+"""
+from importlib.util import find_spec
+from typing import Optional, Tuple
+
+NUMPY_AVAILABLE = find_spec("numpy") is not None
+
+
+def to_period_keys(day_keys: "np.ndarray", periodicity: str) -> "np.ndarray":
+    """
+    Converts day numbers (days since 1970-01-01) to period keys.
+
+    Args:
+        day_keys: int32 array of day numbers
+        periodicity: 'daily' or 'weekly'
+
+    Returns:
+        The day numbers, or ISO-week numbers (weeks starting on Monday) for weekly habits
+    """
+    if periodicity == 'daily':
+        return day_keys
+    # 1970-01-01 was a Thursday: shifting by 3 days aligns weeks on Monday
+    return (day_keys + 3) // 7
+
+
+def summarize_periods(period_keys: "np.ndarray") -> Tuple[int, int, int, Optional[int]]:
+    """
+    Run-length encodes the completed periods of one habit.
+
+    Args:
+        period_keys: Period keys of every check-off (any order, duplicates allowed)
+
+    Returns:
+        Tuple of (total_completions, longest_streak, trailing_streak, last_period_key)
+    """
+    total = len(period_keys)
+    if total == 0:
+        return 0, 0, 0, None
+
+    import numpy as np
+    keys = np.unique(period_keys)
+    # Positions where the next completed period is not the following one
+    breaks = np.flatnonzero(np.diff(keys) != 1)
+    run_starts = np.concatenate(([0], breaks + 1))
+    run_ends = np.concatenate((breaks, [len(keys) - 1]))
+    run_lengths = run_ends - run_starts + 1
+
+    return total, int(run_lengths.max()), int(run_lengths[-1]), int(keys[-1])
+
+
+def completion_rate(period_keys: "np.ndarray", current_key: int) -> float:
+    """
+    Share of periods completed from the first check-off up to the current period.
+
+    Args:
+        period_keys: Period keys of every check-off
+        current_key: Period key of today
+
+    Returns:
+        Completion rate between 0.0 and 1.0 (0.0 without check-offs)
+    """
+    if len(period_keys) == 0:
+        return 0.0
+
+    import numpy as np
+    keys = np.unique(period_keys)
+    span = max(current_key, int(keys[-1])) - int(keys[0]) + 1
+    return len(keys) / span
@@ -0,0 +1,128 @@
+"""
+Test suite for the versioned analytics cache
+"""
+import gc
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from database.connection import Database
+from services.analytics_cache import CachedAnalyticsService
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+class TestCachedAnalyticsService(unittest.TestCase):
+    """Test cases for CachedAnalyticsService"""
+
+    def setUp(self):
+        """Create two daily habits with a few days of check-offs"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.db")
+        self.db = Database.connect(self.path)
+
+        HabitService(self.db).create_habit("Read", "daily")
+        HabitService(self.db).create_habit("Swim", "daily")
+        self.tracker_service = TrackerService(self.db)
+        self.today = today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        for days_ago in (5, 4, 3):
+            self.tracker_service.check_off_habit("Read", today - timedelta(days=days_ago))
+            self.tracker_service.check_off_habit("Swim", today - timedelta(days=days_ago))
+
+        self.service = CachedAnalyticsService(self.db)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_repeated_calls_hit_the_cache(self):
+        """Test that unchanged results are computed once and match AnalyticsService"""
+        with mock.patch.object(AnalyticsService, 'calculate_longest_streak',
+                               autospec=True, return_value=3) as compute:
+            self.assertEqual(self.service.calculate_longest_streak("Read"), 3)
+            self.assertEqual(self.service.calculate_longest_streak("read"), 3)
+        self.assertEqual(compute.call_count, 1)
+        self.assertEqual((self.service.hits, self.service.misses), (1, 1))
+        self.service.cache_clear()
+
+        history = self.service.get_habit_completion_history("Read")
+        self.assertIs(self.service.get_habit_completion_history("Read"), history)
+        self.assertEqual(history, AnalyticsService(self.db).get_habit_completion_history("Read"))
+
+        # The history's streaks are cached results too
+        self.assertEqual(self.service.cache_info()['size'], 3)
+
+    def test_check_off_invalidates_only_its_habit(self):
+        """Test that a check-off drops the results of its habit and of all habits, not of other habits"""
+        self.service.calculate_longest_streak("Read")
+        self.service.calculate_longest_streak("Swim")
+        self.service.get_completion_summary()
+
+        self.tracker_service.check_off_habit("Read", self.today - timedelta(days=2))
+        misses = self.service.misses
+        self.assertEqual(self.service.calculate_longest_streak("Read"), 4)
+        self.assertEqual(self.service.calculate_longest_streak("Swim"), 3)
+        summary = {entry['name']: entry['total_completions'] for entry in self.service.get_completion_summary()}
+
+        self.assertEqual(summary, {"Read": 4, "Swim": 3})
+        self.assertEqual(self.service.misses - misses, 2)
+
+    def test_write_of_another_connection_clears_the_cache(self):
+        """Test that a commit of another connection is detected through PRAGMA data_version"""
+        self.assertEqual(self.service.calculate_longest_streak("Swim"), 3)
+        self.assertEqual(self.service.get_habit_completion_history("Swim")['total_completions'], 3)
+
+        other = sqlite3.connect(self.path)
+        try:
+            other.execute("DELETE FROM tracker")
+            other.execute("UPDATE habit_stats SET longest_streak = 0, total_completions = 0")
+            other.commit()
+        finally:
+            other.close()
+
+        self.assertEqual(self.service.calculate_longest_streak("Swim"), 0)
+        self.assertEqual(self.service.get_habit_completion_history("Swim")['total_completions'], 0)
+
+    def test_names_differing_in_non_ascii_case_are_distinct(self):
+        """Test that habit names are keyed like SQLite's NOCASE, which only folds ASCII letters"""
+        HabitService(self.db).create_habit("Äpfel", "daily")
+        HabitService(self.db).create_habit("äpfel", "daily")
+        self.tracker_service.check_off_habit("Äpfel", self.today - timedelta(days=1))
+
+        self.assertEqual(self.service.get_habit_completion_history("Äpfel")['total_completions'], 1)
+        self.assertEqual(self.service.get_habit_completion_history("äpfel")['total_completions'], 0)
+        self.assertEqual(self.service.get_habit_completion_history("ÄPFEL")['total_completions'], 1)
+
+    def test_closed_connections_are_not_tracked(self):
+        """Test that the data versions of the connections a service resolved go away with them"""
+        for _ in range(3):
+            other = Database.connect(self.path)
+            with mock.patch.object(Database, 'resolve', lambda db, user_id=None: other):
+                self.service.get_completion_rates()
+            other.close()
+        del other
+        gc.collect()
+        self.assertEqual(len(self.service._data_versions), 0)
+
+    def test_least_recently_used_results_are_evicted(self):
+        """Test that the cache keeps at most maxsize results, dropping the least recently used"""
+        service = CachedAnalyticsService(self.db, maxsize=2)
+        service.get_current_streak("Read")
+        service.get_current_streak("Swim")
+        service.get_current_streak("Read")
+        service.get_completion_rates()
+
+        self.assertEqual(service.evictions, 1)
+        hits = service.hits
+        service.get_current_streak("Read")
+        self.assertEqual(service.hits, hits + 1)
+        service.get_current_streak("Swim")
+        self.assertEqual(service.cache_info()['misses'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+Test suite for the local HTTP/JSON API
+"""
+import asyncio
+import http.client
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from api.server import ApiServer
+from database.pool import ConnectionPool
+
+
+class TestApiServer(unittest.TestCase):
+    """Runs the API server on a background event loop against a temporary database"""
+
+    def setUp(self):
+        """Start a server on a free port"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.pool = ConnectionPool(os.path.join(self.tmp_dir.name, "api.db"), readers=2)
+        self.server = ApiServer(self.pool, "127.0.0.1", 0)
+
+        started = threading.Event()
+
+        async def serve():
+            self.loop = asyncio.get_running_loop()
+            self.stopped = self.loop.create_future()
+            _, self.port = await self.server.start()
+            started.set()
+            await self.stopped
+            self.server.server.close()
+            await self.server.server.wait_closed()
+
+        self.thread = threading.Thread(target=asyncio.run, args=(serve(),))
+        self.thread.start()
+        started.wait(5)
+
+    def tearDown(self):
+        """Stop the server and close the pool"""
+        self.loop.call_soon_threadsafe(self.stopped.set_result, None)
+        self.thread.join(5)
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    def request(self, method: str, path: str, body: dict = None):
+        """Sends one request and returns (status, decoded JSON)"""
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        try:
+            connection.request(
+                method, path,
+                body=json.dumps(body) if body is not None else None,
+                headers={'Content-Type': 'application/json'}
+            )
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_habit_lifecycle(self):
+        """Test creating, reading, updating and archiving a habit"""
+        status, result = self.request('POST', '/habits', {'name': 'Run', 'periodicity': 'daily'})
+        self.assertEqual(status, 201)
+        self.assertTrue(result['success'])
+
+        status, _ = self.request('POST', '/habits', {'name': 'run', 'periodicity': 'daily'})
+        self.assertEqual(status, 400)
+
+        status, habit = self.request('GET', '/habits/Run')
+        self.assertEqual(status, 200)
+        self.assertEqual(habit['periodicity'], 'daily')
+
+        status, _ = self.request('PATCH', '/habits/Run', {'description': 'Around the park'})
+        self.assertEqual(status, 200)
+        self.assertEqual(self.request('GET', '/habits/Run')[1]['description'], 'Around the park')
+
+        self.assertEqual(self.request('DELETE', '/habits/Run')[0], 200)
+        self.assertEqual(self.request('GET', '/habits')[1], [])
+        self.assertEqual(len(self.request('GET', '/habits?all=true')[1]), 1)
+
+    def test_check_offs_and_analytics(self):
+        """Test that check-offs made through the API show up in the analytics endpoints"""
+        self.request('POST', '/habits', {'name': 'Read', 'periodicity': 'daily'})
+        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+
+        status, _ = self.request('POST', '/habits/Read/checkoffs', {'checked_at': yesterday})
+        self.assertEqual(status, 201)
+        status, result = self.request('POST', '/checkoffs', {'entries': [['Read', None, 'today'], ['Nope', None]]})
+        self.assertEqual(status, 207)
+        self.assertEqual(result['saved'], 1)
+        self.assertEqual(result['errors'][0]['index'], 1)
+
+        self.assertEqual(self.request('GET', '/analytics/champion')[1], {'name': 'Read', 'longest_streak': 2})
+        streaks = self.request('GET', '/analytics/streaks/Read')[1]
+        self.assertEqual((streaks['longest_streak'], streaks['current_streak']), (2, 2))
+        summary = self.request('GET', '/analytics/summary')[1]
+        self.assertEqual(summary[0]['total_completions'], 2)
+        self.assertEqual(len(self.request('GET', '/habits/Read/history')[1]['completions']), 2)
+
+    def test_errors(self):
+        """Test the error statuses"""
+        self.assertEqual(self.request('GET', '/nowhere')[0], 404)
+        self.assertEqual(self.request('PUT', '/habits')[0], 405)
+        self.assertEqual(self.request('GET', '/habits/Missing')[0], 404)
+        self.assertEqual(self.request('POST', '/habits/Missing/checkoffs', {})[0], 404)
+        self.assertEqual(self.request('POST', '/habits', ['not', 'an', 'object'])[0], 400)
+
+    def test_mistyped_bodies(self):
+        """Test that body fields of the wrong JSON type are answered with 400 instead of 500"""
+        self.request('POST', '/habits', {'name': 'Read', 'periodicity': 'daily'})
+        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+        for method, path, body in (
+                ('POST', '/habits', {'name': 42, 'periodicity': 'daily'}),
+                ('PATCH', '/habits/Read', {'name': ['Read']}),
+                ('PATCH', '/habits/Read', {'description': 7}),
+                ('PATCH', '/habits/Read', {'is_active': 'no'}),
+                ('POST', '/habits/Read/checkoffs', {'notes': {}}),
+                ('POST', '/checkoffs', {'entries': 'Read'}),
+                ('POST', '/checkoffs', {'entries': [42]}),
+                ('POST', '/checkoffs', {'entries': [['Read']]}),
+                ('POST', '/checkoffs', {'entries': [[7, yesterday]]})):
+            with self.subTest(method=method, path=path, body=body):
+                status, payload = self.request(method, path, body)
+                self.assertEqual(status, 400, payload)
+                self.assertFalse(payload['success'])
+
+        self.assertEqual(self.request('GET', '/habits/Read')[1]['name'], 'Read')
+        self.assertEqual(self.request('GET', '/habits/Read/history')[1]['completions'], [])
+
+    def raw_request(self, data: bytes) -> bytes:
+        """Sends raw bytes and returns everything the server answers before closing"""
+        with socket.create_connection(("127.0.0.1", self.port), timeout=10) as sock:
+            sock.sendall(data)
+            chunks = []
+            while True:
+                chunk = sock.recv(4096)
+                if not chunk:
+                    return b''.join(chunks)
+                chunks.append(chunk)
+
+    def test_malformed_requests(self):
+        """Test that a garbage request line or header is answered with 400 before the connection closes"""
+        for data in (b"GARBAGE\r\n\r\n",
+                     b"GET /habits HTTP/1.1\r\nno colon here\r\n\r\n",
+                     b"POST /habits HTTP/1.1\r\nContent-Length: many\r\n\r\n"):
+            with self.subTest(data=data):
+                response = self.raw_request(data)
+                self.assertTrue(response.startswith(b"HTTP/1.1 400 Bad Request\r\n"), response)
+                self.assertIn(b"Connection: close\r\n", response)
+                self.assertIn(b"Malformed request", response)
+
+    def test_concurrent_check_offs_are_not_lost(self):
+        """Test that parallel writes are serialized without losing check-offs"""
+        self.request('POST', '/habits', {'name': 'Water', 'periodicity': 'daily'})
+
+        def check_off(_):
+            return self.request('POST', '/habits/Water/checkoffs', {'notes': 'parallel'})[0]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            statuses = list(executor.map(check_off, range(40)))
+
+        self.assertEqual(statuses, [201] * 40)
+        summary = self.request('GET', '/analytics/summary')[1]
+        self.assertEqual(summary[0]['total_completions'], 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Test suite for the asyncio service layer
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from database.connection import Database
+from database.pool import ConnectionPool
+from services.analytics_service import AnalyticsService
+from services.async_services import AsyncAnalyticsService, AsyncHabitService, AsyncTrackerService
+
+
+class TestAsyncServices(unittest.IsolatedAsyncioTestCase):
+    """Runs the async services against a temporary database"""
+
+    def setUp(self):
+        """Create a pool shared by the three async services"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "async.db")
+        self.pool = ConnectionPool(self.db_name, readers=3)
+        self.habits = AsyncHabitService(self.pool)
+        self.tracker = AsyncTrackerService(self.pool)
+        self.analytics = AsyncAnalyticsService(self.pool)
+
+    def tearDown(self):
+        """Close the pool and remove the temporary directory"""
+        self.pool.close()
+        self.tmp_dir.cleanup()
+
+    async def test_success_message_contract(self):
+        """Test that async writes return the same (success, message) tuples"""
+        self.assertEqual(
+            await self.habits.create_habit("Read", "daily"),
+            (True, "Habit 'Read' created successfully")
+        )
+        success, message = await self.habits.create_habit("Read", "daily")
+        self.assertFalse(success)
+        self.assertIn("already exists", message)
+
+        success, _ = await self.tracker.check_off_habit("Read")
+        self.assertTrue(success)
+        self.assertEqual(await self.tracker.check_off_habit("Missing"), (False, "Habit 'Missing' not found"))
+        self.assertEqual(len(await self.tracker.get_habit_history("Read")), 1)
+
+    async def test_fan_out_matches_sync_analytics(self):
+        """Test that gathered per-habit streaks equal the synchronous results"""
+        now = datetime.now()
+        for name, periodicity, days in [("Read", "daily", 4), ("Gym", "daily", 2), ("Budget", "weekly", 3)]:
+            await self.habits.create_habit(name, periodicity)
+            step = 1 if periodicity == "daily" else 7
+            await self.tracker.check_off_many(
+                (name, now - timedelta(days=offset * step), "") for offset in range(days)
+            )
+
+        streaks = await self.analytics.get_streaks()
+
+        con = Database.connect(self.db_name)
+        try:
+            sync = AnalyticsService(con)
+            for name in ("Read", "Gym", "Budget"):
+                self.assertEqual(
+                    streaks[name],
+                    (sync.calculate_longest_streak(name), sync.get_current_streak(name)),
+                    name
+                )
+        finally:
+            con.close()
+        self.assertEqual(await self.analytics.get_longest_streak_all_habits(), ("Read", 4))
+
+    async def test_concurrent_check_offs_are_not_lost(self):
+        """Test that gathered check-offs are all stored"""
+        await self.habits.create_habit("Water", "daily")
+        results = await asyncio.gather(*(self.tracker.check_off_habit("Water") for _ in range(25)))
+        self.assertTrue(all(success for success, _ in results))
+
+        summary = await self.analytics.get_completion_summary()
+        self.assertEqual(summary[0]['total_completions'], 25)
+
+    async def test_own_pool(self):
+        """Test that a service without a shared pool creates and closes its own"""
+        service = AsyncHabitService(db_name=self.db_name)
+        try:
+            self.assertFalse(await service.has_habits())
+        finally:
+            service.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
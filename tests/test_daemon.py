@@ -0,0 +1,108 @@
+"""
+Test suite for the serve daemon and its thin client
+"""
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from database.connection import Database
+from daemon.client import DaemonError, send_request
+from daemon.handlers import CommandHandler
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Unix sockets are not available")
+class TestDaemon(unittest.TestCase):
+    """Runs a daemon on a background thread against a temporary database"""
+
+    def setUp(self):
+        """Start a daemon serving a database with one habit"""
+        from daemon.server import HabitDaemon
+
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "daemon.db")
+        self.socket_path = os.path.join(self.tmp_dir.name, "daemon.sock")
+
+        setup_db = Database.connect(self.db_name)
+        HabitService(setup_db).create_habit("Stretch", "daily", "Morning stretch")
+        setup_db.close()
+
+        started = threading.Event()
+
+        def serve():
+            # The connection must belong to the serving thread
+            self.daemon = HabitDaemon(self.socket_path, Database.connect(self.db_name))
+            started.set()
+            self.daemon.serve_forever(poll_interval=0.05)
+            self.daemon.command_handler.db.close()
+            self.daemon.server_close()
+
+        self.thread = threading.Thread(target=serve)
+        self.thread.start()
+        started.wait(5)
+
+    def tearDown(self):
+        """Stop the daemon and remove the temporary directory"""
+        self.daemon.shutdown()
+        self.thread.join(5)
+        self.tmp_dir.cleanup()
+
+    def test_commands_are_served(self):
+        """Test that check-offs and analytics go through the daemon"""
+        result = send_request(self.socket_path, 'checkoff', {'name': 'Stretch', 'notes': ''})
+        self.assertTrue(result['success'])
+
+        self.assertEqual(send_request(self.socket_path, 'streak', {'name': 'Stretch'})['longest_streak'], 1)
+        self.assertEqual(send_request(self.socket_path, 'champion', {}), {'name': 'Stretch', 'longest_streak': 1})
+        habits = send_request(self.socket_path, 'habit_list', {'show_all': False})['habits']
+        self.assertEqual(habits, [['Stretch', 'daily', 'Morning stretch', True]])
+
+    def test_unknown_command_is_reported(self):
+        """Test that daemon-side errors reach the client"""
+        with self.assertRaises(DaemonError):
+            send_request(self.socket_path, 'format_disk', {})
+
+    def test_cache_sees_changes_from_other_processes(self):
+        """Test that cached results are dropped when another connection writes"""
+        self.assertEqual(send_request(self.socket_path, 'streak', {'name': 'Stretch'})['longest_streak'], 0)
+
+        other = Database.connect(self.db_name)
+        TrackerService(other).check_off_habit("Stretch")
+        other.close()
+
+        self.assertEqual(send_request(self.socket_path, 'streak', {'name': 'Stretch'})['longest_streak'], 1)
+
+    def test_socket_file_is_removed_on_shutdown(self):
+        """Test that stopping the daemon removes its socket"""
+        self.daemon.shutdown()
+        self.thread.join(5)
+        self.assertFalse(os.path.exists(self.socket_path))
+
+
+class TestDaemonFallback(unittest.TestCase):
+    """Test cases for running commands without a daemon"""
+
+    def test_no_daemon_returns_none(self):
+        """Test that the client reports a missing daemon instead of failing"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(send_request(os.path.join(tmp_dir, "missing.sock"), 'champion', {}))
+
+    def test_in_process_handler(self):
+        """Test that the in-process handler returns the same result shape"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db = Database.connect(os.path.join(tmp_dir, "fallback.db"))
+            try:
+                HabitService(db).create_habit("Stretch", "daily")
+                handler = CommandHandler(db)
+                self.assertTrue(handler.handle('checkoff', {'name': 'Stretch'})['success'])
+                self.assertEqual(handler.handle('champion', {}), {'name': 'Stretch', 'longest_streak': 1})
+                with self.assertRaises(ValueError):
+                    handler.handle('handle', {})
+            finally:
+                db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
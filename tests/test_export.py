@@ -0,0 +1,144 @@
+"""
+Test suite for the streaming export
+"""
+import csv
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+from click.testing import CliRunner
+from config import Config
+from database.connection import Database
+from services.export_service import EVENT_FIELDS, HABIT_FIELDS, ExportService, detect_format
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+class TestExportService(unittest.TestCase):
+    """Test cases for ExportService"""
+
+    def setUp(self):
+        """Create a daily and a weekly habit with ten days of check-offs"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database.connect(os.path.join(self.tmp_dir.name, "export.db"))
+
+        habit_service = HabitService(self.db)
+        habit_service.create_habit("Read", "daily", "Read, then \"think\"")
+        habit_service.create_habit("Budget", "weekly")
+        tracker_service = TrackerService(self.db)
+        self.first_day = date.today() - timedelta(days=10)
+        for offset in range(10):
+            checked_at = datetime.combine(self.first_day + timedelta(days=offset), datetime.min.time())
+            tracker_service.check_off_habit("Read", checked_at.replace(hour=8), f"page {offset}, ok")
+            if offset % 7 == 0:
+                tracker_service.check_off_habit("Budget", checked_at.replace(hour=9))
+
+        self.service = ExportService(self.db)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_csv_export_of_all_events(self):
+        """Test that every event is exported with its habit and quoted notes survive"""
+        success, message = self.service.export(self._path("events.csv"))
+        self.assertTrue(success, message)
+        self.assertIn("rows/s", message)
+
+        with open(self._path("events.csv"), newline='', encoding='utf-8') as stream:
+            rows = list(csv.DictReader(stream))
+        self.assertEqual(tuple(rows[0]), EVENT_FIELDS)
+        self.assertEqual(len(rows), 12)
+        self.assertEqual(sorted({row['habit'] for row in rows}), ["Budget", "Read"])
+        self.assertIn("page 0, ok", [row['notes'] for row in rows])
+
+    def test_filters(self):
+        """Test that the habit, periodicity and date filters narrow the export"""
+        self.service.export(self._path("read.csv"), habit_names=["read"])
+        self.service.export(self._path("weekly.csv"), periodicity="weekly")
+        last_days = self.first_day + timedelta(days=7)
+        self.service.export(self._path("range.csv"), start=last_days, end=last_days + timedelta(days=1))
+
+        def read(name):
+            with open(self._path(name), newline='', encoding='utf-8') as stream:
+                return list(csv.DictReader(stream))
+
+        self.assertEqual({row['habit'] for row in read("read.csv")}, {"Read"})
+        self.assertEqual(len(read("read.csv")), 10)
+        self.assertEqual([row['habit'] for row in read("weekly.csv")], ["Budget", "Budget"])
+        self.assertEqual(len(read("range.csv")), 3)
+
+        success, message = self.service.export(self._path("none.csv"), habit_names=["Missing"])
+        self.assertFalse(success)
+
+        success, message = self.service.export(self._path("some.csv"), habit_names=["read", "Missing", "Gone"])
+        self.assertFalse(success)
+        self.assertEqual(message, "No habit found for Missing, Gone")
+        self.assertFalse(os.path.exists(self._path("some.csv")))
+
+    def test_gzipped_jsonl_export(self):
+        """Test that a .jsonl.gz name writes compressed JSON Lines"""
+        self.assertEqual(detect_format("events.jsonl.gz"), "jsonl")
+        success, message = self.service.export(self._path("events.jsonl.gz"))
+        self.assertTrue(success, message)
+
+        with gzip.open(self._path("events.jsonl.gz"), 'rt', encoding='utf-8') as stream:
+            records = [json.loads(line) for line in stream]
+        self.assertEqual(len(records), 12)
+        self.assertEqual(tuple(records[0]), EVENT_FIELDS)
+
+    def test_habits_export(self):
+        """Test that the habits table exports every habit, including descriptions"""
+        success, message = self.service.export(self._path("habits.jsonl"), table="habits")
+        self.assertTrue(success, message)
+
+        with open(self._path("habits.jsonl"), encoding='utf-8') as stream:
+            records = [json.loads(line) for line in stream]
+        self.assertEqual([tuple(record) for record in records], [HABIT_FIELDS] * 2)
+        self.assertIn('Read, then "think"', [record['description'] for record in records])
+
+    def test_export_streams_in_batches(self):
+        """Test that export rows stream from the cursor with small fetch batches"""
+        with mock.patch.object(Config, 'FETCH_BATCH_SIZE', 5):
+            rows = self.service.tracker_repo.iter_export_rows()
+            self.assertEqual(len(next(rows)), len(EVENT_FIELDS))
+            self.assertEqual(sum(1 for _ in rows), 11)
+
+
+class TestExportCommand(unittest.TestCase):
+    """Test cases for the export CLI command"""
+
+    def setUp(self):
+        """Point the default database into a temporary directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patch = mock.patch.object(Config, 'DATABASE_NAME', os.path.join(self.tmp_dir.name, "cli.db"))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Close the shared connections and remove the temporary directory"""
+        Database.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_export_to_stdout(self):
+        """Test that '-' writes the CSV to standard output"""
+        from cli import cli
+
+        HabitService().create_habit("Walk", "daily")
+        TrackerService().check_off_habit("Walk")
+
+        result = CliRunner().invoke(cli, ['export', '-', '--format', 'csv'], obj={})
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn(",".join(EVENT_FIELDS), result.output)
+        self.assertIn(",Walk,daily,", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Test suite for the identity map of HabitRepository
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from database.connection import Database
+from repositories.habit_repository import HabitRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+# Run by HabitRepository._identity_map on every lookup
+VERSION_CHECK = "PRAGMA data_version"
+
+
+class TestIdentityMap(unittest.TestCase):
+    """Test that habit lookups are answered from the identity map and stay coherent"""
+
+    def setUp(self):
+        """Create a daily and a weekly habit and record the statements of the connection"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "identity.db")
+        self.db = Database.connect(self.path)
+        self.habit_service = HabitService(self.db)
+        self.habit_service.create_habit("Read", "daily")
+        self.habit_service.create_habit("Budget", "weekly")
+        self.repository = HabitRepository(self.db)
+
+        self.statements = []
+        self.db.set_trace_callback(self.statements.append)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def _queries(self) -> list:
+        """Returns the recorded statements other than transaction control, then resets them"""
+        queries = [
+            " ".join(statement.split()) for statement in self.statements
+            if not statement.lstrip().upper().startswith(("BEGIN", "COMMIT"))
+        ]
+        self.statements.clear()
+        return queries
+
+    def assertOnlyVersionChecks(self, queries: list):
+        """Asserts that the statements were the PRAGMA data_version checks of map lookups"""
+        self.assertEqual(set(queries) - {VERSION_CHECK}, set())
+
+    def test_warm_check_off_only_inserts(self):
+        """Test that a check-off of a loaded habit runs one version check and its INSERTs"""
+        tracker_service = TrackerService(self.db)
+        tracker_service.check_off_habit("Read", datetime.now() - timedelta(days=1))
+        self._queries()
+
+        success, message = tracker_service.check_off_habit("read")
+        self.assertTrue(success, message)
+        queries = self._queries()
+        self.assertEqual(queries[0], VERSION_CHECK)
+        self.assertEqual(
+            [query.split(" (")[0] for query in queries[1:]],
+            ["INSERT INTO tracker", "INSERT INTO habit_stats"]
+        )
+
+    def test_lookups_return_one_instance(self):
+        """Test that find_all fills the map, after which lookups by name and ID need no query"""
+        habits = self.repository.find_all()
+        self.assertEqual(len([query for query in self._queries() if query != VERSION_CHECK]), 1)
+
+        read = self.repository.find_by_name("READ")
+        self.assertIs(self.repository.find_by_id(read.habit_id), read)
+        self.assertIn(read, habits)
+        self.assertIsNone(self.repository.find_by_name("Missing"))
+        self.assertEqual(self.repository.find_all(), habits)
+        self.assertOnlyVersionChecks(self._queries())
+
+        # Other repositories of the connection share the map
+        self.assertIs(HabitRepository(self.db).find_by_name("read"), read)
+
+    def test_completion_summary_reads_habits_once(self):
+        """Test that repeated summaries do not load the habits again"""
+        service = AnalyticsService(self.db)
+        service.get_completion_summary()
+        self._queries()
+
+        service.get_completion_summary()
+        self.assertEqual([query for query in self._queries() if query.startswith("SELECT habit_id, name")], [])
+
+    def test_update_keeps_map_coherent(self):
+        """Test that a rename is visible under the new name only, without a query"""
+        self.repository.find_all()
+        read = self.repository.find_by_name("Read")
+        self._queries()
+
+        success, message = self.habit_service.update_habit("Read", "Read books", "daily")
+        self.assertTrue(success, message)
+        self.assertEqual([query for query in self._queries() if query.startswith("SELECT")], [])
+
+        self.assertIsNone(self.repository.find_by_name("Read"))
+        self.assertIs(self.repository.find_by_name("read BOOKS"), read)
+        self.assertEqual(read.name, "Read books")
+        self.assertOnlyVersionChecks(self._queries())
+
+    def test_failed_update_leaves_habit_unchanged(self):
+        """Test that a rename whose write fails does not change the shared instance"""
+        read = self.repository.find_by_name("Read")
+        updated_at = read.updated_at
+
+        with mock.patch.object(HabitStatsRepository, 'refresh', side_effect=sqlite3.OperationalError("disk I/O error")), \
+                mock.patch('builtins.print'):
+            success, _ = self.habit_service.update_habit("Read", "Read books", "weekly")
+        self.assertFalse(success)
+
+        self.assertEqual((read.name, read.periodicity, read.updated_at), ("Read", "daily", updated_at))
+        self.assertIsNone(self.repository.find_by_name("Read books"))
+        self.assertEqual(self.repository.find_by_name("read").periodicity, "daily")
+
+    def test_delete_keeps_map_coherent(self):
+        """Test that archived habits stay known as inactive and deleted habits are gone"""
+        self.repository.find_all()
+        self.habit_service.delete_habit("Read")
+        self.habit_service.delete_habit("Budget", soft_delete=False)
+        self._queries()
+
+        self.assertFalse(self.repository.find_by_name("Read").is_active)
+        self.assertIsNone(self.repository.find_by_name("Budget"))
+        self.assertEqual([habit.name for habit in self.repository.find_all(include_inactive=True)], ["Read"])
+        self.assertOnlyVersionChecks(self._queries())
+
+    def test_commit_of_another_connection_empties_the_map(self):
+        """Test that a rename committed elsewhere is seen through PRAGMA data_version"""
+        self.repository.find_all()
+
+        other = sqlite3.connect(self.path)
+        try:
+            other.execute("UPDATE habits SET name = 'Swim' WHERE name = 'Read'")
+            other.commit()
+        finally:
+            other.close()
+
+        self.assertIsNone(self.repository.find_by_name("Read"))
+        self.assertEqual(self.repository.find_by_name("Swim").periodicity, "daily")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+"""
+Test suite for the streaming import
+"""
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from click.testing import CliRunner
+from config import Config
+from database.connection import Database
+from repositories.habit_repository import HabitRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from repositories.tracker_repository import TrackerRepository
+from services.export_service import ExportService
+from services.habit_service import HabitService
+from services.import_service import ImportService
+from services.tracker_service import TrackerService
+
+
+class TestImportService(unittest.TestCase):
+    """Test cases for ImportService"""
+
+    def setUp(self):
+        """Create an empty target database and a CSV file of 30 check-offs of three habits"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database.connect(self._path("import.db"))
+        self.service = ImportService(self.db)
+
+        start = datetime.now().replace(microsecond=0) - timedelta(days=20)
+        self.source = self._path("history.csv")
+        with open(self.source, 'w', newline='', encoding='utf-8') as stream:
+            writer = csv.writer(stream)
+            writer.writerow(['habit', 'periodicity', 'checked_at', 'notes'])
+            for day in range(10):
+                checked_at = start + timedelta(days=day)
+                writer.writerow(['Read', 'daily', checked_at.isoformat(), f"day {day}"])
+                writer.writerow(['Swim', '', (checked_at + timedelta(hours=1)).isoformat(), ''])
+                writer.writerow(['Budget', 'weekly', (checked_at + timedelta(hours=2)).isoformat(), ''])
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.tmp_dir.name, name)
+
+    def test_import_creates_habits_and_statistics(self):
+        """Test that missing habits are created and habit_stats matches the imported history"""
+        success, message = self.service.import_file(self.source, batch_size=7)
+        self.assertTrue(success, message)
+        self.assertIn("Imported 30 of 30 records", message)
+        self.assertIn("3 habits created", message)
+
+        habits = {habit.name: habit for habit in HabitRepository(self.db).find_all()}
+        self.assertEqual(habits["Budget"].periodicity, "weekly")
+        self.assertEqual(habits["Swim"].periodicity, "daily")
+
+        stats = HabitStatsRepository(self.db).find_by_habit_id(habits["Read"].habit_id)
+        self.assertEqual(stats.total_completions, 10)
+        self.assertEqual(stats.longest_streak, 10)
+        notes = [event.notes for event in TrackerRepository(self.db).find_by_habit_id(habits["Read"].habit_id)]
+        self.assertEqual(notes, [f"day {day}" for day in range(10)])
+
+    def test_reimport_is_deduplicated(self):
+        """Test that importing the same records twice inserts them once"""
+        self.service.import_file(self.source)
+        success, message = self.service.import_file(self.source)
+
+        self.assertTrue(success, message)
+        self.assertIn("Imported 0 of 30 records (30 duplicates", message)
+        self.assertEqual(len(TrackerRepository(self.db).find_all()), 30)
+
+    def test_export_import_round_trip(self):
+        """Test that an export imports into another database with the same event IDs"""
+        self.service.import_file(self.source)
+        exported = self._path("events.jsonl.gz")
+        self.assertTrue(ExportService(self.db).export(exported)[0])
+
+        target = Database.connect(self._path("target.db"))
+        try:
+            HabitService(target).create_habit("read", "daily")
+            success, message = ImportService(target).import_file(exported)
+            self.assertTrue(success, message)
+            self.assertIn("2 habits created", message)
+            self.assertEqual(
+                sorted(event.event_id for event in TrackerRepository(target).find_all()),
+                sorted(event.event_id for event in TrackerRepository(self.db).find_all())
+            )
+        finally:
+            target.close()
+
+    def test_invalid_records_are_skipped(self):
+        """Test that unknown habits (without creation), bad and future timestamps are skipped"""
+        HabitService(self.db).create_habit("Read", "daily")
+        future = (datetime.now() + timedelta(days=2)).isoformat()
+        source = self._path("bad.jsonl")
+        with open(source, 'w', encoding='utf-8') as stream:
+            for record in ({'habit': 'read', 'checked_at': '2024-01-01T08:00:00'},
+                           {'habit': 'Unknown', 'checked_at': '2024-01-01T08:00:00'},
+                           {'habit': 'Read', 'checked_at': 'yesterday'},
+                           {'habit': 'Read', 'checked_at': future}):
+                stream.write(json.dumps(record) + "\n")
+
+        success, message = self.service.import_file(source, create_missing=False)
+        self.assertTrue(success, message)
+        self.assertIn("Imported 1 of 4 records (0 duplicates, 3 skipped", message)
+        self.assertIn("record 2: habit 'Unknown' not found", message)
+
+    def test_non_object_json_lines_are_skipped(self):
+        """Test that JSON lines holding an array, string or number are skipped and counted"""
+        source = self._path("values.jsonl")
+        with open(source, 'w', encoding='utf-8') as stream:
+            stream.write('["Read", "2024-01-01T08:00:00"]\n"Read"\n42\n')
+            stream.write(json.dumps({'habit': 'Read', 'checked_at': '2024-01-02T08:00:00'}) + "\n")
+
+        success, message = self.service.import_file(source)
+        self.assertTrue(success, message)
+        self.assertIn("Imported 1 of 4 records (0 duplicates, 3 skipped", message)
+        self.assertIn("record 1: expected a JSON object, got list", message)
+
+    def test_invalid_json_line_does_not_abort(self):
+        """Test that a line of invalid JSON in the middle of a file is skipped and the rest imported"""
+        source = self._path("broken.jsonl")
+        with open(source, 'w', encoding='utf-8') as stream:
+            stream.write(json.dumps({'habit': 'Read', 'checked_at': '2024-01-01T08:00:00'}) + "\n")
+            stream.write('{"habit": "Read", "checked_at": \n')
+            stream.write(json.dumps({'habit': 'Read', 'checked_at': '2024-01-03T08:00:00'}) + "\n")
+
+        success, message = self.service.import_file(source, batch_size=1)
+        self.assertTrue(success, message)
+        self.assertIn("Imported 2 of 3 records (0 duplicates, 1 skipped", message)
+        self.assertIn("record 2: invalid JSON", message)
+        self.assertEqual(len(TrackerRepository(self.db).find_all()), 2)
+
+    def test_names_match_like_nocase(self):
+        """Test that records match habit names regardless of ASCII case only, like the database"""
+        HabitService(self.db).create_habit("Äpfel", "daily")
+        source = self._path("apples.jsonl")
+        with open(source, 'w', encoding='utf-8') as stream:
+            for name in ("ÄPFEL", "äpfel"):
+                stream.write(json.dumps({'habit': name, 'checked_at': '2024-01-01T08:00:00'}) + "\n")
+
+        success, message = self.service.import_file(source)
+        self.assertTrue(success, message)
+        self.assertIn("1 habits created", message)
+        for name in ("Äpfel", "äpfel"):
+            habit = HabitRepository(self.db).find_by_name(name)
+            self.assertEqual(len(TrackerRepository(self.db).find_by_habit_id(habit.habit_id)), 1)
+
+    def test_interrupted_import_resumes_from_checkpoint(self):
+        """Test that a failed batch leaves a checkpoint and the next run continues after it"""
+        checkpoint = self._path("history.checkpoint")
+        insert_rows = TrackerRepository.insert_rows
+        calls = []
+
+        def fail_third_batch(repo, rows, refresh=()):
+            calls.append(len(rows))
+            return None if len(calls) == 3 else insert_rows(repo, rows, refresh)
+
+        with mock.patch.object(TrackerRepository, 'insert_rows', fail_third_batch):
+            success, message = self.service.import_file(self.source, batch_size=10, checkpoint=checkpoint)
+        self.assertFalse(success)
+        with open(checkpoint, encoding='utf-8') as stream:
+            self.assertEqual(json.load(stream)['records'], 20)
+
+        # The statistics already match the check-offs of the committed batches
+        stats = HabitStatsRepository(self.db).find_all()
+        for habit in HabitRepository(self.db).find_all():
+            self.assertEqual(
+                stats[habit.habit_id].total_completions,
+                len(TrackerRepository(self.db).find_by_habit_id(habit.habit_id))
+            )
+
+        progress = []
+        success, message = self.service.import_file(
+            self.source, batch_size=10, checkpoint=checkpoint,
+            progress=lambda records, inserted, seconds: progress.append(records)
+        )
+        self.assertTrue(success, message)
+        self.assertIn("resumed after record 20", message)
+        self.assertEqual(progress, [30])
+        self.assertFalse(os.path.exists(checkpoint))
+        self.assertEqual(len(TrackerRepository(self.db).find_all()), 30)
+
+
+class TestImportCommand(unittest.TestCase):
+    """Test cases for the import CLI command"""
+
+    def setUp(self):
+        """Point the default database into a temporary directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patch = mock.patch.object(Config, 'DATABASE_NAME', os.path.join(self.tmp_dir.name, "cli.db"))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Close the shared connections and remove the temporary directory"""
+        Database.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_import_command(self):
+        """Test that the command imports a file and restores the connection's pragmas"""
+        from cli import cli
+
+        source = os.path.join(self.tmp_dir.name, "walks.csv")
+        with open(source, 'w', encoding='utf-8') as stream:
+            stream.write("habit,checked_at\nWalk,2024-03-01T07:30:00\nWalk,2024-03-02T07:30:00\n")
+
+        result = CliRunner().invoke(cli, ['import', source], obj={})
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Imported 2 of 2 records", result.output)
+        self.assertEqual(TrackerService().get_habit_history("Walk"), [
+            datetime(2024, 3, 1, 7, 30), datetime(2024, 3, 2, 7, 30)
+        ])
+        self.assertEqual(
+            Database.get_connection().execute("PRAGMA cache_size").fetchone()[0],
+            Config.DATABASE_PRAGMAS['cache_size']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""
+Test suite for keyset pagination of habits and completion histories
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from controllers.completion_controller import CompletionController
+from database.connection import Database
+from models.habit import Habit
+from models.tracker import TrackerEvent
+from repositories.habit_repository import HabitRepository
+from repositories.tracker_repository import TrackerRepository
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+
+
+class TestKeysetPagination(unittest.TestCase):
+    """Test that pages cover every row once, in order, in both directions"""
+
+    def setUp(self):
+        """Create habits and a habit with 25 completions, two of them at the same instant"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database.connect(os.path.join(self.tmp_dir.name, "pages.db"))
+
+        habit_repo = HabitRepository(self.db)
+        created = datetime(2024, 1, 1)
+        for index in range(7):
+            periodicity = 'weekly' if index % 3 == 0 else 'daily'
+            habit_repo.save(Habit(f"Habit {index}", periodicity, created_at=created + timedelta(days=index % 2)))
+
+        self.habit = habit_repo.find_by_name("Habit 1")
+        events = [TrackerEvent(self.habit.habit_id, created + timedelta(days=day)) for day in range(24)]
+        events.append(TrackerEvent(self.habit.habit_id, events[10].checked_at))
+        TrackerRepository(self.db).save_many(events)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_completion_pages_cover_history(self):
+        """Test that following next_cursor returns the whole history in order, without duplicates"""
+        service = AnalyticsService(self.db)
+        events = TrackerRepository(self.db).find_by_habit_id(self.habit.habit_id)
+        expected = sorted((event.checked_at, event.event_id) for event in events)
+
+        pages = [service.get_habit_completion_page("Habit 1", page_size=10)]
+        while pages[-1]['next_cursor']:
+            pages.append(service.get_habit_completion_page("Habit 1", after=pages[-1]['next_cursor'], page_size=10))
+
+        self.assertEqual([len(page['completions']) for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [(c['checked_at'], c['event_id']) for page in pages for c in page['completions']],
+            expected
+        )
+        self.assertIsNone(pages[0]['previous_cursor'])
+        self.assertEqual(pages[-1]['total_completions'], 25)
+
+        # Going back from the last page returns the middle page again
+        back = service.get_habit_completion_page("Habit 1", before=pages[-1]['previous_cursor'], page_size=10)
+        self.assertEqual(back['completions'], pages[1]['completions'])
+        self.assertIsNotNone(back['previous_cursor'])
+        self.assertIsNotNone(back['next_cursor'])
+
+    def test_habit_pages_cover_habits(self):
+        """Test that habit pages are ordered by periodicity, then creation date, in both directions"""
+        service = HabitService(self.db)
+        first = service.get_habit_page(page_size=3)
+        second = service.get_habit_page(after=first['next_cursor'], page_size=3)
+        third = service.get_habit_page(after=second['next_cursor'], page_size=3)
+
+        habits = first['habits'] + second['habits'] + third['habits']
+        self.assertEqual(len(habits), 7)
+        self.assertIsNone(third['next_cursor'])
+        self.assertEqual(
+            [(h.periodicity, h.created_at) for h in habits],
+            sorted((h.periodicity, h.created_at) for h in habits)
+        )
+        self.assertEqual(
+            [h.habit_id for h in service.get_habit_page(before=second['previous_cursor'], page_size=3)['habits']],
+            [h.habit_id for h in first['habits']]
+        )
+
+    def test_controller_navigates_completion_pages(self):
+        """Test that 'n' and 'p' turn the pages of the history and keep the numbering"""
+        names = [row['name'] for row in AnalyticsService(self.db).get_completion_summary()]
+        view = mock.MagicMock()
+        view.get_number_choice.return_value = str(names.index("Habit 1") + 1)
+        view.get_confirmation.side_effect = ["n", "n", "p", "q"]
+        controller = CompletionController(self.db, view)
+
+        with mock.patch('config.Config.PAGE_SIZE', 10):
+            controller.show_completion_table()
+
+        starts = [call.kwargs['start'] for call in view.show_habit_completion_history.call_args_list]
+        self.assertEqual(starts, [1, 11, 21, 11])
+        pages = [call.args[0]['completions'] for call in view.show_habit_completion_history.call_args_list]
+        self.assertEqual(pages[1], pages[3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""
+Test suite for the process-parallel analytics engine
+"""
+import os
+import random
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from database.connection import Database
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.parallel_analytics import partition_habit_ids, summarize_parallel
+from services.tracker_service import TrackerService
+
+
+class TestParallelAnalytics(unittest.TestCase):
+    """Compares the 'parallel' engine with the 'python' engine on a file database"""
+
+    def setUp(self):
+        """Create habits with random check-off histories"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "parallel.db")
+        self.db = Database.connect(self.db_name)
+
+        rng = random.Random(15)
+        habit_service = HabitService(self.db)
+        now = datetime.now()
+        entries = []
+        for index in range(24):
+            periodicity = "daily" if index % 3 else "weekly"
+            habit_service.create_habit(f"Habit {index}", periodicity)
+            step = 1 if periodicity == "daily" else 7
+            for offset in range(60):
+                if rng.random() < 0.7:
+                    entries.append((f"Habit {index}", now - timedelta(days=offset * step, hours=rng.randint(0, 5))))
+        habit_service.create_habit("Never Done", "daily")
+        TrackerService(self.db).check_off_many(entries)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_parallel_engine_matches_python_engine(self):
+        """Test that merged worker partials equal the sequential figures"""
+        parallel_service = AnalyticsService(self.db, streak_engine="parallel", workers=2)
+        python_service = AnalyticsService(self.db, streak_engine="python")
+
+        self.assertEqual(parallel_service.get_completion_summary(), python_service.get_completion_summary())
+        self.assertEqual(
+            parallel_service.get_longest_streak_all_habits(),
+            python_service.get_longest_streak_all_habits()
+        )
+
+    def test_single_worker_runs_in_process(self):
+        """Test that one worker gives the same partials as several"""
+        habits = {habit.habit_id: habit.periodicity for habit in HabitService(self.db).get_all_habits(True)}
+        self.assertEqual(summarize_parallel(self.db_name, habits, 1), summarize_parallel(self.db_name, habits, 3))
+
+    def test_in_memory_database_falls_back_to_scan(self):
+        """Test that the parallel engine still works where workers cannot open the database"""
+        con = Database.connect(":memory:")
+        try:
+            HabitService(con).create_habit("Read", "daily")
+            TrackerService(con).check_off_habit("Read")
+            summary = AnalyticsService(con, streak_engine="parallel", workers=2).get_completion_summary()
+            self.assertEqual(summary[0]['current_streak'], 1)
+        finally:
+            con.close()
+
+    def test_partition_habit_ids(self):
+        """Test that ranges are contiguous, ordered and cover every ID once"""
+        ids = [f"id-{index:03d}" for index in range(10)]
+        ranges = partition_habit_ids(list(reversed(ids)), 3)
+        self.assertEqual(ranges, [("id-000", "id-003"), ("id-004", "id-007"), ("id-008", "id-009")])
+        self.assertEqual(partition_habit_ids(ids, 20), [(habit_id, habit_id) for habit_id in ids])
+        self.assertEqual(partition_habit_ids([], 4), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
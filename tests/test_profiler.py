@@ -0,0 +1,151 @@
+"""
+Test suite for the SQL profiler
+"""
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+from click.testing import CliRunner
+from config import Config
+from database.connection import Database
+from database.profiler import OTHER_OPERATION, SqlProfiler, active_profiler, normalize_sql
+from repositories.habit_repository import HabitRepository
+from repositories.tracker_repository import TrackerRepository
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+class TestSqlProfiler(unittest.TestCase):
+    """Test cases for SqlProfiler"""
+
+    def setUp(self):
+        """Create a habit with three check-offs and profile the connection"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database.connect(os.path.join(self.tmp_dir.name, "profile.db"))
+        HabitService(self.db).create_habit("Read", "daily")
+        for days_ago in (3, 2, 1):
+            TrackerService(self.db).check_off_habit("Read", datetime.now() - timedelta(days=days_ago))
+
+        self.profiler = SqlProfiler()
+        self.profiler.install()
+        self.addCleanup(self.profiler.uninstall)
+        self.profiler.attach(self.db)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_statements_are_counted_per_operation(self):
+        """Test that calls, statements and rows are attributed to the repository method running them"""
+        habit = HabitRepository(self.db).find_by_name("Read")
+        events = TrackerRepository(self.db).find_by_habit_id(habit.habit_id)
+        self.db.execute("SELECT 1").fetchall()
+
+        operations = self.profiler.total.operations
+        self.assertEqual(operations["TrackerRepository.find_by_habit_id"].calls, 1)
+        self.assertEqual(operations["TrackerRepository.find_by_habit_id"].rows, len(events))
+        self.assertEqual(operations["HabitRepository.find_by_name"].rows, 1)
+        self.assertEqual(operations[OTHER_OPERATION].queries, 1)
+        self.assertEqual(self.profiler.total.totals()['calls'], 2)
+
+    def test_iterators_are_counted_as_consumed(self):
+        """Test that the rows and statements of a stream count when it is consumed"""
+        habit = HabitRepository(self.db).find_by_name("Read")
+        rows = TrackerRepository(self.db).iter_by_habit_id(habit.habit_id)
+        self.assertEqual(len(list(rows)), 3)
+
+        stats = self.profiler.total.operations["TrackerRepository.iter_by_habit_id"]
+        self.assertEqual((stats.calls, stats.rows), (1, 3))
+        self.assertGreaterEqual(stats.queries, 1)
+
+    def test_writes_count_changed_rows(self):
+        """Test that a check-off counts its INSERTs and changed rows"""
+        TrackerService(self.db).check_off_habit("Read")
+
+        stats = self.profiler.total.operations["TrackerRepository.save"]
+        self.assertGreaterEqual(stats.rows, 2)
+        self.assertIn("INSERT INTO tracker", " ".join(
+            entry['sql'] for entry in self.profiler.report()['statements']
+        ))
+
+    def test_sections_restart(self):
+        """Test that take_section returns the counters since the previous call only"""
+        HabitRepository(self.db).count()
+        self.assertIn("HabitRepository.count", self.profiler.take_section().operations)
+
+        HabitRepository(self.db).find_all()
+        section = self.profiler.take_section()
+        self.assertEqual(list(section.operations), ["HabitRepository.find_all"])
+        self.assertEqual(len(self.profiler.total.operations), 2)
+
+    def test_uninstall_restores_methods(self):
+        """Test that uninstall puts the original repository methods back"""
+        wrapped = HabitRepository.find_all
+        self.profiler.uninstall()
+        self.assertIsNot(HabitRepository.find_all, wrapped)
+        self.assertIs(HabitRepository.find_all, wrapped.__wrapped__)
+
+    def test_normalize_sql(self):
+        """Test that bound values and parameter lists are collapsed"""
+        self.assertEqual(
+            normalize_sql("SELECT *\n  FROM t WHERE a = 'it''s' AND b IN (1, 2, 3) AND c = 2.5"),
+            "SELECT * FROM t WHERE a = ? AND b IN (?, ...) AND c = ?"
+        )
+
+
+class TestProfileSqlOption(unittest.TestCase):
+    """Test cases for the --profile-sql options of the CLI"""
+
+    def setUp(self):
+        """Point the default database into a temporary directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patch = mock.patch.object(Config, 'DATABASE_NAME', os.path.join(self.tmp_dir.name, "cli.db"))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Close the shared connections and remove the temporary directory"""
+        Database.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_report_of_a_command(self):
+        """Test that a profiled command prints a summary and writes the JSON report, without the daemon"""
+        from cli import cli
+
+        HabitService().create_habit("Walk", "daily")
+        report = os.path.join(self.tmp_dir.name, "profile.json")
+        save = TrackerRepository.save
+        with mock.patch('daemon.client.send_request') as send_request:
+            result = CliRunner().invoke(cli, ['--profile-sql-report', report, 'checkoff', 'Walk'], obj={})
+        self.assertEqual(result.exit_code, 0, result.output)
+        send_request.assert_not_called()
+        self.assertIn("🔎 SQL:", result.output)
+
+        with open(report, encoding='utf-8') as stream:
+            data = json.load(stream)
+        self.assertEqual(data['command'], 'checkoff')
+        self.assertEqual(data['operations']['TrackerRepository.save']['calls'], 1)
+        self.assertEqual(data['totals']['queries'], sum(entry['count'] for entry in data['statements']))
+        self.assertIsNone(active_profiler())
+        self.assertIs(TrackerRepository.save, save)
+
+    def test_menu_shows_a_profile_per_action(self):
+        """Test that the menu prints the SQL profile after each action"""
+        from controllers.menu_controller import MenuController
+
+        profiler = SqlProfiler()
+        with mock.patch('controllers.menu_controller.ConsoleView') as view_class:
+            view = view_class.return_value
+            view.get_menu_choice.side_effect = ['3', '4']
+            controller = MenuController(Database.get_connection(), profiler)
+            controller.analytics_reports_controller.run = mock.Mock()
+            controller.run()
+
+        view.show_sql_profile.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,23 @@
 """
 Test suite for Habit Tracker application
 """
+import os
+import tempfile
+import threading
 import unittest
 import sqlite3
-from datetime import datetime, timedelta
+from unittest import mock
+from datetime import datetime, timedelta, timezone
 from services.habit_service import HabitService
 from services.tracker_service import TrackerService
 from services. analytics_service import AnalyticsService
+from services.vectorized_analytics import NUMPY_AVAILABLE
 from repositories.habit_repository import HabitRepository
 from repositories.tracker_repository import TrackerRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from database.connection import Database
+from models.habit import Habit
+from models.tracker import TrackerEvent
 
 
 class TestHabitTracker(unittest.TestCase):
@@ -44,7 +53,8 @@ class TestHabitTracker(unittest.TestCase):
         cur.execute("""
             CREATE TABLE IF NOT EXISTS habits (
                 habit_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL UNIQUE,
+                user_id TEXT NOT NULL DEFAULT 'default',
+                name TEXT NOT NULL,
                 periodicity TEXT NOT NULL,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
@@ -57,17 +67,41 @@ class TestHabitTracker(unittest.TestCase):
         cur.execute("""
             CREATE TABLE IF NOT EXISTS tracker (
                 event_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL DEFAULT 'default',
                 habit_id TEXT NOT NULL,
                 checked_at TEXT NOT NULL,
                 notes TEXT DEFAULT '',
+                day_key INTEGER,
+                week_key INTEGER,
+                FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
+            )
+        """)
+
+        # Create habit statistics table
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS habit_stats (
+                habit_id TEXT PRIMARY KEY,
+                current_streak INTEGER NOT NULL DEFAULT 0,
+                longest_streak INTEGER NOT NULL DEFAULT 0,
+                last_period_key INTEGER,
+                total_completions INTEGER NOT NULL DEFAULT 0,
+                last_completion TEXT,
                 FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
             )
         """)
 
         # Create indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_habit_name ON habits(name)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_habit ON tracker(habit_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_date ON tracker(checked_at)")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_habit_user_name ON habits(user_id, name COLLATE NOCASE)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_habit_user_periodicity ON habits(user_id, periodicity, created_at, habit_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_habit_user_active ON habits(user_id, is_active)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_user_date ON tracker(user_id, checked_at)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_date ON tracker(user_id, habit_id, checked_at, event_id)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_habit_date ON tracker(habit_id, checked_at)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_day ON tracker(user_id, habit_id, day_key, checked_at)"
+        )
 
         self.db.commit()
     def tearDown(self):
@@ -129,6 +163,109 @@ class TestHabitTracker(unittest.TestCase):
         self.assertEqual(len(events), 1)
         self.assertEqual(events[0].notes, "Felt great today!")
 
+    def test_habit_names_ignore_case(self):
+        """Test that habit names are looked up and kept unique regardless of case"""
+        self.assertEqual(self.habit_service.get_habit_by_name("test daily").name, "Test Daily")
+
+        success, message = self.habit_service.create_habit("TEST DAILY", "daily")
+        self.assertFalse(success)
+        self.assertIn("already exists", message)
+
+        # Changing only the case of a name is not a conflict with itself
+        success, _ = self.habit_service.update_habit("Test Daily", "Test daily", "daily")
+        self.assertTrue(success)
+        self.assertEqual(self.habit_service.get_habit_by_name("TEST DAILY").name, "Test daily")
+
+    def test_check_off_many(self):
+        """Test bulk check-offs with per-row error reports"""
+        today = datetime.now()
+        weekly_id = self.habit_service.get_habit_by_name("Test Weekly").habit_id
+        self.habit_service.create_habit("Archived", "daily")
+        self.habit_service.delete_habit("Archived", soft_delete=True)
+
+        saved, errors = self.tracker_service.check_off_many([
+            ("Test Daily", today - timedelta(days=2), "Bulk 1"),
+            ("Test Daily", (today - timedelta(days=1)).isoformat()),
+            (weekly_id, today, "By id"),
+            ("Missing", today, ""),
+            ("Archived", today, ""),
+            ("Test Daily", today + timedelta(days=1), ""),
+            ("Test Daily", "not a date", ""),
+        ])
+
+        self.assertEqual(saved, 3)
+        self.assertEqual([index for index, _ in errors], [3, 4, 5, 6])
+        self.assertIn("not found", errors[0][1])
+        self.assertIn("inactive", errors[1][1])
+        self.assertIn("future", errors[2][1])
+        self.assertEqual(self.analytics_service.calculate_longest_streak("Test Daily"), 2)
+        self.assertEqual(len(self.tracker_repo.find_by_habit_id(weekly_id)), 1)
+        self.assertEqual(self.analytics_service.check_stats_consistency(), [])
+
+    def test_check_off_many_with_offset_timestamps(self):
+        """Test that timestamps with a UTC offset are stored as naive local time"""
+        aware = (datetime.now() - timedelta(days=1)).astimezone(timezone(timedelta(hours=2))).replace(microsecond=0)
+
+        saved, errors = self.tracker_service.check_off_many([
+            ("Test Daily", aware.isoformat()),
+            ("Test Daily", "2999-05-01T08:00:00+02:00"),
+        ])
+
+        self.assertEqual(saved, 1)
+        self.assertEqual([index for index, _ in errors], [1])
+        self.assertIn("future", errors[0][1])
+        habit = self.habit_service.get_habit_by_name("Test Daily")
+        events = self.tracker_repo.find_by_habit_id(habit.habit_id)
+        self.assertEqual(events[-1].checked_at, aware.astimezone().replace(tzinfo=None))
+
+    def test_check_off_many_rejects_non_timestamp_values(self):
+        """Test that a checked_at of another type fails its row only"""
+        yesterday = datetime.now() - timedelta(days=1)
+
+        saved, errors = self.tracker_service.check_off_many([
+            ("Test Daily", 1700000000),
+            ("Test Daily", ["2024-01-01"]),
+            ("Test Daily", yesterday),
+        ])
+
+        self.assertEqual(saved, 1)
+        self.assertEqual([index for index, _ in errors], [0, 1])
+        self.assertIn("Invalid timestamp 1700000000", errors[0][1])
+
+    def test_check_off_many_matches_names_like_nocase(self):
+        """Test that names match regardless of ASCII case only, like the database"""
+        self.habit_service.create_habit("Äpfel", "daily")
+        self.habit_service.create_habit("äpfel", "daily")
+        yesterday = datetime.now() - timedelta(days=1)
+
+        saved, errors = self.tracker_service.check_off_many([("ÄPFEL", yesterday), ("äpfel", yesterday)])
+
+        self.assertEqual((saved, errors), (2, []))
+        for name in ("Äpfel", "äpfel"):
+            habit = self.habit_service.get_habit_by_name(name)
+            self.assertEqual(len(self.tracker_repo.find_by_habit_id(habit.habit_id)), 1)
+
+    def test_period_keys_stored_on_insert(self):
+        """Test that check-offs store their day and week keys for range queries"""
+        habit = self.habit_service.get_habit_by_name("Test Daily")
+        monday = datetime(2024, 1, 1, 8, 0)
+        self.tracker_service.check_off_habit("Test Daily", monday)
+        self.tracker_service.check_off_many([
+            ("Test Daily", monday + timedelta(days=offset)) for offset in (1, 6, 7)
+        ])
+
+        keys = self.db.execute(
+            "SELECT day_key, week_key FROM tracker WHERE habit_id = ? ORDER BY checked_at",
+            (habit.habit_id,)
+        ).fetchall()
+        self.assertEqual([day for day, _ in keys], [19723, 19724, 19729, 19730])
+        self.assertEqual([week for _, week in keys], [2818, 2818, 2818, 2819])
+
+        events = self.tracker_repo.find_by_habit_id_between(
+            habit.habit_id, monday.date() + timedelta(days=1), monday.date() + timedelta(days=6)
+        )
+        self.assertEqual([event.checked_at.day for event in events], [2, 7])
+
     def test_daily_streak_calculation(self):
         """Test streak calculation for daily habits"""
         # Day 1: Done
@@ -183,6 +320,47 @@ class TestHabitTracker(unittest.TestCase):
         streak = self.analytics_service.calculate_longest_streak("Test Weekly")
         self.assertEqual(streak, 3)
 
+    def test_sql_weekly_streak_across_year_boundary(self):
+        """Test that the SQL engine follows ISO weeks across a year boundary"""
+        # ISO weeks 2020-W52, 2020-W53, 2021-W01 and, after a gap, 2021-W03
+        for checked_at in ["2020-12-21T08:00:00", "2020-12-28T22:30:00.250000",
+                           "2021-01-04T07:00:00", "2021-01-05T07:00:00", "2021-01-18T09:15:00"]:
+            self.tracker_service.check_off_habit("Test Weekly", datetime.fromisoformat(checked_at))
+
+        sql_service = AnalyticsService(self.db, streak_engine="sql")
+        self.assertEqual(self.analytics_service.calculate_longest_streak("Test Weekly"), 3)
+        self.assertEqual(sql_service.calculate_longest_streak("Test Weekly"), 3)
+        self.assertEqual(sql_service.calculate_longest_streak("Test Daily"), 0)
+
+    def test_habit_stats_follow_check_offs_and_deletions(self):
+        """Test that habit_stats stays consistent through check-offs, backfills and deletions"""
+        today = datetime.now()
+        for days_ago in [3, 2, 2, 0, 5, 4]:  # Includes a duplicate day and out-of-order backfills
+            self.tracker_service.check_off_habit("Test Daily", today - timedelta(days=days_ago))
+        self.tracker_service.check_off_habit("Test Weekly", today - timedelta(weeks=1))
+
+        habit = self.habit_service.get_habit_by_name("Test Daily")
+        stats = HabitStatsRepository(self.db).find_by_habit_id(habit.habit_id)
+        self.assertEqual(stats.total_completions, 6)
+        self.assertEqual(stats.longest_streak, 4)
+        self.assertEqual(self.analytics_service.get_current_streak("Test Daily"), 1)
+        self.assertEqual(self.analytics_service.check_stats_consistency(), [])
+
+        # Deleting day 3 splits the 4-day streak
+        events = self.tracker_repo.find_by_habit_id(habit.habit_id)
+        self.assertTrue(self.tracker_repo.delete_by_event_id(events[2].event_id))
+        self.assertEqual(self.analytics_service.calculate_longest_streak("Test Daily"), 2)
+        self.assertEqual(self.analytics_service.check_stats_consistency(), [])
+
+        # Hard delete drops the statistics row
+        self.habit_service.delete_habit("Test Daily", soft_delete=False)
+        self.assertIsNone(HabitStatsRepository(self.db).find_by_habit_id(habit.habit_id))
+
+    def test_invalid_streak_engine(self):
+        """Test that unknown streak engines are rejected"""
+        with self.assertRaises(ValueError):
+            AnalyticsService(self.db, streak_engine="cobol")
+
     def test_habit_update(self):
         """Test updating a habit"""
         success, message = self.habit_service.update_habit(
@@ -437,6 +615,39 @@ class TestHabitTracker(unittest.TestCase):
             self.assertIsNotNone(event['checked_at'])
             self.assertIsInstance(event['checked_at'], (datetime, str))
 
+    def test_streaming_finders(self):
+        """Test that the iter_* finders stream the same events in small batches"""
+        for i in range(5):
+            self.tracker_service.check_off_habit("Test Daily", datetime.now() - timedelta(days=i))
+        habit = self.habit_service.get_habit_by_name("Test Daily")
+
+        events = self.tracker_repo.iter_by_habit_id(habit.habit_id, batch_size=2)
+        self.assertNotIsInstance(events, list)
+        self.assertEqual(
+            [event.event_id for event in events],
+            [event.event_id for event in self.tracker_repo.find_by_habit_id(habit.habit_id)]
+        )
+        self.assertEqual(
+            [event.event_id for event in self.tracker_repo.iter_all(batch_size=2)],
+            [event.event_id for event in self.tracker_repo.find_all()]
+        )
+        self.assertEqual(list(self.tracker_repo.iter_check_ins(batch_size=3)), self.tracker_repo.find_all_check_ins())
+
+    def test_streak_calculations_consume_streams(self):
+        """Test that the Python streak engine never materializes a habit's full history"""
+        for i in range(4):
+            self.tracker_service.check_off_habit("Test Daily", datetime.now() - timedelta(days=i))
+        service = AnalyticsService(self.db, streak_engine="python")
+
+        with mock.patch.object(TrackerRepository, 'find_by_habit_id', side_effect=AssertionError), \
+                mock.patch.object(TrackerRepository, 'find_all_check_ins', side_effect=AssertionError):
+            self.assertEqual(service.calculate_longest_streak("Test Daily"), 4)
+            self.assertEqual(service.get_current_streak("Test Daily"), 4)
+            self.assertEqual(service.get_longest_streak_all_habits(), ("Test Daily", 4))
+            summary = {row['name']: row for row in service.get_completion_summary()}
+            self.assertEqual(summary["Test Daily"]['total_completions'], 4)
+            self.assertEqual(summary["Test Weekly"]['total_completions'], 0)
+
 # Test fixtures for seeded data
 class TestSeedFixtures(unittest.TestCase):
     """Test cases for predefined seed data fixtures"""
@@ -469,7 +680,8 @@ class TestSeedFixtures(unittest.TestCase):
         cur.execute("""
             CREATE TABLE IF NOT EXISTS habits (
                 habit_id TEXT PRIMARY KEY,
-                name TEXT NOT NULL UNIQUE,
+                user_id TEXT NOT NULL DEFAULT 'default',
+                name TEXT NOT NULL,
                 periodicity TEXT NOT NULL,
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
@@ -482,17 +694,41 @@ class TestSeedFixtures(unittest.TestCase):
         cur.execute("""
             CREATE TABLE IF NOT EXISTS tracker (
                 event_id TEXT PRIMARY KEY,
+                user_id TEXT NOT NULL DEFAULT 'default',
                 habit_id TEXT NOT NULL,
                 checked_at TEXT NOT NULL,
                 notes TEXT DEFAULT '',
+                day_key INTEGER,
+                week_key INTEGER,
+                FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
+            )
+        """)
+
+        # Create habit statistics table
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS habit_stats (
+                habit_id TEXT PRIMARY KEY,
+                current_streak INTEGER NOT NULL DEFAULT 0,
+                longest_streak INTEGER NOT NULL DEFAULT 0,
+                last_period_key INTEGER,
+                total_completions INTEGER NOT NULL DEFAULT 0,
+                last_completion TEXT,
                 FOREIGN KEY (habit_id) REFERENCES habits(habit_id) ON DELETE CASCADE
             )
         """)
 
         # Create indexes
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_habit_name ON habits(name)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_habit ON tracker(habit_id)")
-        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_date ON tracker(checked_at)")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_habit_user_name ON habits(user_id, name COLLATE NOCASE)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_habit_user_periodicity ON habits(user_id, periodicity, created_at, habit_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_habit_user_active ON habits(user_id, is_active)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_user_date ON tracker(user_id, checked_at)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_date ON tracker(user_id, habit_id, checked_at, event_id)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_tracker_habit_date ON tracker(habit_id, checked_at)")
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_tracker_user_habit_day ON tracker(user_id, habit_id, day_key, checked_at)"
+        )
 
         self.db.commit()
 
@@ -556,6 +792,101 @@ class TestSeedFixtures(unittest.TestCase):
         self.assertEqual(champion_name, "Read Journal")
         self.assertEqual(champion_streak, 28)
 
+    def test_completion_summary_matches_per_habit_analytics(self):
+        """Test that the batched summary agrees with the per-habit calculations"""
+        summary = self.analytics_service.get_completion_summary()
+        self.assertEqual(len(summary), 5)
+
+        for item in summary:
+            events = self.tracker_repo.find_by_habit_id(item['habit_id'])
+            self.assertEqual(item['total_completions'], len(events))
+            self.assertEqual(item['last_completion'], events[-1].checked_at)
+            self.assertEqual(
+                item['longest_streak'],
+                self.analytics_service.calculate_longest_streak(item['name'])
+            )
+            self.assertEqual(
+                item['current_streak'],
+                self.analytics_service.get_current_streak(item['name'])
+            )
+
+    def test_sql_streak_engine_matches_python_engine(self):
+        """Test that the SQL streak engine gives the same results as the Python one"""
+        sql_service = AnalyticsService(self.db, streak_engine="sql")
+        python_service = AnalyticsService(self.db, streak_engine="python")
+
+        for habit in self.habit_service.get_all_habits(include_inactive=True):
+            self.assertEqual(
+                sql_service.calculate_longest_streak(habit.name),
+                python_service.calculate_longest_streak(habit.name),
+                habit.name
+            )
+
+        self.assertEqual(
+            sql_service.get_longest_streak_all_habits(),
+            python_service.get_longest_streak_all_habits()
+        )
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy is not installed")
+    def test_numpy_streak_engine_matches_python_engine(self):
+        """Test that the vectorized NumPy engine gives the same results as the Python one"""
+        numpy_service = AnalyticsService(self.db, streak_engine="numpy")
+        python_service = AnalyticsService(self.db, streak_engine="python")
+        self.assertEqual(numpy_service.streak_engine, "numpy")
+
+        for habit in self.habit_service.get_all_habits(include_inactive=True):
+            self.assertEqual(
+                numpy_service.calculate_longest_streak(habit.name),
+                python_service.calculate_longest_streak(habit.name),
+                habit.name
+            )
+            self.assertEqual(
+                numpy_service.get_current_streak(habit.name),
+                python_service.get_current_streak(habit.name),
+                habit.name
+            )
+
+        self.assertEqual(
+            numpy_service.get_longest_streak_all_habits(),
+            python_service.get_longest_streak_all_habits()
+        )
+        self.assertEqual(
+            numpy_service.get_completion_summary(),
+            python_service.get_completion_summary()
+        )
+
+    def test_completion_rates(self):
+        """Test completion rates of the seeded habits"""
+        rates = self.analytics_service.get_completion_rates()
+        self.assertEqual(len(rates), 5)
+        self.assertEqual(rates["Read Journal"], 1.0)
+        for name, rate in rates.items():
+            self.assertGreater(rate, 0.0, name)
+            self.assertLessEqual(rate, 1.0, name)
+
+        # The pure-Python fallback agrees with the vectorized path
+        with mock.patch("services.vectorized_analytics.NUMPY_AVAILABLE", False):
+            self.assertEqual(self.analytics_service.get_completion_rates(), rates)
+
+    def test_habit_stats_consistent_with_analytics(self):
+        """Test that the seeded habit_stats table matches on-the-fly analytics"""
+        self.assertEqual(self.analytics_service.check_stats_consistency(), [])
+
+        python_service = AnalyticsService(self.db, streak_engine="python")
+        self.assertEqual(
+            self.analytics_service.get_completion_summary(),
+            python_service.get_completion_summary()
+        )
+
+    def test_rebuild_habit_stats(self):
+        """Test that habit_stats can be rebuilt from the tracker table"""
+        self.db.execute("UPDATE habit_stats SET longest_streak = 99")
+        self.db.commit()
+        self.assertEqual(len(self.analytics_service.check_stats_consistency()), 5)
+
+        self.assertTrue(HabitStatsRepository(self.db).rebuild())
+        self.assertEqual(self.analytics_service.check_stats_consistency(), [])
+
     def test_all_habits_have_descriptions(self):
         """Test that all seeded habits have descriptions"""
         all_habits = self.habit_service.get_all_habits(include_inactive=True)
@@ -564,5 +895,102 @@ class TestSeedFixtures(unittest.TestCase):
             self.assertGreater(len(habit.description), 0)
 
 
+class TestModels(unittest.TestCase):
+    """Test cases for the slotted, lazily parsed models"""
+
+    def test_tracker_event_from_tuple_parses_lazily(self):
+        """Test that rows keep their ISO timestamp until checked_at is read"""
+        event = TrackerEvent.from_tuple(("e1", "h1", "2024-03-01T08:30:00", "note"))
+        self.assertFalse(hasattr(event, '__dict__'))
+        self.assertIsNone(event._checked_at)
+        self.assertEqual(event.checked_at_iso, "2024-03-01T08:30:00")
+
+        self.assertEqual(event.checked_at, datetime(2024, 3, 1, 8, 30))
+        self.assertEqual(event, TrackerEvent("h1", datetime(2024, 3, 1, 8, 30), "e1", "note"))
+
+    def test_habit_from_tuple_keeps_supplied_id(self):
+        """Test that loaded habits keep their ID and parse timestamps on access"""
+        habit = Habit.from_tuple(
+            ("h1", "Read", "daily", "2024-03-01T08:30:00", "2024-03-02T09:00:00", 0, "desc")
+        )
+        self.assertEqual(habit.habit_id, "h1")
+        self.assertFalse(habit.is_active)
+        self.assertEqual(habit.updated_at, datetime(2024, 3, 2, 9, 0))
+        self.assertEqual(Habit.from_dict(habit.to_dict()), habit)
+
+    def test_new_models_get_defaults(self):
+        """Test that models built without an ID or timestamps still get defaults"""
+        habit = Habit(name="New", periodicity="weekly")
+        event = TrackerEvent(habit_id=habit.habit_id, checked_at=datetime.now())
+        self.assertTrue(habit.habit_id)
+        self.assertIsInstance(habit.created_at, datetime)
+        self.assertTrue(event.event_id)
+
+
+class TestDatabaseConnection(unittest.TestCase):
+    """Test cases for the shared connection manager"""
+
+    def setUp(self):
+        """Point the connection manager at a temporary database file"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "habits.db")
+
+    def tearDown(self):
+        """Close shared connections and remove the temporary directory"""
+        Database.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_connection_is_shared_per_thread(self):
+        """Test that a thread gets the same connection back and other threads get their own"""
+        con = Database.get_connection(self.db_name)
+        self.assertIs(Database.get_connection(self.db_name), con)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(Database.connect(self.db_name)))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], con)
+
+    def test_pragmas_are_applied(self):
+        """Test that the configured pragmas are set on new connections"""
+        con = Database.get_connection(self.db_name)
+        self.assertEqual(con.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(con.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.assertEqual(con.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+    def test_schema_version_is_recorded(self):
+        """Test that schema initialization is tracked through PRAGMA user_version"""
+        con = Database.get_connection(self.db_name)
+        self.assertEqual(
+            con.execute("PRAGMA user_version").fetchone()[0],
+            len(Database.MIGRATIONS)
+        )
+
+    def test_legacy_database_is_migrated(self):
+        """Test that a pre-existing unversioned database gets habit_stats backfilled"""
+        legacy = sqlite3.connect(self.db_name)
+        legacy.executescript("""
+            CREATE TABLE habits (habit_id TEXT PRIMARY KEY, name TEXT NOT NULL, periodicity TEXT NOT NULL,
+                                 created_at TEXT NOT NULL, updated_at TEXT NOT NULL,
+                                 description TEXT DEFAULT '', is_active INTEGER DEFAULT 1);
+            CREATE TABLE tracker (event_id TEXT PRIMARY KEY, habit_id TEXT NOT NULL,
+                                  checked_at TEXT NOT NULL, notes TEXT DEFAULT '');
+            INSERT INTO habits VALUES ('h1', 'Legacy', 'daily', '2024-01-01T00:00:00',
+                                       '2024-01-01T00:00:00', '', 1);
+            INSERT INTO tracker VALUES ('e1', 'h1', '2024-01-01T08:00:00', '');
+            INSERT INTO tracker VALUES ('e2', 'h1', '2024-01-02T08:00:00', '');
+        """)
+        legacy.close()
+
+        con = Database.get_connection(self.db_name)
+        stats = HabitStatsRepository(con).find_by_habit_id('h1')
+        self.assertEqual(stats.longest_streak, 2)
+        self.assertEqual(stats.total_completions, 2)
+
+        # 2024-01-01 is day 19723 and falls in the week starting on Monday 2024-01-01
+        keys = con.execute("SELECT day_key, week_key FROM tracker ORDER BY checked_at").fetchall()
+        self.assertEqual(keys, [(19723, (19723 + 3) // 7), (19724, (19723 + 3) // 7)])
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
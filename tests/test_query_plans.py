@@ -0,0 +1,197 @@
+"""
+Query plan regression tests for the repository layer
+"""
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta
+from repositories.habit_repository import HabitRepository
+from repositories.tracker_repository import TrackerRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from database.connection import Database
+from models.habit import Habit
+from models.tracker import TrackerEvent
+
+# Tables whose rows a query must reach through an index
+TABLES = ('habits', 'tracker', 'habit_stats')
+
+
+class TestQueryPlans(unittest.TestCase):
+    """
+    Runs every repository method with a trace callback, then checks the
+    EXPLAIN QUERY PLAN of each statement it issued.
+    """
+
+    def setUp(self):
+        """Create a migrated database and record the statements of every repository method"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database.connect(os.path.join(self.tmp_dir.name, "plans.db"))
+
+        habit_repo = HabitRepository(self.db)
+        tracker_repo = TrackerRepository(self.db)
+        stats_repo = HabitStatsRepository(self.db)
+
+        habit = Habit(name="Plan Habit", periodicity="daily")
+        habit_repo.save(habit)
+        now = datetime.now()
+        first = TrackerEvent(habit.habit_id, now - timedelta(days=3))
+        second = TrackerEvent(habit.habit_id, now - timedelta(days=5))
+
+        self.statements = []
+        self.db.set_trace_callback(self.statements.append)
+
+        habit_repo.find_all()
+        # Empty the identity map, so that the lookups query the database
+        self.db.identity_maps.clear()
+        habit_repo.find_by_id(habit.habit_id)
+        self.db.identity_maps.clear()
+        habit_repo.find_by_name("plan habit")
+        habit_repo.find_by_names_or_ids(["Plan Habit", habit.habit_id])
+        habit_repo.find_by_periodicity("daily")
+        habit_repo.find_by_periodicity("daily", include_inactive=True)
+        habit_repo.find_page()
+        habit_repo.find_page(after=("daily", habit.created_at_iso, habit.habit_id))
+        habit_repo.find_page(before=("weekly", habit.created_at_iso, habit.habit_id), include_inactive=True)
+        habit_repo.update(habit)
+        habit_repo.count()
+        habit_repo.count(include_inactive=True)
+
+        tracker_repo.save(first)
+        tracker_repo.save_many([second])
+        tracker_repo.insert_rows([("imported", habit.habit_id, now.isoformat(), "", 0, 0)])
+        tracker_repo.refresh_stats([habit.habit_id])
+        tracker_repo.find_by_habit_id(habit.habit_id)
+        tracker_repo.find_by_habit_name("Plan Habit")
+        tracker_repo.find_page_by_habit_id(habit.habit_id)
+        tracker_repo.find_page_by_habit_id(habit.habit_id, after=(first.checked_at_iso, first.event_id))
+        tracker_repo.find_page_by_habit_id(habit.habit_id, before=(first.checked_at_iso, first.event_id))
+        tracker_repo.find_by_habit_id_between(habit.habit_id, date.today() - timedelta(days=7), date.today())
+        tracker_repo.find_all()
+        list(tracker_repo.iter_export_rows(periodicity="daily"))
+        list(tracker_repo.iter_export_rows([habit.habit_id], start=date.today() - timedelta(days=7)))
+        list(tracker_repo.iter_export_rows(start=date.today() - timedelta(days=7), end=date.today()))
+        tracker_repo.find_all_check_ins()
+        tracker_repo.find_period_keys_in_range(habit.habit_id, habit.habit_id)
+        tracker_repo.find_last_completions()
+        tracker_repo.load_day_arrays()
+        tracker_repo.load_day_arrays(habit.habit_id)
+        tracker_repo.find_by_event_id(first.event_id)
+        tracker_repo.update_notes(first.event_id, "notes")
+        tracker_repo.delete_by_event_id(second.event_id)
+
+        stats_repo.find_by_habit_id(habit.habit_id)
+        stats_repo.find_all()
+
+        tracker_repo.delete_by_habit_id(habit.habit_id)
+        habit_repo.delete(habit.habit_id, soft_delete=True)
+        habit_repo.delete(habit.habit_id, soft_delete=False)
+
+        self.db.set_trace_callback(None)
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def _plan(self, statement: str) -> list:
+        """Returns the detail lines of the query plan of a statement"""
+        return [row[3] for row in self.db.execute(f"EXPLAIN QUERY PLAN {statement}")]
+
+    def _checked_statements(self) -> list:
+        """
+        Returns the distinct recorded statements to check. The streak window
+        queries are left out: their DISTINCT and window sorts are inherent.
+        """
+        checked = []
+        for statement in dict.fromkeys(self.statements):
+            keyword = statement.split(None, 1)[0].upper()
+            if keyword not in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'WITH'):
+                continue
+            if 'ROW_NUMBER()' in statement:
+                continue
+            checked.append(statement)
+        return checked
+
+    def test_statements_were_recorded(self):
+        """Test that the trace callback captured the repository queries"""
+        self.assertGreater(len(self._checked_statements()), 20)
+
+    def test_no_temp_btree_sorts(self):
+        """Test that no repository query needs a temporary B-tree for sorting or grouping"""
+        for statement in self._checked_statements():
+            with self.subTest(statement=" ".join(statement.split())):
+                plan = self._plan(statement)
+                self.assertFalse([line for line in plan if 'TEMP B-TREE' in line], plan)
+
+    def test_filtered_queries_use_indexes(self):
+        """Test that queries with a WHERE clause never fall back to a full table scan"""
+        table_scan = re.compile(rf"^SCAN ({'|'.join(TABLES)})\b(?! USING)")
+        for statement in self._checked_statements():
+            if not re.search(r"\bWHERE\b", statement, re.IGNORECASE):
+                continue
+            with self.subTest(statement=" ".join(statement.split())):
+                plan = self._plan(statement)
+                self.assertFalse([line for line in plan if table_scan.match(line)], plan)
+                self.assertFalse(
+                    [line for line in plan if re.match(rf"^SCAN ({'|'.join(TABLES)}) USING", line)],
+                    plan
+                )
+
+    def test_habit_names_are_unique_ignoring_case(self):
+        """Test that the name index rejects names that only differ by case"""
+        HabitRepository(self.db).save(Habit(name="Yoga", periodicity="daily"))
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.execute(
+                "INSERT INTO habits (habit_id, name, periodicity, created_at, updated_at) "
+                "VALUES ('other', 'YOGA', 'daily', '2024-01-01', '2024-01-01')"
+            )
+
+
+class TestIndexMigration(unittest.TestCase):
+    """Test cases for the index redesign of existing databases"""
+
+    def setUp(self):
+        """Create a version 2 database with the old index layout"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "legacy.db")
+
+        legacy = sqlite3.connect(self.db_name)
+        Database.create_tables(legacy)
+        legacy.executescript("""
+            INSERT INTO habits VALUES ('h1', 'Run', 'daily', '2024-01-01T00:00:00', '2024-01-01T00:00:00', '', 1);
+            INSERT INTO habits VALUES ('h2', 'run', 'daily', '2024-01-02T00:00:00', '2024-01-02T00:00:00', '', 1);
+            PRAGMA user_version = 2;
+        """)
+        legacy.close()
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp_dir.cleanup()
+
+    def test_migration_replaces_indexes_and_renames_duplicates(self):
+        """Test that migrating drops superseded indexes and resolves case-duplicate names"""
+        with self.assertLogs('database.connection', level='INFO') as logs:
+            con = Database.connect(self.db_name)
+        try:
+            self.assertEqual(logs.output, ["INFO:database.connection:Renaming duplicate habit 'run' to 'run (2)'"])
+            indexes = {row[0] for row in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            self.assertIn('idx_habit_user_name', indexes)
+            self.assertIn('idx_tracker_user_habit_date', indexes)
+            self.assertEqual(
+                [row[2] for row in con.execute("PRAGMA index_info(idx_tracker_user_habit_date)")],
+                ['user_id', 'habit_id', 'checked_at', 'event_id']
+            )
+            self.assertNotIn('idx_habit_name', indexes)
+            self.assertNotIn('idx_habit_name_nocase', indexes)
+            self.assertNotIn('idx_tracker_habit', indexes)
+
+            rows = con.execute("SELECT name, user_id FROM habits ORDER BY created_at").fetchall()
+            self.assertEqual(rows, [('Run', 'default'), ('run (2)', 'default')])
+        finally:
+            con.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+"""
+Test suite for the synthetic dataset generator
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+from click.testing import CliRunner
+from config import Config
+from database.connection import Database
+from repositories.habit_repository import HabitRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from utils.seed_data import generate_synthetic_data
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Test cases for generate_synthetic_data"""
+
+    def setUp(self):
+        """Create a temporary directory for the databases"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the temporary directory"""
+        self.tmp_dir.cleanup()
+
+    def _generate(self, name, *args, **kwargs):
+        """Generates a dataset into a new database, returns (connection, result)"""
+        db = Database.connect(os.path.join(self.tmp_dir.name, name))
+        self.addCleanup(db.close)
+        return db, generate_synthetic_data(db, *args, **kwargs)
+
+    @staticmethod
+    def _rows(db):
+        return db.execute(
+            "SELECT event_id, habit_id, checked_at, day_key, week_key FROM tracker ORDER BY event_id"
+        ).fetchall()
+
+    def test_same_seed_same_dataset(self):
+        """Test that the same arguments produce the same habits and check-offs, another seed others"""
+        first, result = self._generate("first.db", 12, 60, 0.6, 'mixed', seed=5)
+        second, _ = self._generate("second.db", 12, 60, 0.6, 'mixed', seed=5)
+        other, _ = self._generate("other.db", 12, 60, 0.6, 'mixed', seed=6)
+
+        self.assertEqual(result['habits'], 12)
+        self.assertEqual(result['events'], len(self._rows(first)))
+        self.assertEqual(self._rows(first), self._rows(second))
+        self.assertNotEqual(self._rows(first), self._rows(other))
+
+    def test_stats_match_a_rebuild(self):
+        """Test that the generated habit_stats equal those recomputed from the tracker table"""
+        for pattern in Config.SYNTHETIC_PATTERNS:
+            with self.subTest(pattern=pattern):
+                db, _ = self._generate(f"{pattern}.db", 16, 120, 0.7, pattern)
+                stats = HabitStatsRepository(db).find_all()
+                self.assertTrue(HabitStatsRepository(db).rebuild())
+                self.assertEqual(stats, HabitStatsRepository(db).find_all())
+
+    def test_one_past_check_off_per_period(self):
+        """Test that every period holds at most one check-off and none lies in the future"""
+        db, _ = self._generate("periods.db", 8, 90, 0.9, 'streaky')
+        duplicates = db.execute(
+            """
+            SELECT COUNT(*) FROM (
+                SELECT 1 FROM tracker t INNER JOIN habits h ON h.habit_id = t.habit_id
+                GROUP BY t.habit_id, CASE h.periodicity WHEN 'daily' THEN t.day_key ELSE t.week_key END
+                HAVING COUNT(*) > 1
+            )
+            """
+        ).fetchone()[0]
+        latest = db.execute("SELECT MAX(checked_at) FROM tracker").fetchone()[0]
+
+        self.assertEqual(duplicates, 0)
+        self.assertLess(latest, datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).isoformat())
+
+    def test_patterns_shape_streaks(self):
+        """Test that streaky histories have longer streaks than uniform ones, and weekday ones fewer weekend days"""
+        uniform, _ = self._generate("uniform.db", 20, 365, 0.7, 'uniform')
+        streaky, _ = self._generate("streaky.db", 20, 365, 0.7, 'streaky')
+        weekday, _ = self._generate("weekday.db", 20, 365, 0.7, 'weekday')
+
+        def mean_longest(db):
+            stats = HabitStatsRepository(db).find_all().values()
+            return sum(item.longest_streak for item in stats) / len(stats)
+
+        def weekend_share(db):
+            return db.execute(
+                """
+                SELECT AVG(strftime('%w', t.checked_at) IN ('0', '6'))
+                FROM tracker t INNER JOIN habits h ON h.habit_id = t.habit_id
+                WHERE h.periodicity = 'daily'
+                """
+            ).fetchone()[0]
+
+        events = uniform.execute("SELECT COUNT(*) FROM tracker").fetchone()[0]
+        expected = (15 * 365 + 5 * 52) * 0.7
+        self.assertAlmostEqual(events / expected, 1, delta=0.1)
+        self.assertGreater(mean_longest(streaky), 2 * mean_longest(uniform))
+        self.assertLess(weekend_share(weekday), weekend_share(streaky) / 2)
+
+    def test_indexes_and_foreign_keys_restored(self):
+        """Test that the tracker indexes are rebuilt and foreign keys enforced again after the load"""
+        db = Database.connect(os.path.join(self.tmp_dir.name, "indexes.db"))
+        self.addCleanup(db.close)
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tracker' ORDER BY name"
+        indexes = db.execute(query).fetchall()
+
+        generate_synthetic_data(db, 4, 30)
+
+        self.assertEqual(db.execute(query).fetchall(), indexes)
+        self.assertEqual(db.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+        self.assertEqual(db.execute("PRAGMA foreign_key_check").fetchall(), [])
+
+    def test_indexes_restored_after_failed_load(self):
+        """Test that the tracker indexes are rebuilt when inserting the check-offs fails"""
+        db = Database.connect(os.path.join(self.tmp_dir.name, "failed.db"))
+        self.addCleanup(db.close)
+        query = "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tracker' ORDER BY name"
+        indexes = db.execute(query).fetchall()
+
+        with mock.patch('utils.seed_data._insert', side_effect=RuntimeError("disk full")):
+            with self.assertRaises(RuntimeError):
+                generate_synthetic_data(db, 4, 30)
+
+        self.assertEqual(db.execute(query).fetchall(), indexes)
+        self.assertEqual(db.execute("PRAGMA foreign_keys").fetchone()[0], 1)
+
+    def test_killed_load_is_repaired_on_connect(self):
+        """Test that indexes left dropped by a load that never finished are recreated by the next connection"""
+        name = os.path.join(self.tmp_dir.name, "killed.db")
+        db = Database.connect(name)
+        query = ("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'tracker' "
+                 "AND sql IS NOT NULL ORDER BY name")
+        indexes = db.execute(query).fetchall()
+        # What deferred_indexes has committed when the process dies mid-load
+        for (index,) in indexes:
+            db.execute(f"DROP INDEX {index}")
+        db.commit()
+        db.close()
+
+        db = Database.connect(name)
+        self.addCleanup(db.close)
+        self.assertEqual(db.execute(query).fetchall(), indexes)
+
+    def test_refuses_non_empty_database(self):
+        """Test that generating into a database that already holds data raises and changes nothing"""
+        db, _ = self._generate("twice.db", 3, 10)
+        rows = self._rows(db)
+
+        with self.assertRaises(RuntimeError):
+            generate_synthetic_data(db, 3, 10, seed=1)
+        with self.assertRaises(RuntimeError):
+            generate_synthetic_data(db, 3, 10, user_id="someone-else")
+        self.assertEqual(self._rows(db), rows)
+        self.assertEqual(HabitRepository(db).count(include_inactive=True), 3)
+
+    def test_invalid_arguments(self):
+        """Test that unknown patterns and densities outside [0, 1] are rejected"""
+        db = Database.connect(os.path.join(self.tmp_dir.name, "invalid.db"))
+        self.addCleanup(db.close)
+        with self.assertRaises(ValueError):
+            generate_synthetic_data(db, 3, 10, pattern='random')
+        with self.assertRaises(ValueError):
+            generate_synthetic_data(db, 3, 10, density=1.5)
+        self.assertEqual(HabitRepository(db).count(include_inactive=True), 0)
+
+
+class TestSeedCommand(unittest.TestCase):
+    """Test cases for the synthetic options of the seed command"""
+
+    def setUp(self):
+        """Point the default database into a temporary directory"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patch = mock.patch.object(Config, 'DATABASE_NAME', os.path.join(self.tmp_dir.name, "cli.db"))
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Close the shared connections and remove the temporary directory"""
+        Database.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_seed_synthetic_habits(self):
+        """Test that seed --habits generates a dataset, and refuses to seed twice"""
+        from cli import cli
+
+        result = CliRunner().invoke(cli, ['seed', '--habits', '6', '--days', '30', '--pattern', 'weekday'], obj={})
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("6 synthetic habits", result.output)
+        self.assertEqual(HabitRepository(Database.get_connection()).count(), 6)
+
+        result = CliRunner().invoke(cli, ['seed', '--habits', '6'], obj={})
+        self.assertIn("already contains habits", result.output)
+        self.assertEqual(HabitRepository(Database.get_connection()).count(), 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
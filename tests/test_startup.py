@@ -0,0 +1,90 @@
+"""
+Startup tests for the one-shot CLI commands
+
+The import time budget depends on the machine, so it is only checked with
+CHECK_STARTUP_BUDGET=1 set; benchmarks/bench_suite.py measures CLI startup too.
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+MAIN = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+
+# Total self time of all imports of one command, in microseconds (python -X importtime)
+STARTUP_BUDGET_US = 250_000
+CHECK_BUDGET = os.environ.get("CHECK_STARTUP_BUDGET") == "1"
+
+# Modules that only the interactive menu, seeding and table views need
+HEAVY_MODULES = ('rich', 'numpy', 'controllers', 'utils.seed_data', 'views.console_view')
+
+
+class TestStartupBudget(unittest.TestCase):
+    """Runs the quick commands in a subprocess under python -X importtime"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Seed a database in a temporary working directory"""
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls._run("seed")
+
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the temporary working directory"""
+        cls.tmp_dir.cleanup()
+
+    @classmethod
+    def _run(cls, *args, importtime: bool = False) -> subprocess.CompletedProcess:
+        """Runs main.py with the given arguments inside the temporary directory"""
+        command = [sys.executable] + (["-X", "importtime"] if importtime else []) + [MAIN, *args]
+        result = subprocess.run(
+            command, cwd=cls.tmp_dir.name, capture_output=True, text=True,
+            env={**os.environ, "PYTHONIOENCODING": "utf-8"}
+        )
+        if result.returncode != 0:
+            raise AssertionError(f"{args} failed:\n{result.stdout}\n{result.stderr}")
+        return result
+
+    def _imports(self, *args) -> dict:
+        """Returns module name -> self import time (us) of one command"""
+        imports = {}
+        for line in self._run(*args, importtime=True).stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            self_us, _, name = line[len("import time:"):].split("|")
+            imports[name.strip()] = int(self_us)
+        return imports
+
+    def _check_command(self, *args):
+        """Asserts that a command skips heavy modules (and, if enabled, stays within the budget)"""
+        imports = self._imports(*args)
+        heavy = [name for name in imports if name.split('.')[0] in HEAVY_MODULES or name in HEAVY_MODULES]
+        self.assertEqual(heavy, [], f"{args[0]} imports heavy modules")
+        if CHECK_BUDGET:
+            self.assertLess(sum(imports.values()), STARTUP_BUDGET_US, f"{args[0]} import time")
+
+    def test_checkoff_startup(self):
+        """Test that checkoff imports only what it needs"""
+        self._check_command("checkoff", "Read Journal")
+
+    def test_streak_startup(self):
+        """Test that streak imports only what it needs"""
+        self._check_command("streak", "Read Journal")
+
+    def test_champion_startup(self):
+        """Test that champion imports only what it needs"""
+        self._check_command("champion")
+
+    def test_commands_do_not_seed(self):
+        """Test that only the menu and the seed command populate a database"""
+        with tempfile.TemporaryDirectory() as empty_dir:
+            result = subprocess.run(
+                [sys.executable, MAIN, "champion"], cwd=empty_dir, capture_output=True, text=True,
+                env={**os.environ, "PYTHONIOENCODING": "utf-8"}
+            )
+        self.assertIn("No habits found", result.stdout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Stress tests for repositories and services shared between threads
+"""
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime, timedelta
+from database.connection import Database
+from database.provider import ConnectionProvider
+from repositories.habit_stats_repository import HabitStatsRepository
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+WRITERS = 8
+READERS = 4
+CHECKOFFS_PER_WRITER = 40
+HABITS = ("Read", "Gym", "Budget")
+
+
+class TestThreadSafety(unittest.TestCase):
+    """Hammers one set of services from many threads through a ConnectionProvider"""
+
+    def setUp(self):
+        """Create a provider and the habits the threads check off"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_name = os.path.join(self.tmp_dir.name, "threads.db")
+        self.provider = ConnectionProvider(self.db_name)
+        for name in HABITS:
+            HabitService(self.provider).create_habit(name, "daily")
+
+    def tearDown(self):
+        """Close every thread's connection and remove the temporary directory"""
+        self.provider.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_concurrent_checkoffs_and_summaries(self):
+        """Test that concurrent check-offs are never lost while summaries are read"""
+        tracker_service = TrackerService(self.provider)
+        analytics_service = AnalyticsService(self.provider)
+        results, summaries, errors = [], [], []
+        done = threading.Event()
+        start = datetime.now() - timedelta(days=WRITERS * CHECKOFFS_PER_WRITER)
+
+        def writer(index: int):
+            try:
+                for offset in range(CHECKOFFS_PER_WRITER):
+                    day = start + timedelta(days=index * CHECKOFFS_PER_WRITER + offset)
+                    results.append(tracker_service.check_off_habit(HABITS[offset % len(HABITS)], day))
+            except Exception as e:
+                errors.append(e)
+
+        def reader():
+            try:
+                while not done.is_set():
+                    summaries.append(analytics_service.get_completion_summary())
+            except Exception as e:
+                errors.append(e)
+
+        writers = [threading.Thread(target=writer, args=(index,)) for index in range(WRITERS)]
+        readers = [threading.Thread(target=reader) for _ in range(READERS)]
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertGreater(len(summaries), 0)
+        self.assertEqual([message for success, message in results if not success], [])
+
+        # Every check-off reached the database ...
+        con = Database.connect(self.db_name)
+        try:
+            self.assertEqual(con.execute("SELECT count(*) FROM tracker").fetchone()[0], WRITERS * CHECKOFFS_PER_WRITER)
+            stats = con.execute("SELECT * FROM habit_stats ORDER BY habit_id").fetchall()
+        finally:
+            con.close()
+
+        # ... and the incrementally maintained statistics match a full recomputation
+        HabitStatsRepository(self.provider).rebuild()
+        con = Database.connect(self.db_name)
+        try:
+            self.assertEqual(con.execute("SELECT * FROM habit_stats ORDER BY habit_id").fetchall(), stats)
+        finally:
+            con.close()
+
+        final = {row['name']: row['total_completions'] for row in analytics_service.get_completion_summary()}
+        self.assertEqual(sum(final.values()), WRITERS * CHECKOFFS_PER_WRITER)
+
+    def test_each_thread_gets_its_own_connection(self):
+        """Test that the provider hands out one connection per thread"""
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(self.provider.connection()))
+        thread.start()
+        thread.join()
+        self.assertIs(self.provider.connection(), self.provider.connection())
+        self.assertIsNot(self.provider.connection(), connections[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
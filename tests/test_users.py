@@ -0,0 +1,141 @@
+"""
+Test suite for the per-user data model and the sharded layout
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from config import Config
+from database.connection import Database
+from models.user import User
+from models.habit_stats import HabitStats
+from repositories.habit_repository import HabitRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from repositories.tracker_repository import TrackerRepository
+from repositories.user_repository import UserRepository
+from services.analytics_service import AnalyticsService
+from services.habit_service import HabitService
+from services.tracker_service import TrackerService
+
+
+class TestUserScoping(unittest.TestCase):
+    """Test that every repository query only sees the data of its user"""
+
+    def setUp(self):
+        """Create two users with a habit of the same name"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db = Database.connect(os.path.join(self.tmp_dir.name, "users.db"))
+
+        self.alice, self.bob = User("Alice"), User("Bob")
+        for user in (self.alice, self.bob):
+            self.assertTrue(UserRepository(self.db).save(user))
+            HabitService(self.db, user.user_id).create_habit("Read", "daily")
+        TrackerService(self.db, self.alice.user_id).check_off_habit("Read")
+
+    def tearDown(self):
+        """Close the database and remove the temporary directory"""
+        self.db.close()
+        self.tmp_dir.cleanup()
+
+    def test_default_user_exists(self):
+        """Test that the migration creates the default user"""
+        self.assertIsNotNone(UserRepository(self.db).find_by_id(Config.DEFAULT_USER_ID))
+        self.assertEqual(UserRepository(self.db).count(), 3)
+
+    def test_habits_are_scoped_by_user(self):
+        """Test that users only see their own habits, and names are unique per user only"""
+        alice_habits = HabitRepository(self.db, self.alice.user_id)
+        bob_habits = HabitRepository(self.db, self.bob.user_id)
+        alice_read = alice_habits.find_by_name("read")
+
+        self.assertNotEqual(alice_read.habit_id, bob_habits.find_by_name("Read").habit_id)
+        self.assertIsNone(bob_habits.find_by_id(alice_read.habit_id))
+        self.assertEqual(bob_habits.find_by_names_or_ids([alice_read.habit_id]), [])
+        self.assertEqual(HabitRepository(self.db).count(), 0)
+
+        success, message = HabitService(self.db, self.alice.user_id).create_habit("READ", "daily")
+        self.assertFalse(success)
+        self.assertIn("already exists", message)
+
+    def test_other_users_cannot_modify_habits(self):
+        """Test that updates and deletes through another user's repository change nothing"""
+        alice_read = HabitRepository(self.db, self.alice.user_id).find_by_name("Read")
+        bob_habits = HabitRepository(self.db, self.bob.user_id)
+
+        bob_habits.delete(alice_read.habit_id, soft_delete=False)
+        TrackerRepository(self.db, self.bob.user_id).delete_by_habit_id(alice_read.habit_id)
+
+        self.assertIsNotNone(HabitRepository(self.db, self.alice.user_id).find_by_id(alice_read.habit_id))
+        self.assertEqual(len(TrackerRepository(self.db, self.alice.user_id).find_by_habit_id(alice_read.habit_id)), 1)
+
+    def test_check_offs_and_analytics_are_scoped_by_user(self):
+        """Test that check-offs and summaries only count the user's own events"""
+        alice_summary = AnalyticsService(self.db, user_id=self.alice.user_id).get_completion_summary()
+        bob_summary = AnalyticsService(self.db, user_id=self.bob.user_id).get_completion_summary()
+
+        self.assertEqual([row['total_completions'] for row in alice_summary], [1])
+        self.assertEqual([row['total_completions'] for row in bob_summary], [0])
+        self.assertEqual(TrackerRepository(self.db, self.bob.user_id).find_all(), [])
+        self.assertEqual(len(TrackerRepository(self.db, self.alice.user_id).find_all()), 1)
+
+    def test_habit_stats_are_scoped_by_user(self):
+        """Test that statistics of another user's habit can neither be read nor overwritten"""
+        alice_read = HabitRepository(self.db, self.alice.user_id).find_by_name("Read")
+        alice_stats = HabitStatsRepository(self.db, self.alice.user_id)
+        bob_stats = HabitStatsRepository(self.db, self.bob.user_id)
+
+        self.assertEqual(alice_stats.find_by_habit_id(alice_read.habit_id).total_completions, 1)
+        self.assertIsNone(bob_stats.find_by_habit_id(alice_read.habit_id))
+        self.assertEqual(bob_stats.find_all(), {})
+
+        self.assertTrue(bob_stats.save_many([HabitStats(alice_read.habit_id, total_completions=99)]))
+        self.assertEqual(alice_stats.find_by_habit_id(alice_read.habit_id).total_completions, 1)
+
+
+class TestShardedLayout(unittest.TestCase):
+    """Test that Config.SHARD_COUNT spreads users over several database files"""
+
+    def setUp(self):
+        """Point the default database into a temporary directory and enable sharding"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patches = [
+            mock.patch.object(Config, 'DATABASE_NAME', os.path.join(self.tmp_dir.name, "main.db")),
+            mock.patch.object(Config, 'SHARD_COUNT', 4),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        """Close the shard connections and remove the temporary directory"""
+        Database.close_all()
+        self.tmp_dir.cleanup()
+
+    def test_users_are_stored_in_their_shard(self):
+        """Test that shared connections open the shard file of each user"""
+        users = [User(f"User {index}") for index in range(12)]
+        for user in users:
+            UserRepository().save(user)
+            HabitService(user_id=user.user_id).create_habit("Walk", "daily")
+            TrackerService(user_id=user.user_id).check_off_habit("Walk")
+
+        shard_files = {Database.database_for(user.user_id) for user in users}
+        self.assertGreater(len(shard_files), 1)
+        self.assertNotIn(Config.DATABASE_NAME, shard_files)
+        for shard_file in shard_files:
+            self.assertTrue(os.path.exists(shard_file), shard_file)
+
+        for user in users:
+            self.assertEqual(UserRepository().find_by_id(user.user_id).name, user.name)
+            summary = AnalyticsService(user_id=user.user_id).get_completion_summary()
+            self.assertEqual([row['total_completions'] for row in summary], [1])
+
+    def test_database_for_is_stable(self):
+        """Test that a user always maps to the same shard, and no sharding means one file"""
+        self.assertEqual(Database.database_for("someone"), Database.database_for("someone"))
+        with mock.patch.object(Config, 'SHARD_COUNT', 0):
+            self.assertEqual(Database.database_for("someone"), Config.DATABASE_NAME)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,36 @@
 """
-Database seeding utility with predefined test fixtures
+Database seeding utility with predefined test fixtures and synthetic datasets
 """
+import itertools
+import math
+import random
+import uuid
 from datetime import datetime, timedelta
+from typing import Iterator, Optional
+from config import Config
+from database.connection import Database
+from database.streaks import day_key, week_key
+from models.habit import Habit
+from models.habit_stats import HabitStats
 from views.console_view import ConsoleView
 from services.habit_service import HabitService
 from services.tracker_service import TrackerService
 from repositories.habit_repository import HabitRepository
+from repositories.habit_stats_repository import HabitStatsRepository
+from repositories.tracker_repository import TrackerRepository
+
+# Check-off rows inserted per transaction by generate_synthetic_data
+SYNTHETIC_BATCH_SIZE = 100000
+
+# Mean length of an unbroken run of check-offs, in periods, for the streaky
+# and weekday patterns
+MEAN_STREAK = {'daily': 12, 'weekly': 6}
+
+# Share of weekend days kept by the weekday pattern (daily habits only)
+WEEKEND_SHARE = 0.3
+
+# Check-offs of a habit fall within this many seconds after its preferred time of day
+TIME_WINDOW = 3 * 3600
 
 
 def seed_predefined_data(db):
@@ -184,4 +209,232 @@ def _seed_water_plants(tracker_service, start_date, end_date):
             ]
             notes = plant_notes[week % 4]
             tracker_service.check_off_habit("Water Plants", current, notes)
-        current += timedelta(weeks=1)
\ No newline at end of file
+        current += timedelta(weeks=1)
+
+# ============ Synthetic Datasets ============
+
+def generate_synthetic_data(
+    db,
+    habits: int,
+    days: int,
+    density: float = 0.7,
+    pattern: str = 'streaky',
+    seed: int = 0,
+    user_id: str = None
+) -> dict:
+    """
+    Adds habits named "Habit 0", "Habit 1", ... (every fourth weekly, the
+    others daily) with check-off histories covering the given number of days
+    up to yesterday. The same arguments always produce the same habits, IDs
+    and check-offs relative to today.
+
+    Histories alternate between runs of checked-off periods and gaps, whose
+    lengths are drawn from geometric distributions so that about `density`
+    of the periods are checked off:
+    - uniform: every period independently (short streaks, many gaps)
+    - streaky: streaks of MEAN_STREAK periods on average, with longer gaps
+    - weekday: streaky, but daily habits keep only WEEKEND_SHARE of weekend days
+    - mixed: each habit picks one of the above, with its density varied by up to 0.2
+    Each habit is checked off within a few hours of its own time of day,
+    weekly habits mostly on their own weekday.
+
+    The check-offs are inserted directly in transactions of
+    SYNTHETIC_BATCH_SIZE rows, with the tracker indexes built once at the
+    end (Database.deferred_indexes), and habit_stats is filled from the
+    streaks counted while generating them.
+
+    Args:
+        db: Database connection
+        habits: Number of habits
+        days: Days of history per habit
+        density: Share of periods checked off, between 0 and 1
+        pattern: One of Config.SYNTHETIC_PATTERNS
+        seed: Random seed
+        user_id: Owner of the habits (defaults to Config.DEFAULT_USER_ID)
+
+    Returns:
+        Dictionary with the habits and events created
+
+    Raises:
+        ValueError: If the pattern is unknown or the density is out of range
+        RuntimeError: If the database is not empty, or the rows could not be inserted
+    """
+    if pattern not in Config.SYNTHETIC_PATTERNS:
+        raise ValueError(f"Unknown pattern {pattern!r}, expected one of {', '.join(Config.SYNTHETIC_PATTERNS)}")
+    if not 0 <= density <= 1:
+        raise ValueError("Density must be between 0 and 1")
+
+    habit_repo = HabitRepository(db, user_id)
+    con = Database.resolve(db, habit_repo.user_id)
+    # The tracker indexes are dropped for the whole load, which only suits a new database
+    if habit_repo.count(include_inactive=True) or con.execute("SELECT EXISTS (SELECT 1 FROM tracker)").fetchone()[0]:
+        raise RuntimeError("The database already contains habits or check-offs, nothing to generate")
+
+    rng = random.Random(seed)
+    start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    calendar = _calendar(start, days)
+
+    habit_objects = [
+        Habit(
+            f"Habit {index}", 'weekly' if index % 4 == 0 else 'daily',
+            habit_id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            created_at=start, updated_at=start
+        )
+        for index in range(habits)
+    ]
+    if habit_objects and not habit_repo.save_many(habit_objects):
+        raise RuntimeError("Failed to insert the synthetic habits")
+
+    event_ids = _event_ids(str(uuid.UUID(int=rng.getrandbits(128), version=4))[:24])
+    tracker_repo = TrackerRepository(db, user_id)
+    mixed_patterns = [name for name in Config.SYNTHETIC_PATTERNS if name != 'mixed']
+    stats = []
+    rows = []
+    events = 0
+    with Database.bulk_load(con), Database.deferred_indexes(con, 'tracker'):
+        for habit in habit_objects:
+            habit_pattern, habit_density = pattern, density
+            if pattern == 'mixed':
+                habit_pattern = rng.choice(mixed_patterns)
+                habit_density = min(1.0, max(0.0, density + rng.uniform(-0.2, 0.2)))
+            habit_stats = _add_check_offs(rows, rng, habit, calendar, habit_pattern, habit_density, event_ids)
+            if habit_stats:
+                stats.append(habit_stats)
+            if len(rows) >= SYNTHETIC_BATCH_SIZE:
+                events += _insert(tracker_repo, rows)
+                rows = []
+        if rows:
+            events += _insert(tracker_repo, rows)
+
+    if stats and not HabitStatsRepository(db, user_id).save_many(stats):
+        raise RuntimeError("Failed to store the synthetic habit stats")
+    return {'habits': habits, 'events': events}
+
+
+def _calendar(start: datetime, days: int) -> tuple:
+    """
+    Returns the per-day values shared by every habit: (date prefixes of
+    the ISO timestamps, times of day by second, day keys, week keys, weekdays).
+    """
+    dates = [start + timedelta(days=offset) for offset in range(days)]
+    return (
+        [f"{day.date().isoformat()}T" for day in dates],
+        [f"{second // 3600:02d}:{second // 60 % 60:02d}:{second % 60:02d}" for second in range(86400)],
+        [day_key(day) for day in dates],
+        [week_key(day) for day in dates],
+        [day.weekday() for day in dates]
+    )
+
+
+def _add_check_offs(
+    rows: list,
+    rng: random.Random,
+    habit: Habit,
+    calendar: tuple,
+    pattern: str,
+    density: float,
+    event_ids: Iterator[str]
+) -> Optional[HabitStats]:
+    """
+    Appends the tracker rows of one habit, in time order, and counts its streaks.
+
+    Args:
+        rows: List receiving TrackerRepository.insert_rows tuples
+        rng: Random generator
+        habit: Habit to check off
+        calendar: Result of _calendar()
+        pattern: 'uniform', 'streaky' or 'weekday'
+        density: Share of periods checked off
+        event_ids: Source of event IDs
+
+    Returns:
+        HabitStats of the appended check-offs, None if there are none
+    """
+    prefixes, times, day_keys, week_keys, weekdays = calendar
+    days = len(day_keys)
+    weekly = habit.periodicity == 'weekly'
+    keys = week_keys if weekly else day_keys
+    periods = (days + 6) // 7 if weekly else days
+    streak_mean, gap_mean = _mean_runs(pattern, habit.periodicity, density)
+    first_time = rng.randrange(86400 - TIME_WINDOW)
+    preferred_weekday = rng.randrange(7)
+    skip_weekends = pattern == 'weekday' and not weekly
+    random_value = rng.random
+    append = rows.append
+    habit_id = habit.habit_id
+    first_row = len(rows)
+
+    streak = longest = 0
+    previous = None
+    checked_at = None
+    period = 0
+    checked = streak_mean > 0 and random_value() * (streak_mean + gap_mean) < streak_mean
+    while period < periods:
+        length = _run_length(rng, streak_mean if checked else gap_mean)
+        if checked:
+            for current in range(period, min(period + length, periods)):
+                if weekly:
+                    # Any day of the week (Monday-based) of the period
+                    weekday = preferred_weekday if random_value() < 0.75 else rng.randrange(7)
+                    day = current * 7 - weekdays[current * 7] + weekday
+                    if not 0 <= day < days:
+                        continue
+                else:
+                    day = current
+                    if skip_weekends and weekdays[day] >= 5 and random_value() >= WEEKEND_SHARE:
+                        continue
+                key = keys[day]
+                streak = streak + 1 if previous is not None and key == previous + 1 else 1
+                if streak > longest:
+                    longest = streak
+                previous = key
+                checked_at = prefixes[day] + times[first_time + int(random_value() * TIME_WINDOW)]
+                append((next(event_ids), habit_id, checked_at, "", day_keys[day], week_keys[day]))
+        period += length
+        checked = not checked and streak_mean > 0
+
+    if checked_at is None:
+        return None
+    return HabitStats(habit_id, streak, longest, previous, len(rows) - first_row, datetime.fromisoformat(checked_at))
+
+
+def _event_ids(prefix: str) -> Iterator[str]:
+    """
+    Yields UUID-shaped event IDs made of a shared prefix (the first 24
+    characters of a UUID) and a counter: unique, and in primary key order.
+    """
+    for number in itertools.count():
+        yield f"{prefix}{number:012x}"
+
+
+def _mean_runs(pattern: str, periodicity: str, density: float) -> tuple:
+    """
+    Returns the mean streak and gap lengths, in periods, that check off
+    about `density` of the periods. A zero streak means no check-offs, a
+    zero gap no misses.
+    """
+    if density <= 0:
+        return 0, 1
+    if density >= 1:
+        return 1, 0
+    if pattern == 'uniform':
+        # Geometric runs with these means are independent coin flips per period
+        streak = 1 / (1 - density)
+    else:
+        streak = max(MEAN_STREAK[periodicity], 1 / (1 - density))
+    return streak, streak * (1 - density) / density
+
+
+def _run_length(rng: random.Random, mean: float) -> int:
+    """Draws the length of a run from a geometric distribution with the given mean (0 for a zero mean)."""
+    if mean <= 1:
+        return 1 if mean > 0 else 0
+    return 1 + int(math.log(1.0 - rng.random()) / math.log(1.0 - 1.0 / mean))
+
+
+def _insert(tracker_repo: TrackerRepository, rows: list) -> int:
+    """Inserts one batch of check-offs, returns how many were inserted."""
+    inserted = tracker_repo.insert_rows(rows)
+    if inserted is None:
+        raise RuntimeError("Failed to insert the synthetic check-offs")
+    return inserted
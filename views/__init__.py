@@ -1,14 +1,28 @@
 """
 Views package
+
+Members are imported on first access, so importing views.plain_view
+does not pull in rich.
 """
-from views. console_view import ConsoleView
-from views.formatters import (
-    create_menu_table,
-    get_periodicity_icon
-)
+from importlib import import_module
+
+_MEMBERS = {
+    'ConsoleView': 'views.console_view',
+    'PlainView': 'views.plain_view',
+    'create_menu_table': 'views.formatters',
+    'get_periodicity_icon': 'views.formatters',
+}
+
+
+def __getattr__(name):
+    if name in _MEMBERS:
+        return getattr(import_module(_MEMBERS[name]), name)
+    raise AttributeError(f"module 'views' has no attribute '{name}'")
+
 
 __all__ = [
     'ConsoleView',
+    'PlainView',
     'create_menu_table',
     'get_periodicity_icon'
-]
\ No newline at end of file
+]
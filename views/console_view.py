@@ -327,6 +327,20 @@ class ConsoleView:
             style="bold green"
         )
 
+    def show_synthetic_seeding_complete(self, habits: int, events: int, seconds: float):
+        """
+        Shows the size of a generated synthetic dataset.
+
+        Args:
+            habits: Number of habits created
+            events: Number of check-offs created
+            seconds: Time taken
+        """
+        self.console.print(
+            f"✅ Database seeded with {habits:,} synthetic habits and {events:,} check-offs in {seconds:.1f} s.",
+            style="bold green"
+        )
+
     # ============ Error Messages ============
 
     def show_error(self, message: str):
@@ -366,6 +380,33 @@ class ConsoleView:
             style="magenta"
         )
 
+    def show_sql_profile(self, profile):
+        """
+        Shows the SQL profile of the last menu action: totals and a table of
+        the repository operations, busiest first.
+
+        Args:
+            profile: database.profiler.Profile
+        """
+        totals = profile.totals()
+        self.console.print(
+            f"\n🔎 [cyan]SQL: {totals['queries']} queries, {totals['rows']} rows, "
+            f"{totals['ms']:.2f} ms in {totals['calls']} repository calls[/cyan]"
+        )
+        if not profile.operations:
+            return
+
+        table = Table(box=box.SIMPLE, show_header=True, header_style="bold cyan")
+        table.add_column("Operation", style="white")
+        table.add_column("Calls", justify="right")
+        table.add_column("Queries", justify="right", style="yellow")
+        table.add_column("Rows", justify="right")
+        table.add_column("ms", justify="right")
+        operations = sorted(profile.operations.items(), key=lambda item: (-item[1].queries, item[0]))
+        for name, stats in operations:
+            table.add_row(name, str(stats.calls), str(stats.queries), str(stats.rows), f"{stats.seconds * 1000:.2f}")
+        self.console.print(table)
+
     # ============ Habit Lists ============
 
     def show_active_habits_list(self, habits: List[Tuple[str, str, str, bool]]):
@@ -470,7 +511,8 @@ class ConsoleView:
     def show_habits_numbered_list_with_status(
             self,
             habits: List[Tuple[str, str, bool]],
-            header: str = "[bold cyan]Current habits:[/bold cyan]"
+            header: str = "[bold cyan]Current habits:[/bold cyan]",
+            start: int = 1
     ):
         """
         Displays habits as a numbered list.
@@ -478,10 +520,11 @@ class ConsoleView:
         Args:
             habits: List of tuples (name, periodicity, is_active)
             header: Header text
+            start: Number of the first habit (for pages after the first)
         """
         self.console.print(f"\n{header}\n")
 
-        for i, habit in enumerate(habits, 1):
+        for i, habit in enumerate(habits, start):
             icon = get_periodicity_icon(habit[1])
             name = habit[0]
             periodicity = habit[1]
@@ -637,12 +680,13 @@ class ConsoleView:
         self.console.print(table)
         self.console.print()
 
-    def show_habit_completion_history(self, habit_data: dict):
+    def show_habit_completion_history(self, habit_data: dict, start: int = 1):
         """
         Displays a detailed completion history for a specific habit.
 
         Args:
-            habit_data: Dictionary with habit details and completions
+            habit_data: Dictionary with habit details and completions (all of them, or one page)
+            start: Number of the first completion (for pages after the first)
         """
 
         icon = get_periodicity_icon(habit_data['periodicity'])
@@ -687,7 +731,7 @@ class ConsoleView:
             table.add_column("Time", style="cyan", width=8)
             table.add_column("Notes", style="italic", max_width=50)
 
-            for idx, completion in enumerate(habit_data['completions'], 1):
+            for idx, completion in enumerate(habit_data['completions'], start):
                 date_str = completion['checked_at'].strftime('%Y-%m-%d')
                 time_str = completion['checked_at'].strftime('%H:%M:%S')
                 notes = completion['notes'] if completion['notes'] else "-"
@@ -695,6 +739,11 @@ class ConsoleView:
                 table.add_row(str(idx), date_str, time_str, notes)
 
             self.console.print(table)
+
+            # Position within the history when it is shown a page at a time
+            if habit_data.get('previous_cursor') or habit_data.get('next_cursor'):
+                last = start + len(habit_data['completions']) - 1
+                self.console.print(f"  [dim]Showing {start}–{last} of {habit_data['total_completions']}[/dim]")
         else:
             self.console.print("  [dim]No completions recorded yet.[/dim]")
 
@@ -0,0 +1,71 @@
+"""
+Plain View - Lightweight console output for one-shot CLI commands
+"""
+import click
+
+
+class PlainView:
+    """
+    Prints the messages of the quick CLI commands with click styling only,
+    so they start without importing rich.
+    """
+
+    def echo(self, message: str = "", **style):
+        """
+        Prints a message.
+
+        Args:
+            message: Text to print
+            **style: click.style() arguments such as fg or bold
+        """
+        click.secho(message, **style)
+
+    def show_habit_checked_off(self, name: str):
+        """Shows a success message for check-off."""
+        self.echo(f"✅ Habit '{name}' marked as done! ", fg="green")
+
+    def show_notes(self, notes: str):
+        """Shows the notes recorded with a check-off."""
+        self.echo(f"   📝 Notes: {notes}", fg="cyan")
+
+    def show_streak(self, icon: str, label: str, name: str, streak: int):
+        """
+        Shows a habit together with its longest streak.
+
+        Args:
+            icon: Leading emoji
+            label: Label of the habit line
+            name: Habit name
+            streak: Longest streak
+        """
+        self.echo()
+        self.echo(f"{icon} " + click.style(f"{label}:", fg="cyan", bold=True) + f" {name}")
+        self.echo("   " + click.style("Longest streak:", fg="yellow") + " " +
+                  click.style(str(streak), fg="green", bold=True) + " days")
+        self.echo()
+
+    def show_error(self, message: str):
+        """Shows an error message."""
+        self.echo(f"\n❌ {message}", fg="red")
+
+    def show_sql_profile(self, profile, err: bool = False):
+        """
+        Shows the totals of a SQL profile and its operations, busiest first.
+
+        Args:
+            profile: database.profiler.Profile
+            err: Whether to print to standard error
+        """
+        totals = profile.totals()
+        self.echo(
+            f"🔎 SQL: {totals['queries']} queries, {totals['rows']} rows, "
+            f"{totals['ms']:.2f} ms in {totals['calls']} repository calls",
+            fg="cyan", err=err
+        )
+        operations = sorted(profile.operations.items(), key=lambda item: (-item[1].queries, item[0]))
+        for name, stats in operations:
+            self.echo(
+                f"   {name:<45} {stats.calls:>5} calls {stats.queries:>6} queries "
+                f"{stats.rows:>8} rows {stats.seconds * 1000:>9.2f} ms",
+                err=err
+            )